@@ -12,6 +12,7 @@ from .models import (
     UserAnalysisResults,
     GEEAsset,
     AnalysisResultsCache,
+    AnalysisPayload,
     AnalysisRasterOutput,
     AnalysisTask,
     Project,
@@ -99,8 +100,12 @@ class InterventionAreaAdmin(OSMGeoAdmin):
 
 def fetch_landscape_area(modeladmin, request, queryset):
     """Fetch all Landscape Area objects for a given queryset."""
+    from layers.tasks.bake_pmtiles import bake_vector_tile_archives_task
+
     for landscape in queryset:
         landscape.fetch_areas()
+    # rebake the communities archive of the map
+    bake_vector_tile_archives_task.delay()
 
 
 @admin.register(Landscape)
@@ -114,6 +119,12 @@ class LandscapeAdmin(OSMGeoAdmin):
     actions = [fetch_landscape_area]
 
 
+@admin.action(description='Rebuild vector tile geometries')
+def update_community_tile_geometries(modeladmin, request, queryset):
+    """Rebuild vector tile geometries of the selected communities."""
+    LandscapeCommunity.update_tile_geometries(queryset)
+
+
 @admin.register(LandscapeCommunity)
 class LandscapeCommunityAdmin(OSMGeoAdmin):
     """Admin for LandscapeCommunity model."""
@@ -121,16 +132,24 @@ class LandscapeCommunityAdmin(OSMGeoAdmin):
     list_display = ('landscape', 'community_id', 'community_name',)
     search_fields = ('community_name',)
     list_filter = ('landscape',)
+    actions = [update_community_tile_geometries]
 
     map_template = 'gis/admin/osm.html'
 
+    def save_model(self, request, obj, form, change):
+        """Save community and rebuild its vector tile geometries."""
+        super().save_model(request, obj, form, change)
+        LandscapeCommunity.update_tile_geometries(
+            LandscapeCommunity.objects.filter(pk=obj.pk)
+        )
+
 
 def fix_analysis_name_desc(modeladmin, request, queryset):
     """Fix the name and description of analysis results."""
     for result in queryset:
         data = (
-            result.analysis_results.get('data', {}) if
-            result.analysis_results else {}
+            result.analysis_metadata.get('data', {}) if
+            result.analysis_metadata else {}
         )
         if not result.name:
             result.name = result._get_name(data)
@@ -171,7 +190,25 @@ class GEEAssetAdmin(admin.ModelAdmin):
 class AnalysisResultsCacheAdmin(admin.ModelAdmin):
     """Admin for AnalysisResultsCache model."""
 
-    list_display = ('id', 'expired_at',)
+    list_display = ('id', 'analysis_inputs_hash', 'expired_at',)
+    search_fields = ('analysis_inputs_hash',)
+
+
+@admin.register(AnalysisPayload)
+class AnalysisPayloadAdmin(admin.ModelAdmin):
+    """Admin for AnalysisPayload model."""
+
+    list_display = (
+        'digest', 'size', 'compressed_size', 'ref_count', 'created_at',
+    )
+    search_fields = ('digest',)
+    exclude = ('content',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 def generate_raster_output(modeladmin, request, queryset):
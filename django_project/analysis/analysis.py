@@ -1,16 +1,25 @@
 import typing
 import datetime
+import json
 import time
 import base64
+import hashlib
 import logging
+import math
+import zlib
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.gis.geos import GEOSGeometry, MultiPoint, Point
+from django.core.cache import cache
+from django.utils import timezone
 
 import ee
 import os
-from functools import reduce, partial
+from functools import reduce, partial, lru_cache
 
+from core.models import Preferences
 from analysis.models import (
     AnalysisTask,
     AnalysisResultsCache,
@@ -19,17 +28,24 @@ from analysis.models import (
     UserIndicator,
     IndicatorSource,
     UserGEEAsset,
-    GEEAssetType
+    GEEAssetType,
+    LandscapeCommunity
+)
+from analysis.utils import (
+    LazyDict,
+    get_info_concurrently,
+    split_dates_by_year,
+    convert_temporal_to_dates
 )
-from analysis.utils import split_dates_by_year, convert_temporal_to_dates
 from analysis.external.gpw import (
     gpw_annual_temporal_analysis,
-    gpw_spatial_analysis_dict
+    gpw_spatial_layer_builders
 )
 from analysis.external.user_raster import (
     user_temporal_analysis,
     user_spatial_analysis_dict
 )
+from analysis.temporal_statistics import ResultFormat, convert_results
 
 SERVICE_ACCOUNT_KEY = os.environ.get('SERVICE_ACCOUNT_KEY', '')
 SERVICE_ACCOUNT = os.environ.get('SERVICE_ACCOUNT', '')
@@ -494,7 +510,7 @@ class InputLayer:
         user: User = None
     ):
         """
-        Get spatial layer dictionary.
+        Get lazy spatial layer dictionary, layer is built on access.
 
         Parameters
         ----------
@@ -505,94 +521,105 @@ class InputLayer:
             End date to filter assets: modis_vegetation,
             cgls_ground_cover, and soil_carbon.
         """
-        # Get MODIS vegetation data
-        modis_veg = ee.ImageCollection(
-            GEEAsset.fetch_asset_source('modis_vegetation')
-        )
-        if start_date and end_date:
-            modis_veg = modis_veg.filterDate(
-                start_date.isoformat(),
-                end_date.isoformat()
+        # Layers are built only when accessed, shared collections are
+        # built once.
+        @lru_cache(maxsize=None)
+        def get_modis_veg():
+            # Get MODIS vegetation data
+            modis_veg = ee.ImageCollection(
+                GEEAsset.fetch_asset_source('modis_vegetation')
+            )
+            if start_date and end_date:
+                modis_veg = modis_veg.filterDate(
+                    start_date.isoformat(),
+                    end_date.isoformat()
+                )
+            else:
+                modis_veg = modis_veg.filterDate('2016-01-01', '2020-01-01')
+            return (
+                modis_veg.select(['NDVI', 'EVI'])
+                .map(lambda i: i.divide(10000))
             )
-        else:
-            modis_veg = modis_veg.filterDate('2016-01-01', '2020-01-01')
-        modis_veg = (
-            modis_veg.select(['NDVI', 'EVI'])
-            .map(lambda i: i.divide(10000))
-        )
 
-        evi_baseline = (modis_veg.select('EVI').
-                        median().clipToCollection(self.countries))
-        ndvi_baseline = (modis_veg.select('NDVI').
-                         median().clipToCollection(self.countries))
+        def get_modis_baseline(band):
+            return (get_modis_veg().select(band).
+                    median().clipToCollection(self.countries))
 
-        # Get NDWI from Landsat 8-day composites
-        landsat_ndwi_col = ee.ImageCollection(
-            GEEAsset.fetch_asset_source('landsat_ndwi')
-        )
-        if start_date and end_date:
-            landsat_ndwi_col = landsat_ndwi_col.filterDate(
-                start_date.isoformat(),
-                end_date.isoformat()
+        def get_ndwi_baseline():
+            # Get NDWI from Landsat 8-day composites
+            landsat_ndwi_col = ee.ImageCollection(
+                GEEAsset.fetch_asset_source('landsat_ndwi')
             )
-        else:
-            landsat_ndwi_col = landsat_ndwi_col.filterDate(
-                '2015-01-01', '2020-01-01'
+            if start_date and end_date:
+                landsat_ndwi_col = landsat_ndwi_col.filterDate(
+                    start_date.isoformat(),
+                    end_date.isoformat()
+                )
+            else:
+                landsat_ndwi_col = landsat_ndwi_col.filterDate(
+                    '2015-01-01', '2020-01-01'
+                )
+            return (landsat_ndwi_col.select('NDWI').
+                    median().clipToCollection(self.countries))
+
+        @lru_cache(maxsize=None)
+        def get_cgls():
+            # Get fractional ground cover from CGLS
+            cgls_col = ee.ImageCollection(
+                GEEAsset.fetch_asset_source('cgls_ground_cover')
             )
-        ndwi_baseline = (landsat_ndwi_col.select('NDWI').
-                         median().clipToCollection(self.countries))
-
-        # Get fractional ground cover from CGLS
-        cgls_col = ee.ImageCollection(
-            GEEAsset.fetch_asset_source('cgls_ground_cover')
-        )
-        if start_date and end_date:
-            cgls_col = cgls_col.filterDate(
-                start_date.isoformat(),
-                end_date.isoformat()
+            if start_date and end_date:
+                cgls_col = cgls_col.filterDate(
+                    start_date.isoformat(),
+                    end_date.isoformat()
+                )
+            cgls_col = (
+                cgls_col.select(
+                    [
+                        'bare-coverfraction', 'crops-coverfraction',
+                        'urban-coverfraction', 'shrub-coverfraction',
+                        'grass-coverfraction', 'tree-coverfraction'
+                    ]
+                ).filterBounds(self.countries))
+
+            cgls_col = cgls_col.map(self._process_cgls)
+            return cgls_col.median()
+
+        def get_cgls_band(band):
+            return get_cgls().select(band).clipToCollection(self.countries)
+
+        # Dictionary with names for map layers and their ee.Image() builders
+        spatial_layer_builders = {
+            'EVI': partial(get_modis_baseline, 'EVI'),
+            'NDVI': partial(get_modis_baseline, 'NDVI'),
+            'NDWI': get_ndwi_baseline,
+            'Bare ground': partial(get_cgls_band, 'bg'),
+            'Grass cover': partial(get_cgls_band, 'g'),
+            'Woody cover': partial(get_cgls_band, 't'),
+            'Grazing capacity': self.get_grazing_capacity,
+            'Soil carbon': partial(
+                self.get_soil_carbon, start_date, end_date
+            ),
+            'Soil carbon change': partial(
+                self.get_soil_carbon_change, start_date, end_date
             )
-        cgls_col = (
-            cgls_col.select(
-                [
-                    'bare-coverfraction', 'crops-coverfraction',
-                    'urban-coverfraction', 'shrub-coverfraction',
-                    'grass-coverfraction', 'tree-coverfraction'
-                ]
-            ).filterBounds(self.countries))
-
-        cgls_col = cgls_col.map(self._process_cgls)
-        cgls = cgls_col.median()
-        bg = cgls.select('bg').clipToCollection(self.countries)
-        t = cgls.select('t').clipToCollection(self.countries)
-        g = cgls.select('g').clipToCollection(self.countries)
-
-        grazing_capacity = self.get_grazing_capacity()
-        soc_lt_mean = self.get_soil_carbon(start_date, end_date)
-        soc_lt_trend = self.get_soil_carbon_change(start_date, end_date)
-
-        # Dictionary with names for map layers and their ee.Image() objects
-        spatial_layer_dict = {
-            'EVI': evi_baseline,
-            'NDVI': ndvi_baseline,
-            'NDWI': ndwi_baseline,
-            'Bare ground': bg,
-            'Grass cover': g,
-            'Woody cover': t,
-            'Grazing capacity': grazing_capacity,
-            'Soil carbon': soc_lt_mean,
-            'Soil carbon change': soc_lt_trend
         }
-        gpw_dict = gpw_spatial_analysis_dict(
-            self.countries, start_date, end_date
+        spatial_layer_builders.update(
+            gpw_spatial_layer_builders(
+                self.countries, start_date, end_date
+            )
         )
-        spatial_layer_dict.update(gpw_dict)
 
-        user_layer_dict = user_spatial_analysis_dict(
-            self.countries, user,
-            start_date, end_date
+        # user layers override the built-in layers with the same name,
+        # their images are lazy so only the user indicators are queried
+        return LazyDict(
+            spatial_layer_builders,
+            overrides=partial(
+                user_spatial_analysis_dict,
+                self.countries, user,
+                start_date, end_date
+            )
         )
-        spatial_layer_dict.update(user_layer_dict)
-        return spatial_layer_dict
 
     def get_landscape_dict(self):
         """
@@ -707,32 +734,156 @@ class InputLayer:
 
 
 class AnalysisResultsCacheUtils:
-    """Analysis results cache utilities."""
+    """Analysis results cache utilities.
+
+    Results are cached in two tiers: a compressed copy in redis
+    (hot tier) in front of AnalysisResultsCache table (db tier).
+    FeatureCollections of temporal analysis are cached in columnar form.
+    """
+
+    REDIS_KEY_PREFIX = 'analysis-results-cache'
+    COLUMNAR_ANALYSIS_TYPES = ['Temporal']
+    TIER_REDIS = 'redis'
+    TIER_DB = 'db'
+    CACHE_HIT = 'hit'
+    CACHE_MISS = 'miss'
 
     def __init__(self, inputs):
-        from analysis.utils import sort_nested_structure
+        from analysis.utils import (
+            sort_nested_structure,
+            get_nested_structure_digest
+        )
         self.inputs = sort_nested_structure(inputs)
+        self.inputs_hash = get_nested_structure_digest(self.inputs)
+
+    @property
+    def cache_format(self):
+        """Get the format of the cached results."""
+        analysis_dict = self.inputs.get('analysis_dict') or {}
+        if analysis_dict.get('analysisType') in self.COLUMNAR_ANALYSIS_TYPES:
+            return ResultFormat.COLUMNAR
+        return ResultFormat.GEOJSON
+
+    @property
+    def redis_key(self):
+        """Get redis key of the cached results."""
+        return f'{self.REDIS_KEY_PREFIX}:{self.inputs_hash}'
+
+    @classmethod
+    def _stats_key(cls, tier: str, event: str):
+        return f'{cls.REDIS_KEY_PREFIX}:stats:{tier}:{event}'
+
+    @classmethod
+    def _count(cls, tier: str, event: str):
+        """Increment hit/miss counter of the cache tier."""
+        key = cls._stats_key(tier, event)
+        try:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+        except Exception:
+            # counter is lost when the key is evicted or redis is down
+            pass
+
+    @classmethod
+    def get_stats(cls):
+        """Get hit/miss counters of each cache tier."""
+        stats = {}
+        for tier in [cls.TIER_REDIS, cls.TIER_DB]:
+            stats[tier] = {}
+            for event in [cls.CACHE_HIT, cls.CACHE_MISS]:
+                try:
+                    value = cache.get(cls._stats_key(tier, event), 0)
+                except Exception:
+                    value = 0
+                stats[tier][event] = value or 0
+        return stats
+
+    @classmethod
+    def reset_stats(cls):
+        """Reset hit/miss counters of each cache tier."""
+        cache.delete_many([
+            cls._stats_key(tier, event)
+            for tier in [cls.TIER_REDIS, cls.TIER_DB]
+            for event in [cls.CACHE_HIT, cls.CACHE_MISS]
+        ])
 
-    def get_analysis_cache(self):
-        """Get analysis cache."""
-        cache = AnalysisResultsCache.objects.filter(
-            analysis_inputs=self.inputs
-        )
-        if cache.exists():
-            cache = cache.first()
-            return cache.analysis_results
+    def _get_from_redis(self):
+        """Get results from redis tier."""
+        if not settings.ANALYSIS_RESULTS_REDIS_CACHE_ENABLED:
+            return None
+        try:
+            payload = cache.get(self.redis_key)
+            if payload is None:
+                return None
+            return json.loads(zlib.decompress(payload))
+        except Exception as e:
+            logger.warning(
+                f'Failed to read analysis cache {self.inputs_hash} '
+                f'from redis: {e}'
+            )
+        return None
+
+    def _set_to_redis(self, results, expired_at: datetime.datetime):
+        """Write compressed results to redis tier until expired_at."""
+        if not settings.ANALYSIS_RESULTS_REDIS_CACHE_ENABLED:
+            return
+        try:
+            timeout = int((expired_at - timezone.now()).total_seconds())
+            if timeout <= 0:
+                return
+            payload = zlib.compress(
+                json.dumps(results, separators=(',', ':')).encode('utf-8')
+            )
+            if len(payload) > settings.ANALYSIS_RESULTS_REDIS_CACHE_MAX_SIZE:
+                return
+            cache.set(self.redis_key, payload, timeout=timeout)
+        except Exception as e:
+            logger.warning(
+                f'Failed to write analysis cache {self.inputs_hash} '
+                f'to redis: {e}'
+            )
+
+    def get_analysis_cache(self, result_format=ResultFormat.GEOJSON):
+        """Get analysis cache.
+
+        :param result_format: ResultFormat of the returned results.
+        """
+        results = self._get_from_redis()
+        if results is not None:
+            self._count(self.TIER_REDIS, self.CACHE_HIT)
+            return convert_results(results, result_format)
+        self._count(self.TIER_REDIS, self.CACHE_MISS)
+
+        cache_obj = AnalysisResultsCache.get_by_inputs_hash(self.inputs_hash)
+        if cache_obj:
+            self._count(self.TIER_DB, self.CACHE_HIT)
+            if cache_obj.expired_at:
+                # warm the redis tier for the remaining ttl
+                self._set_to_redis(
+                    cache_obj.analysis_results, cache_obj.expired_at
+                )
+            return convert_results(
+                cache_obj.analysis_results, result_format
+            )
+        self._count(self.TIER_DB, self.CACHE_MISS)
         return None
 
     def create_analysis_cache(self, results, ttl: int = None):
-        """Create analysis cache."""
+        """Create analysis cache in db and redis tier."""
         from analysis.utils import sort_nested_structure
 
+        if ttl is None:
+            ttl = Preferences.load().result_cache_ttl
+
         results = sort_nested_structure(results)
-        AnalysisResultsCache.save_cache_with_ttl(
+        cached_results = convert_results(results, self.cache_format)
+        cache_obj = AnalysisResultsCache.save_cache_with_ttl(
             ttl=ttl,
             analysis_inputs=self.inputs,
-            analysis_results=results
+            analysis_inputs_hash=self.inputs_hash,
+            analysis_results=cached_results
         )
+        self._set_to_redis(cached_results, cache_obj.expired_at)
         return results
 
 
@@ -853,13 +1004,119 @@ def run_monthly_analysis(
         ee.Filter.inList('date', date_list_ee)
     )
     return analysis_cache.create_analysis_cache(
-        (
-            to_plot.getInfo(),
-            to_plot_ts.getInfo()
-        )
+        get_info_concurrently(to_plot, to_plot_ts)
     )
 
 
+# Column type of the feature property by its python type
+FEATURE_COLUMN_TYPES = (
+    (bool, 'Boolean'),
+    (int, 'Long'),
+    (float, 'Float'),
+    (str, 'String'),
+    (list, 'List'),
+    (dict, 'Dictionary'),
+)
+
+
+def iter_feature_collection_pages(
+    collection: ee.FeatureCollection, page_size: int = None
+):
+    """Iterate features of the collection page by page."""
+    page_size = page_size or settings.ANALYSIS_FEATURE_PAGE_SIZE
+    page_token = None
+    while True:
+        params = {
+            'expression': collection,
+            'pageSize': page_size
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        page = ee.data.computeFeatures(params)
+        yield page.get('features', [])
+        page_token = page.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def update_feature_columns(columns: dict, features: list):
+    """Update columns like getInfo of FeatureCollection from features."""
+    for feature in features:
+        for key, value in feature.get('properties', {}).items():
+            if columns.get(key, 'Object') != 'Object':
+                continue
+            columns[key] = next(
+                (
+                    column_type for python_type, column_type in
+                    FEATURE_COLUMN_TYPES if isinstance(value, python_type)
+                ),
+                'Object'
+            )
+
+
+def fetch_feature_collection(
+    collection: ee.FeatureCollection, page_size: int = None
+) -> dict:
+    """
+    Fetch FeatureCollection as GeoJSON dictionary.
+
+    Features are fetched page by page from the start, so a collection
+    over the Earth Engine element or payload limits of getInfo is
+    computed once. Columns are typed as each page arrives.
+
+    This does not stream the pages into the result: they are collected
+    into one dictionary, because create_analysis_cache sorts and
+    converts the whole result, AnalysisPayload hashes and compresses
+    the whole JSON and AnalysisTask.result stores the returned value.
+    Peak memory is bounded by the size of the result, not of a page,
+    streaming needs these consumers to accept an iterator of features.
+    """
+    columns = {}
+    features = []
+    for page in iter_feature_collection_pages(collection, page_size):
+        update_feature_columns(columns, page)
+        features.extend(page)
+    columns['system:index'] = 'String'
+    return {
+        'type': 'FeatureCollection',
+        'columns': dict(sorted(columns.items())),
+        'features': features
+    }
+
+
+def get_community_names(
+    communities: ee.FeatureCollection,
+    selected_geos: ee.FeatureCollection,
+    locations: list = None,
+    custom_geom: dict = None
+):
+    """
+    Get names of the communities selected by locations or custom geometry.
+
+    The names are resolved from LandscapeCommunity using PostGIS when
+    the communities of the landscapes of the locations or geometry are
+    fetched. Otherwise GEE is used, so communities of landscapes that
+    are not fetched are not dropped.
+    """
+    geometry = None
+    if custom_geom:
+        geometry = GEOSGeometry(json.dumps(custom_geom), srid=4326)
+    elif locations:
+        geometry = MultiPoint(
+            [
+                Point(float(location['lon']), float(location['lat']))
+                for location in locations
+            ],
+            srid=4326
+        )
+    if geometry is not None and LandscapeCommunity.is_fetched(geometry):
+        return LandscapeCommunity.get_community_names(geometry)
+
+    return communities.filterBounds(selected_geos).distinct(
+        ['Name']
+    ).reduceColumns(ee.Reducer.toList(), ['Name']).getInfo()['list']
+
+
 def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
     """
     Run baseline, spatial, and temporal analysis
@@ -928,13 +1185,13 @@ def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
         custom_geom_fc = ee.FeatureCollection([
             ee.Feature(custom_geom_geometry)
         ])
-        select_names = communities.filterBounds(custom_geom_fc).distinct(
-            ['Name']
-        ).reduceColumns(ee.Reducer.toList(), ['Name']).getInfo()['list']
+        select_names = get_community_names(
+            communities, custom_geom_fc, custom_geom=custom_geom
+        )
     else:
-        select_names = communities.filterBounds(selected_geos).distinct(
-            ['Name']
-        ).reduceColumns(ee.Reducer.toList(), ['Name']).getInfo()['list']
+        select_names = get_community_names(
+            communities, selected_geos, locations=locations
+        )
 
     if analysis_dict['analysisType'] == "Spatial":
         reference_layer = kwargs.get('reference_layer', None)
@@ -966,7 +1223,9 @@ def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
             scale=60,
             tileScale=4
         )
-        return analysis_cache.create_analysis_cache(reduced.getInfo())
+        return analysis_cache.create_analysis_cache(
+            fetch_feature_collection(reduced)
+        )
 
     if analysis_dict['analysisType'] == "Baseline":
         has_dates = (
@@ -1026,7 +1285,9 @@ def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
             )
             baseline_warnings = []
 
-        result = analysis_cache.create_analysis_cache(select.getInfo())
+        result = analysis_cache.create_analysis_cache(
+            fetch_feature_collection(select)
+        )
         # Add warnings to result if any
         if baseline_warnings:
             result['warnings'] = baseline_warnings
@@ -1204,10 +1465,7 @@ def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
         )
         to_plot_ts = to_plot_ts.sort('Name').sort('date')
         return analysis_cache.create_analysis_cache(
-            (
-                to_plot.getInfo(),
-                to_plot_ts.getInfo()
-            )
+            get_info_concurrently(to_plot, to_plot_ts)
         )
 
     if analysis_dict['analysisType'] == "BACI":
@@ -1254,7 +1512,9 @@ def run_analysis(locations: list, analysis_dict: dict, *args, **kwargs):
             analysis_dict['variable'], res,
             before_dict, after_dict
         )
-        return analysis_cache.create_analysis_cache(result.getInfo())
+        return analysis_cache.create_analysis_cache(
+            fetch_feature_collection(result)
+        )
 
 
 def initialize_engine_analysis():
@@ -1717,6 +1977,86 @@ def get_sent_quarterly(aoi):
     return sent_quarterly
 
 
+BGT_CLASSIFIER_CACHE_KEY_PREFIX = 'bgt-classifier'
+# Interval in seconds to check update time of the training asset
+BGT_TRAINING_VERSION_CHECK_INTERVAL = 60 * 60
+
+
+def get_training_asset_version(training_path):
+    """Get version of the training asset from its update time."""
+    cache_key = (
+        f'{BGT_CLASSIFIER_CACHE_KEY_PREFIX}:version:'
+        f'{hashlib.md5(training_path.encode()).hexdigest()}'
+    )
+    try:
+        version = cache.get(cache_key)
+    except Exception:
+        version = None
+    if version is not None:
+        return version
+
+    try:
+        version = ee.data.getAsset(training_path).get('updateTime', '')
+    except Exception as ex:
+        logger.warning(f'Failed to get version of {training_path}: {ex}')
+        return ''
+    try:
+        cache.set(
+            cache_key, version, timeout=BGT_TRAINING_VERSION_CHECK_INTERVAL
+        )
+    except Exception as ex:
+        logger.warning(f'Failed to cache version of {training_path}: {ex}')
+    return version
+
+
+def get_coordinates_bounds(coordinates: list) -> list:
+    """Get [xmin, ymin, xmax, ymax] of nested GeoJSON coordinates."""
+    xs = []
+    ys = []
+    items = [coordinates]
+    while items:
+        item = items.pop()
+        if item and isinstance(item[0], (int, float)):
+            xs.append(item[0])
+            ys.append(item[1])
+        else:
+            items.extend(item)
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def get_snapped_bounds(aoi):
+    """Get bounds of the aoi snapped outward to the classifier grid.
+
+    Coordinates of client side geometry are read locally, only computed
+    geometry needs a getInfo call.
+
+    :return: List of [xmin, ymin, xmax, ymax].
+    """
+    grid_size = settings.BGT_CLASSIFIER_GRID_SIZE
+    try:
+        coordinates = aoi.toGeoJSON().get('coordinates')
+    except ee.EEException:
+        coordinates = None
+    if not coordinates:
+        coordinates = aoi.bounds(1).coordinates().getInfo()
+    xmin, ymin, xmax, ymax = get_coordinates_bounds(coordinates)
+    return [
+        round(math.floor(xmin / grid_size) * grid_size, 6),
+        round(math.floor(ymin / grid_size) * grid_size, 6),
+        round(math.ceil(xmax / grid_size) * grid_size, 6),
+        round(math.ceil(ymax / grid_size) * grid_size, 6)
+    ]
+
+
+def get_bgt_classifier_cache_key(bounds, training_path, version):
+    """Get cache key of the classifier trained within the bounds."""
+    key = json.dumps([bounds, training_path, version])
+    return (
+        f'{BGT_CLASSIFIER_CACHE_KEY_PREFIX}:'
+        f'{hashlib.sha256(key.encode()).hexdigest()}'
+    )
+
+
 def train_bgt(aoi, training_path):
     """
     Trains a Random Forest classifier to estimate
@@ -1732,7 +2072,8 @@ def train_bgt(aoi, training_path):
     Returns
     -------
     ee.Classifier
-        A trained Random Forest classifier with multi-probability output mode.
+        A trained Random Forest classifier with multi-probability output
+        mode, built from the trees of the forest.
 
     Raises
     ------
@@ -1742,8 +2083,13 @@ def train_bgt(aoi, training_path):
 
     Notes
     -----
-    - The variable `TRAINING_DATA_ASSET_PATH` should be defined and point to
-        the correct Earth Engine asset.
+    - The training data is filtered to the bounds of the aoi snapped to
+        BGT_CLASSIFIER_GRID_SIZE, so nearly identical AOIs share the
+        classifier.
+    - The validation counts and the trees of the trained forest are
+        cached by the snapped bounds and the version of the training
+        asset. The classifier is rebuilt from the cached trees with
+        ee.Classifier.decisionTreeEnsemble, so it is not trained again.
     - The variable `selectBands` should be a list of band names used as
         input features for the classifier.
 
@@ -1755,11 +2101,50 @@ def train_bgt(aoi, training_path):
     >>> # Train the classifier
     >>> classifier = train_bgt(aoi, training_path)
     """
-    training_testing_master = ee.FeatureCollection(training_path)
-    training_testing = training_testing_master.filterBounds(aoi)
+    bounds = get_snapped_bounds(aoi)
+    cache_key = get_bgt_classifier_cache_key(
+        bounds, training_path, get_training_asset_version(training_path)
+    )
+    try:
+        trained = cache.get(cache_key)
+    except Exception:
+        trained = None
+
+    if trained is None:
+        training_testing_master = ee.FeatureCollection(training_path)
+        training_testing = training_testing_master.filterBounds(
+            ee.Geometry.Rectangle(bounds)
+        )
+        trained = ee.Dictionary({
+            'sample_count': training_testing.size(),
+            'distinct_classes': training_testing.aggregate_array(
+                'landcover'
+            ).distinct().size()
+        }).getInfo()
+        trained['trees'] = None
+        if trained['sample_count'] > 0 and trained['distinct_classes'] > 1:
+            logger.info(
+                f"Training classifier: {trained['sample_count']} samples, "
+                f"{trained['distinct_classes']} classes"
+            )
+            classifier = ee.Classifier.smileRandomForest(100).train(
+                features=training_testing,
+                classProperty='landcover',
+                inputProperties=select_bands
+            )
+            trained['trees'] = ee.Dictionary(
+                classifier.explain()
+            ).get('trees').getInfo()
+        try:
+            cache.set(
+                cache_key, trained,
+                timeout=settings.BGT_CLASSIFIER_CACHE_TIMEOUT
+            )
+        except Exception as ex:
+            logger.warning(f'Failed to cache bare ground classifier: {ex}')
 
     # Validate training data availability
-    sample_count = training_testing.size().getInfo()
+    sample_count = trained['sample_count']
 
     if sample_count == 0:
         raise ValueError(
@@ -1769,9 +2154,7 @@ def train_bgt(aoi, training_path):
         )
 
     # Validate class diversity
-    distinct_classes = training_testing.aggregate_array(
-        'landcover'
-    ).distinct().size().getInfo()
+    distinct_classes = trained['distinct_classes']
 
     if distinct_classes < 2:
         raise ValueError(
@@ -1781,17 +2164,9 @@ def train_bgt(aoi, training_path):
             "or choosing EVI/NDVI as the variable."
         )
 
-    logger.info(
-        f"Training classifier: {sample_count} samples, "
-        f"{distinct_classes} classes"
-    )
-
-    classifier = ee.Classifier.smileRandomForest(100).train(
-        features=training_testing,
-        classProperty='landcover',
-        inputProperties=select_bands
+    return ee.Classifier.decisionTreeEnsemble(
+        trained['trees']
     ).setOutputMode('MULTIPROBABILITY')
-    return classifier
 
 
 def classify_bgt(image, classifier):
@@ -1885,8 +2260,52 @@ def get_latest_stats(geo, communities_select):
     return feats
 
 
-def _start_export_task(task: ee.batch.Task, description):
+# Final states of Earth Engine batch task,
+# UNKNOWN is returned when the task id is not found
+EXPORT_TASK_FINAL_STATES = ('COMPLETED', 'FAILED', 'CANCELLED', 'UNKNOWN')
+# Number of tasks from which the task list is requested instead of
+# requesting each task status
+TASK_LIST_MIN_TASKS = 5
+
+
+def get_task_statuses(task_ids: typing.List[str]) -> dict:
+    """Get status of Earth Engine tasks.
+
+    With TASK_LIST_MIN_TASKS or more tasks, the task list of the project
+    is requested once (paged by ee.data.listOperations) instead of one
+    request per task. Tasks that are not in the list are requested with
+    ee.data.getTaskStatus.
+
+    :return: Dictionary of task id to the task status.
+    """
+    task_ids = set(task_ids)
+    statuses = {}
+    if len(task_ids) >= TASK_LIST_MIN_TASKS:
+        statuses = {
+            status['id']: status for status in ee.data.getTaskList()
+            if status.get('id') in task_ids
+        }
+    missing_ids = [
+        task_id for task_id in task_ids if task_id not in statuses
+    ]
+    if missing_ids:
+        statuses.update({
+            status['id']: status for status in
+            ee.data.getTaskStatus(missing_ids)
+        })
+    return statuses
+
+
+def _start_export_task(task: ee.batch.Task, description, wait=True):
     task.start()
+    if not wait:
+        logger.info(f"Export task '{description}' submitted as {task.id}.")
+        return {
+            'id': task.id,
+            'state': 'READY',
+            'description': description
+        }
+
     print(f"Export task '{description}' started.")
 
     while task.active():
@@ -1913,7 +2332,8 @@ def export_image_to_drive(
         scale,
         region,
         max_pixels=1e13,
-        vis_params=None):
+        vis_params=None,
+        wait=True):
     """
     Exports an Earth Engine image to Google Drive and monitors the export task.
 
@@ -1937,10 +2357,14 @@ def export_image_to_drive(
     vis_params : (dict, optional)
         Visualization parameters for the image.
             Defaults to None.
+    wait : (bool, optional)
+        Wait until the export task is finished, otherwise return
+        right after the task is submitted. Defaults to True.
 
     Returns
     ----------
-    None
+    dict
+        Status of the export task, it has the task id in key 'id'.
     """
     # Configure the export task
     # Reproject the image to EPSG:3857
@@ -1970,7 +2394,7 @@ def export_image_to_drive(
         }
     )
 
-    return _start_export_task(task, description)
+    return _start_export_task(task, description, wait=wait)
 
 
 def export_table_to_drive(feature_collection, description, folder):
@@ -2393,9 +2817,7 @@ def calculate_baseline(aoi: ee.Geometry, start_date: str, end_date: str,
         'modis_vegetation_061', start_date, end_date
     )
     if valid:
-        modis_asset = GEEAsset.objects.filter(
-            key='modis_vegetation_061'
-        ).first()
+        modis_asset = GEEAsset.get_by_key('modis_vegetation_061')
         asset_end = modis_asset.end_date if modis_asset else 'now'
 
         modis_veg = (ee.ImageCollection(
@@ -2455,9 +2877,7 @@ def calculate_baseline(aoi: ee.Geometry, start_date: str, end_date: str,
         'cgls_ground_cover', start_date, end_date
     )
     if valid:
-        cgls_asset = GEEAsset.objects.filter(
-            key='cgls_ground_cover'
-        ).first()
+        cgls_asset = GEEAsset.get_by_key('cgls_ground_cover')
         asset_end = cgls_asset.end_date if cgls_asset else 'now'
 
         cgls = (ee.ImageCollection(
@@ -2893,9 +3313,9 @@ def calculate_baci(
     selected_geos = selected_geos.merge(
         ee.FeatureCollection(features_geo)
     )
-    select_names = communities.filterBounds(selected_geos).distinct(
-        ['Name']
-    ).reduceColumns(ee.Reducer.toList(), ['Name']).getInfo()['list']
+    select_names = get_community_names(
+        communities, selected_geos, locations=locations
+    )
     select_geo = communities.filter(
         ee.Filter.inList('Name', select_names)
     )
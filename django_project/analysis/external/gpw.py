@@ -8,10 +8,10 @@ Africa Rangeland Watch (ARW).
 import ee
 import datetime
 from dateutil.relativedelta import relativedelta
-from functools import reduce
+from functools import partial, reduce
 
 from analysis.models import Indicator, GEEAsset
-from analysis.utils import split_dates_by_year
+from analysis.utils import get_info_concurrently, split_dates_by_year
 
 
 def _build_gpw_annual_images(variable, start_date, test_years):
@@ -37,7 +37,7 @@ def _build_gpw_annual_images(variable, start_date, test_years):
 
     date_ranges = split_dates_by_year(start_date, end_date)
 
-    gee_asset = GEEAsset.objects.filter(key=asset_key).first()
+    gee_asset = GEEAsset.get_by_key(asset_key)
     if not gee_asset:
         raise ValueError(f'GEEAsset with key {asset_key} not found.')
 
@@ -121,44 +121,54 @@ def gpw_annual_temporal_analysis(
     to_plot = to_plot_ts.filter(ee.Filter.inList('date', date_list_ee))
 
     return analysis_cache.create_analysis_cache(
-        (to_plot.getInfo(), to_plot_ts.getInfo())
+        get_info_concurrently(to_plot, to_plot_ts)
     )
 
 
-def gpw_spatial_analysis_dict(
+def gpw_spatial_layer_builders(
     countries,
     start_date: datetime.date = None, end_date: datetime.date = None
 ):
     """
-    Create a dictionary for GPW spatial analysis.
+    Create a dictionary of GPW spatial layer builders.
 
     :param start_date: Start date for the analysis.
     :param end_date: End date for the analysis.
-    :return: Dictionary with analysis parameters.
+    :return: Dictionary of layer name to callable building the layer.
     """
     if not start_date:
         start_date = datetime.date(2000, 1, 1)
     if not end_date:
         end_date = datetime.date.today()
 
-    # Probabilities of Cultivated Grassland
-    prob_cultivated_grassland = ee.ImageCollection(
-        GEEAsset.fetch_asset_source('prob_cultivated_grassland')
-    ).filterDate(
-        start_date.isoformat(), end_date.isoformat()
-    ).select('probability').filterBounds(countries)
-    prob_cultivated_grassland = prob_cultivated_grassland.mean()
-
-    prob_natural_semi_grassland = ee.ImageCollection(
-        GEEAsset.fetch_asset_source('prob_natural_semi_grassland')
-    ).filterDate(
-        start_date.isoformat(), end_date.isoformat()
-    ).select('probability').filterBounds(countries)
-    prob_natural_semi_grassland = prob_natural_semi_grassland.mean()
+    def _get_probability(asset_key):
+        return ee.ImageCollection(
+            GEEAsset.fetch_asset_source(asset_key)
+        ).filterDate(
+            start_date.isoformat(), end_date.isoformat()
+        ).select('probability').filterBounds(countries).mean()
 
     return {
-        'Probabilities of Cultivated Grasslands': prob_cultivated_grassland,
-        'Probabilities of Natural/Semi-Natural Grasslands': (
-            prob_natural_semi_grassland
+        # Probabilities of Cultivated Grassland
+        'Probabilities of Cultivated Grasslands': partial(
+            _get_probability, 'prob_cultivated_grassland'
+        ),
+        'Probabilities of Natural/Semi-Natural Grasslands': partial(
+            _get_probability, 'prob_natural_semi_grassland'
         )
     }
+
+
+def gpw_spatial_analysis_dict(
+    countries,
+    start_date: datetime.date = None, end_date: datetime.date = None
+):
+    """
+    Create a dictionary for GPW spatial analysis.
+
+    :param start_date: Start date for the analysis.
+    :param end_date: End date for the analysis.
+    :return: Dictionary with analysis parameters.
+    """
+    builders = gpw_spatial_layer_builders(countries, start_date, end_date)
+    return {name: builder() for name, builder in builders.items()}
@@ -10,7 +10,7 @@ import ee
 from dateutil.relativedelta import relativedelta
 
 from analysis.models import UserIndicator, UserGEEAsset, GEEAssetType
-from analysis.utils import split_dates
+from analysis.utils import get_info_concurrently, split_dates
 
 
 def _build_aggregated_images(
@@ -35,9 +35,7 @@ def _build_aggregated_images(
     # Use the first asset key
     asset_key = asset_keys[0]
 
-    gee_asset: UserGEEAsset = UserGEEAsset.objects.filter(
-        key=asset_key, created_by=user
-    ).first()
+    gee_asset: UserGEEAsset = UserGEEAsset.get_by_key(asset_key, user)
     if not gee_asset:
         raise ValueError(
             f'GEEAsset with key {asset_key} not found.'
@@ -174,10 +172,7 @@ def user_temporal_analysis(
     to_plot = to_plot_ts.filter(ee.Filter.inList('date', date_list_ee))
 
     return analysis_cache.create_analysis_cache(
-        (
-            to_plot.getInfo(),
-            to_plot_ts.getInfo()
-        )
+        get_info_concurrently(to_plot, to_plot_ts)
     )
 
 
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from analysis.analysis import AnalysisResultsCacheUtils
+
+
+class Command(BaseCommand):
+    """Command to show hit/miss counters of analysis results cache."""
+    help = 'Show hit/miss counters of each analysis results cache tier.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them.'
+        )
+
+    def handle(self, *args, **options):
+        stats = AnalysisResultsCacheUtils.get_stats()
+        for tier, counters in stats.items():
+            total = counters['hit'] + counters['miss']
+            ratio = (counters['hit'] / total * 100) if total else 0
+            self.stdout.write(
+                f"{tier}: {counters['hit']} hit, {counters['miss']} miss "
+                f"({ratio:.1f}% hit ratio)"
+            )
+        if options['reset']:
+            AnalysisResultsCacheUtils.reset_stats()
+            self.stdout.write('Counters have been reset.')
@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from analysis.temporal_statistics import (
+    add_empty_records,
+    compute_statistics
+)
+
+
+class Command(BaseCommand):
+    """Command to benchmark statistics of temporal analysis results."""
+    help = (
+        'Benchmark temporal statistics on synthetic monthly features '
+        '(default 10 years of 500 communities).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--communities', type=int, default=500,
+            help='Number of communities.'
+        )
+        parser.add_argument(
+            '--years', type=int, default=10,
+            help='Number of years with monthly records.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Number of repetitions to average.'
+        )
+
+    def generate_features(self, communities, years):
+        """Generate synthetic monthly features."""
+        rng = random.Random(0)
+        return [
+            {
+                'type': 'Feature',
+                'geometry': None,
+                'properties': {
+                    'Name': f'Community {community}',
+                    'year': year,
+                    'month': month,
+                    'date': 0,
+                    'Bare ground': rng.uniform(0, 100),
+                    'EVI': rng.random(),
+                    'NDVI': rng.random()
+                }
+            }
+            for community in range(communities)
+            for year in years
+            for month in range(1, 13)
+        ]
+
+    def timeit(self, func, repeat):
+        """Get average duration in seconds of the function."""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat
+
+    def handle(self, *args, **options):
+        years = list(range(2015, 2015 + options['years']))
+        features = self.generate_features(options['communities'], years)
+        self.stdout.write(
+            f'{len(features)} features of {options["communities"]} '
+            f'communities in {len(years)} years'
+        )
+
+        duration = self.timeit(
+            lambda: compute_statistics(features, years), options['repeat']
+        )
+        self.stdout.write(f'compute_statistics: {duration * 1000:.1f} ms')
+
+        # request one extra year without any record
+        duration = self.timeit(
+            lambda: add_empty_records(features, years + [years[-1] + 1]),
+            options['repeat']
+        )
+        self.stdout.write(f'add_empty_records: {duration * 1000:.1f} ms')
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.23 on 2025-10-20 08:12
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def fill_analysis_inputs_hash(apps, schema_editor):
+    """Fill digest of existing cache and drop the duplicated rows."""
+    AnalysisResultsCache = apps.get_model('analysis', 'AnalysisResultsCache')
+    seen = set()
+    duplicates = []
+    caches = AnalysisResultsCache.objects.only(
+        'id', 'analysis_inputs'
+    ).order_by('-created_at')
+    for cache in caches.iterator(chunk_size=500):
+        canonical = json.dumps(
+            cache.analysis_inputs,
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+        inputs_hash = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        if inputs_hash in seen:
+            duplicates.append(cache.id)
+            continue
+        seen.add(inputs_hash)
+        AnalysisResultsCache.objects.filter(id=cache.id).update(
+            analysis_inputs_hash=inputs_hash
+        )
+    AnalysisResultsCache.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0017_merge_20250909_0904'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresultscache',
+            name='analysis_inputs_hash',
+            field=models.CharField(blank=True, help_text='SHA256 digest of the sorted analysis inputs.', max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            fill_analysis_inputs_hash, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='analysisresultscache',
+            name='analysis_inputs_hash',
+            field=models.CharField(blank=True, help_text='SHA256 digest of the sorted analysis inputs.', max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='analysisresultscache',
+            name='expired_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
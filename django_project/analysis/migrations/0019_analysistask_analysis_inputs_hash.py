@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2025-10-21 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0018_analysisresultscache_analysis_inputs_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysistask',
+            name='analysis_inputs_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA256 digest of the analysis cache inputs, used to share identical in-flight submissions.', max_length=64, null=True),
+        ),
+    ]
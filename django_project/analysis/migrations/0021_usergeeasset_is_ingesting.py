@@ -0,0 +1,40 @@
+# Generated by Django 4.2.23 on 2025-10-28 02:15
+
+from django.db import migrations, models
+
+FINAL_INGESTION_STATUS = ['COMPLETED', 'FAILED', 'CANCELLED', 'UNKNOWN']
+
+
+def fill_is_ingesting(apps, schema_editor):
+    """Mark assets that still have running ingestion tasks."""
+    UserGEEAsset = apps.get_model('analysis', 'UserGEEAsset')
+    ingesting_ids = []
+    assets = UserGEEAsset.objects.filter(
+        ingestion_status__isnull=False
+    ).only('id', 'ingestion_status')
+    for asset in assets.iterator(chunk_size=500):
+        for item in (asset.ingestion_status or {}).values():
+            if item.get('status', 'UNKNOWN') not in FINAL_INGESTION_STATUS:
+                ingesting_ids.append(asset.id)
+                break
+    UserGEEAsset.objects.filter(id__in=ingesting_ids).update(
+        is_ingesting=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0020_analysisrasteroutput_gee_task_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usergeeasset',
+            name='is_ingesting',
+            field=models.BooleanField(db_index=True, default=False, help_text='Whether the GEE ingestion tasks are still checked by sweep_ingestor_asset_status.'),
+        ),
+        migrations.RunPython(
+            fill_is_ingesting, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2025-11-04 06:25
+
+import django.contrib.gis.db.models.fields
+from django.contrib.gis.db.models import Func, GeometryField
+from django.contrib.gis.db.models.functions import Transform
+from django.db import migrations
+
+# Size in meters of the vector tile grid at zoom 0 (extent 4096)
+TILE_GRID_SIZE = 40075016.68557849 / 4096
+
+
+def fill_tile_geometries(apps, schema_editor):
+    """Fill simplified web mercator geometries of existing communities."""
+    LandscapeCommunity = apps.get_model('analysis', 'LandscapeCommunity')
+    geometry = Transform('geometry', 3857)
+    LandscapeCommunity.objects.update(
+        geometry_3857=geometry,
+        geometry_3857_z5=Func(
+            geometry, TILE_GRID_SIZE / (2 ** 5),
+            function='ST_SimplifyPreserveTopology',
+            output_field=GeometryField(srid=3857)
+        ),
+        geometry_3857_z9=Func(
+            geometry, TILE_GRID_SIZE / (2 ** 9),
+            function='ST_SimplifyPreserveTopology',
+            output_field=GeometryField(srid=3857)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0021_usergeeasset_is_ingesting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landscapecommunity',
+            name='geometry_3857',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, help_text='Geometry in web mercator for vector tiles.', null=True, srid=3857),
+        ),
+        migrations.AddField(
+            model_name='landscapecommunity',
+            name='geometry_3857_z5',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, help_text='Simplified geometry in web mercator up to zoom 5.', null=True, srid=3857),
+        ),
+        migrations.AddField(
+            model_name='landscapecommunity',
+            name='geometry_3857_z9',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, help_text='Simplified geometry in web mercator up to zoom 9.', null=True, srid=3857),
+        ),
+        migrations.RunPython(
+            fill_tile_geometries, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.23 on 2025-11-10 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0022_landscapecommunity_geometry_3857'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisPayload',
+            fields=[
+                ('digest', models.CharField(help_text='SHA256 digest of the JSON content.', max_length=64, primary_key=True, serialize=False)),
+                ('content', models.BinaryField(help_text='Zstandard compressed JSON content.')),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Size of the uncompressed JSON content in bytes.')),
+                ('compressed_size', models.PositiveBigIntegerField(default=0, help_text='Size of the compressed content in bytes.')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of records referencing the payload.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='analysisresultscache',
+            name='results_payload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analysis.analysispayload'),
+        ),
+        migrations.AddField(
+            model_name='analysistask',
+            name='result_payload',
+            field=models.ForeignKey(blank=True, help_text='Result of the analysis task.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analysis.analysispayload'),
+        ),
+        migrations.AddField(
+            model_name='useranalysisresults',
+            name='results_payload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analysis.analysispayload'),
+        ),
+        migrations.RenameField(
+            model_name='useranalysisresults',
+            old_name='analysis_results',
+            new_name='analysis_metadata',
+        ),
+        migrations.AlterField(
+            model_name='useranalysisresults',
+            name='analysis_metadata',
+            field=models.JSONField(blank=True, help_text='Analysis results without the results, e.g. data.', null=True),
+        ),
+    ]
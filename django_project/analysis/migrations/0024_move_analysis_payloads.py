@@ -0,0 +1,124 @@
+# Generated by Django 4.2.23 on 2025-11-10 03:14
+
+import hashlib
+import json
+
+import zstandard
+from django.db import migrations, models
+
+COMPRESSION_LEVEL = 9
+
+
+def acquire_payload(AnalysisPayload, value):
+    """Store value to AnalysisPayload and add a reference to it."""
+    if value is None:
+        return None
+    content = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    updated = AnalysisPayload.objects.filter(digest=digest).update(
+        ref_count=models.F('ref_count') + 1
+    )
+    if not updated:
+        compressed = zstandard.ZstdCompressor(
+            level=COMPRESSION_LEVEL
+        ).compress(content)
+        AnalysisPayload.objects.create(
+            digest=digest,
+            content=compressed,
+            size=len(content),
+            compressed_size=len(compressed),
+            ref_count=1
+        )
+    return digest
+
+
+def load_payload(AnalysisPayload, digest):
+    """Load value of AnalysisPayload."""
+    if not digest:
+        return None
+    payload = AnalysisPayload.objects.get(digest=digest)
+    return json.loads(
+        zstandard.ZstdDecompressor().decompress(bytes(payload.content))
+    )
+
+
+def move_to_payloads(apps, schema_editor):
+    """Move analysis results to AnalysisPayload."""
+    AnalysisPayload = apps.get_model('analysis', 'AnalysisPayload')
+    AnalysisTask = apps.get_model('analysis', 'AnalysisTask')
+    AnalysisResultsCache = apps.get_model('analysis', 'AnalysisResultsCache')
+    UserAnalysisResults = apps.get_model('analysis', 'UserAnalysisResults')
+
+    tasks = AnalysisTask.objects.filter(result__isnull=False)
+    for task in tasks.iterator(chunk_size=100):
+        task.result_payload_id = acquire_payload(AnalysisPayload, task.result)
+        task.save(update_fields=['result_payload'])
+
+    caches = AnalysisResultsCache.objects.filter(
+        analysis_results__isnull=False
+    )
+    for cache in caches.iterator(chunk_size=100):
+        cache.results_payload_id = acquire_payload(
+            AnalysisPayload, cache.analysis_results
+        )
+        cache.save(update_fields=['results_payload'])
+
+    user_results = UserAnalysisResults.objects.filter(
+        analysis_metadata__has_key='results'
+    )
+    for user_result in user_results.iterator(chunk_size=100):
+        metadata = dict(user_result.analysis_metadata)
+        user_result.results_payload_id = acquire_payload(
+            AnalysisPayload, metadata.pop('results')
+        )
+        user_result.analysis_metadata = metadata
+        user_result.save(
+            update_fields=['results_payload', 'analysis_metadata']
+        )
+
+
+def move_from_payloads(apps, schema_editor):
+    """Move analysis results back from AnalysisPayload."""
+    AnalysisPayload = apps.get_model('analysis', 'AnalysisPayload')
+    AnalysisTask = apps.get_model('analysis', 'AnalysisTask')
+    AnalysisResultsCache = apps.get_model('analysis', 'AnalysisResultsCache')
+    UserAnalysisResults = apps.get_model('analysis', 'UserAnalysisResults')
+
+    tasks = AnalysisTask.objects.filter(result_payload__isnull=False)
+    for task in tasks.iterator(chunk_size=100):
+        task.result = load_payload(AnalysisPayload, task.result_payload_id)
+        task.save(update_fields=['result'])
+
+    caches = AnalysisResultsCache.objects.filter(
+        results_payload__isnull=False
+    )
+    for cache in caches.iterator(chunk_size=100):
+        cache.analysis_results = load_payload(
+            AnalysisPayload, cache.results_payload_id
+        )
+        cache.save(update_fields=['analysis_results'])
+
+    user_results = UserAnalysisResults.objects.filter(
+        results_payload__isnull=False
+    )
+    for user_result in user_results.iterator(chunk_size=100):
+        metadata = dict(user_result.analysis_metadata or {})
+        metadata['results'] = load_payload(
+            AnalysisPayload, user_result.results_payload_id
+        )
+        user_result.analysis_metadata = metadata
+        user_result.results_payload_id = None
+        user_result.save(
+            update_fields=['results_payload', 'analysis_metadata']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0023_analysispayload'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_to_payloads, move_from_payloads),
+    ]
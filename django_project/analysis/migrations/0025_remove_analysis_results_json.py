@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2025-11-10 03:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0024_move_analysis_payloads'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='analysisresultscache',
+            name='analysis_results',
+        ),
+        migrations.RemoveField(
+            model_name='analysistask',
+            name='result',
+        ),
+    ]
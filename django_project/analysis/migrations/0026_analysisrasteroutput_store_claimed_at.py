@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2025-11-12 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0025_remove_analysis_results_json'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisrasteroutput',
+            name='store_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of times the store task of the export is queued.'),
+        ),
+        migrations.AddField(
+            model_name='analysisrasteroutput',
+            name='store_claimed_at',
+            field=models.DateTimeField(blank=True, help_text='Time when the finished export is claimed to be stored.', null=True),
+        ),
+    ]
@@ -1,15 +1,25 @@
 import json
+import logging
+import threading
+import time
 import uuid
 
 import ee
 import calendar
 import datetime
+import hashlib
 from typing import Tuple
+
+import zstandard
+from django.apps import apps
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.gis.db import models
+from django.contrib.gis.db.models.functions import Transform
 from django.contrib.gis.geos import GEOSGeometry
-from django.db.models.signals import pre_delete
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
 from django.conf import settings
 from django.urls import reverse
@@ -18,8 +28,17 @@ from django.core.exceptions import ValidationError
 
 
 from core.models import TaskStatus
+from core.vector_tile import TILE_EXTENT, WEB_MERCATOR_MAX
 from alerts.models import Indicator
 
+logger = logging.getLogger(__name__)
+
+
+class SimplifyPreserveTopology(models.Func):
+    """Simplify geometry without making it invalid."""
+
+    function = 'ST_SimplifyPreserveTopology'
+
 
 class InterventionArea(models.Model):
     """Model to represent a geographic or intervention area."""
@@ -255,6 +274,9 @@ class Landscape(models.Model):
                     "geometry": geometry
                 }
             )
+        LandscapeCommunity.update_tile_geometries(
+            LandscapeCommunity.objects.filter(landscape=self)
+        )
 
 
 class LandscapeCommunity(models.Model):
@@ -281,6 +303,28 @@ class LandscapeCommunity(models.Model):
     geometry = models.GeometryField(
         srid=4326, help_text="Geometry of community."
     )
+    geometry_3857 = models.GeometryField(
+        srid=3857, null=True, blank=True,
+        help_text="Geometry in web mercator for vector tiles."
+    )
+    geometry_3857_z5 = models.GeometryField(
+        srid=3857, null=True, blank=True,
+        help_text="Simplified geometry in web mercator up to zoom 5."
+    )
+    geometry_3857_z9 = models.GeometryField(
+        srid=3857, null=True, blank=True,
+        help_text="Simplified geometry in web mercator up to zoom 9."
+    )
+
+    # Geometry field of vector tiles by zoom band, as (max zoom, field)
+    TILE_GEOMETRY_BANDS = (
+        (5, 'geometry_3857_z5'),
+        (9, 'geometry_3857_z9'),
+        (None, 'geometry_3857'),
+    )
+    # Size in meters of the vector tile grid at zoom 0
+    TILE_GRID_SIZE = 2 * WEB_MERCATOR_MAX / TILE_EXTENT
+    TILE_VERSION_CACHE_KEY = 'landscape-community-tile-version'
 
     class Meta:
         verbose_name_plural = "Landscape Communities"
@@ -290,6 +334,89 @@ class LandscapeCommunity(models.Model):
         """Return string representation of LandscapeArea."""
         return self.community_name or "Unknown"
 
+    @classmethod
+    def get_tile_geometry_field(cls, zoom: int):
+        """Get geometry field of vector tile on the zoom."""
+        for max_zoom, field in cls.TILE_GEOMETRY_BANDS:
+            if max_zoom is None or zoom <= max_zoom:
+                return field
+
+    @classmethod
+    def update_tile_geometries(cls, queryset=None):
+        """Rebuild simplified web mercator geometries of vector tiles.
+
+        Geometries are simplified by the tile grid size at the max zoom
+        of the band, so the simplification is not visible in the tiles.
+        This is not run on save, call it after the communities are
+        created or changed in bulk.
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        geometry = Transform('geometry', 3857)
+        values = {}
+        for max_zoom, field in cls.TILE_GEOMETRY_BANDS:
+            if max_zoom is None:
+                values[field] = geometry
+            else:
+                values[field] = SimplifyPreserveTopology(
+                    geometry, cls.TILE_GRID_SIZE / (2 ** max_zoom),
+                    output_field=models.GeometryField(srid=3857)
+                )
+        queryset.update(**values)
+        cls.invalidate_tiles()
+
+    @classmethod
+    def get_tile_version(cls):
+        """Get version of the cached vector tiles."""
+        return cache.get_or_set(
+            cls.TILE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None
+        )
+
+    @classmethod
+    def invalidate_tiles(cls):
+        """Invalidate the cached vector tiles."""
+        try:
+            cache.set(
+                cls.TILE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None
+            )
+        except Exception as ex:
+            logger.warning(
+                f'Failed to invalidate landscape community tiles: {ex}'
+            )
+
+    @classmethod
+    def get_community_names(cls, geometry):
+        """Get distinct names of communities intersecting the geometry."""
+        return list(
+            cls.objects.filter(
+                geometry__intersects=geometry,
+                community_name__isnull=False
+            ).order_by('community_name').values_list(
+                'community_name', flat=True
+            ).distinct()
+        )
+
+    @classmethod
+    def is_fetched(cls, geometry):
+        """Check if communities of the landscapes of the geometry are fetched.
+
+        Each point or the whole geometry must be within a landscape and
+        every landscape intersecting it must have its communities.
+        """
+        landscapes = Landscape.objects.filter(bbox__intersects=geometry)
+        if landscapes.exclude(
+            models.Exists(cls.objects.filter(landscape=models.OuterRef('pk')))
+        ).exists():
+            return False
+        parts = (
+            list(geometry) if geometry.geom_type == 'MultiPoint' else
+            [geometry]
+        )
+        return all(
+            landscapes.filter(bbox__contains=part).exists()
+            for part in parts
+        )
+
 
 class AnalysisRasterOutput(models.Model):
     """Model that stores the raster output of an analysis."""
@@ -320,6 +447,22 @@ class AnalysisRasterOutput(models.Model):
     # temporalResolution, year, month, quarter,
     # locations, reference_layer, reference_layer_id
     analysis = models.JSONField(default=dict)
+    gee_task_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Earth Engine task ID of the export to Google Drive."
+    )
+    store_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Time when the finished export is claimed to be stored."
+    )
+    store_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of times the store task of the export is queued."
+    )
 
     def __str__(self):
         return self.name
@@ -425,8 +568,268 @@ def analysisrasteroutput_pre_delete(
     delete_gdrive_file(f'{str(instance.uuid)}.tiff')
 
 
-class UserAnalysisResults(models.Model):
-    """Model to store user analysis results."""
+class AnalysisPayload(models.Model):
+    """Compressed JSON payload addressed by the digest of its content.
+
+    Identical payloads of analysis tasks, caches and user results are
+    stored once and deleted when they are no longer referenced.
+    """
+
+    COMPRESSION_LEVEL = 9
+
+    digest = models.CharField(
+        max_length=64,
+        primary_key=True,
+        help_text='SHA256 digest of the JSON content.'
+    )
+    content = models.BinaryField(
+        help_text='Zstandard compressed JSON content.'
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Size of the uncompressed JSON content in bytes.'
+    )
+    compressed_size = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Size of the compressed content in bytes.'
+    )
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of records referencing the payload.'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def encode(value) -> bytes:
+        """Encode value to JSON bytes."""
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def acquire(cls, value):
+        """Store the value and add a reference to it.
+
+        :return: Digest of the payload, None if the value is None.
+        """
+        if value is None:
+            return None
+        content = cls.encode(value)
+        digest = hashlib.sha256(content).hexdigest()
+        increment = {'ref_count': models.F('ref_count') + 1}
+        with transaction.atomic():
+            if cls.objects.filter(digest=digest).update(**increment):
+                return digest
+            compressed = zstandard.ZstdCompressor(
+                level=cls.COMPRESSION_LEVEL
+            ).compress(content)
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        digest=digest,
+                        content=compressed,
+                        size=len(content),
+                        compressed_size=len(compressed),
+                        ref_count=1
+                    )
+            except IntegrityError:
+                # created by concurrent writer
+                cls.objects.filter(digest=digest).update(**increment)
+        return digest
+
+    @classmethod
+    def release(cls, digest):
+        """Remove a reference and delete the unreferenced payload."""
+        if not digest:
+            return
+        with transaction.atomic():
+            cls.objects.filter(digest=digest).update(
+                ref_count=models.F('ref_count') - 1
+            )
+            # single statement, concurrent acquire keeps the payload
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {cls._meta.db_table} '
+                    'WHERE digest = %s AND ref_count <= 0',
+                    [digest]
+                )
+
+    @classmethod
+    def recount_references(cls):
+        """Recount references from the models using PayloadModelMixin.
+
+        Queryset update, bulk_create and bulk_update do not acquire or
+        release the payloads, so the counts are corrected from the
+        referencing rows and the unreferenced payloads are deleted.
+        The payload table is locked against acquire and release while
+        the references are counted.
+
+        :return: Tuple of number of recounted and deleted payloads.
+        """
+        quote = connection.ops.quote_name
+        table = quote(cls._meta.db_table)
+        references = [
+            f'(SELECT COUNT(*) FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.get_field(field).column)} = '
+            f'{table}.digest)'
+            for model in apps.get_models()
+            if issubclass(model, PayloadModelMixin)
+            for field in model.PAYLOAD_FIELDS.values()
+        ]
+        count = ' + '.join(references) or '0'
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE'
+            )
+            cursor.execute(
+                f'UPDATE {table} SET ref_count = {count} '
+                f'WHERE ref_count <> {count}'
+            )
+            recounted = cursor.rowcount
+            cursor.execute(f'DELETE FROM {table} WHERE ref_count <= 0')
+            deleted = cursor.rowcount
+        return recounted, deleted
+
+    @staticmethod
+    def decode(content) -> object:
+        """Decode compressed JSON content."""
+        return json.loads(
+            zstandard.ZstdDecompressor().decompress(bytes(content))
+        )
+
+    @classmethod
+    def load(cls, digest):
+        """Load and decode the payload value."""
+        return cls.load_many([digest]).get(digest)
+
+    @classmethod
+    def load_many(cls, digests) -> dict:
+        """Load and decode payload values in a single query.
+
+        :return: Dictionary of digest to the value.
+        """
+        digests = set(filter(None, digests))
+        if not digests:
+            return {}
+        values = {
+            digest: cls.decode(content) for digest, content in
+            cls.objects.filter(
+                digest__in=digests
+            ).values_list('digest', 'content')
+        }
+        for digest in digests.difference(values):
+            logger.error(f'Analysis payload {digest} is not found.')
+        return values
+
+    def __str__(self):
+        return self.digest
+
+
+def payload_property(payload_field: str):
+    """Build property of JSON value stored in AnalysisPayload.
+
+    The value is decoded on first access and stored when the model
+    using PayloadModelMixin is saved.
+
+    :param payload_field: Name of the ForeignKey to AnalysisPayload.
+    """
+    def getter(self):
+        values = self.__dict__.setdefault('_payload_values', {})
+        digest = getattr(self, f'{payload_field}_id')
+        if payload_field in values:
+            value_digest, value = values[payload_field]
+            if (
+                payload_field in self._payload_changed or
+                value_digest == digest
+            ):
+                return value
+        value = AnalysisPayload.load(digest)
+        values[payload_field] = (digest, value)
+        return value
+
+    def setter(self, value):
+        values = self.__dict__.setdefault('_payload_values', {})
+        values[payload_field] = (None, value)
+        self._payload_changed.add(payload_field)
+
+    return property(getter, setter)
+
+
+class PayloadModelMixin:
+    """Mixin of model with JSON values stored in AnalysisPayload.
+
+    PAYLOAD_FIELDS maps the property name to the ForeignKey name.
+    """
+
+    PAYLOAD_FIELDS = {}
+
+    @property
+    def _payload_changed(self) -> set:
+        return self.__dict__.setdefault('_payload_changed_fields', set())
+
+    def save(self, *args, **kwargs):
+        changed = set(self._payload_changed)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = [
+                self.PAYLOAD_FIELDS.get(field, field)
+                for field in update_fields
+            ]
+            changed = changed.intersection(kwargs['update_fields'])
+        if not changed:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            released = []
+            for field in changed:
+                _, value = self._payload_values[field]
+                released.append(getattr(self, f'{field}_id'))
+                digest = AnalysisPayload.acquire(value)
+                setattr(self, f'{field}_id', digest)
+                self._payload_values[field] = (digest, value)
+            super().save(*args, **kwargs)
+            for digest in released:
+                AnalysisPayload.release(digest)
+        self._payload_changed.difference_update(changed)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_payload_values', None)
+        self.__dict__.pop('_payload_changed_fields', None)
+        super().refresh_from_db(*args, **kwargs)
+
+    @classmethod
+    def prefetch_payloads(cls, instances):
+        """Load payloads of the instances in a single query."""
+        instances = list(instances)
+        digests = [
+            getattr(instance, f'{field}_id')
+            for instance in instances
+            for field in cls.PAYLOAD_FIELDS.values()
+        ]
+        values = AnalysisPayload.load_many(digests)
+        for instance in instances:
+            payload_values = instance.__dict__.setdefault(
+                '_payload_values', {}
+            )
+            for field in cls.PAYLOAD_FIELDS.values():
+                if field in instance._payload_changed:
+                    continue
+                digest = getattr(instance, f'{field}_id')
+                payload_values[field] = (digest, values.get(digest))
+
+    def release_payloads(self):
+        """Remove references of the deleted record."""
+        for field in self.PAYLOAD_FIELDS.values():
+            AnalysisPayload.release(getattr(self, f'{field}_id'))
+
+
+class UserAnalysisResults(PayloadModelMixin, models.Model):
+    """Model to store user analysis results.
+
+    The results are stored in AnalysisPayload, the rest of the analysis
+    results (e.g. the analysis inputs in data) is kept in
+    analysis_metadata to be queried.
+    """
+
+    PAYLOAD_FIELDS = {'results': 'results_payload'}
 
     created_by = models.ForeignKey(
         User,
@@ -434,10 +837,19 @@ class UserAnalysisResults(models.Model):
         null=True,
         blank=True
     )
-    analysis_results = models.JSONField(
+    analysis_metadata = models.JSONField(
         null=True,
-        blank=True
+        blank=True,
+        help_text='Analysis results without the results, e.g. data.'
+    )
+    results_payload = models.ForeignKey(
+        AnalysisPayload,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='+'
     )
+    results = payload_property('results_payload')
     created_at = models.DateTimeField(auto_now_add=True)
     source = models.CharField(
         max_length=255,
@@ -467,8 +879,37 @@ class UserAnalysisResults(models.Model):
         help_text="Description of the analysis result."
     )
 
+    @property
+    def analysis_results(self):
+        """Analysis results with the results decoded from the payload."""
+        results = self.results
+        if self.analysis_metadata is None and results is None:
+            return None
+        analysis_results = dict(self.analysis_metadata or {})
+        if results is not None:
+            analysis_results['results'] = results
+        return analysis_results
+
+    @analysis_results.setter
+    def analysis_results(self, value):
+        if isinstance(value, dict):
+            value = dict(value)
+            self.results = value.pop('results', None)
+        else:
+            self.results = None
+        self.analysis_metadata = value
+
     @property
     def rasters(self):
+        return self.get_rasters()
+
+    def get_rasters(self, layers=None):
+        """Get raster outputs with their COG url and bounds.
+
+        :param layers: Dictionary of output uuid string to the raster
+            Layer, e.g. from get_raster_layers. When None, the layer is
+            queried for each output.
+        """
         results = []
         for item in self.raster_outputs.all():
             result = {
@@ -480,10 +921,13 @@ class UserAnalysisResults(models.Model):
                 "url": None,
                 "bounds": None
             }
-            layer = Layer.objects.filter(
-                unique_id=item.uuid,
-                layer_type=LayerType.RASTER_TILE
-            ).first()
+            if layers is None:
+                layer = Layer.objects.filter(
+                    unique_id=item.uuid,
+                    layer_type=LayerType.RASTER_TILE
+                ).first()
+            else:
+                layer = layers.get(str(item.uuid))
             if layer and item.status == 'COMPLETED':
                 result['url'] = self._make_cog_url(layer.unique_id)
                 metadata = layer.metadata or {}
@@ -492,6 +936,27 @@ class UserAnalysisResults(models.Model):
             results.append(result)
         return results
 
+    @staticmethod
+    def get_raster_layers(analysis_results):
+        """Query raster layers of the outputs in a single query.
+
+        :param analysis_results: List of UserAnalysisResults, the
+            raster_outputs should be prefetched.
+        :return: Dictionary of output uuid string to the raster Layer.
+        """
+        uuids = {
+            item.uuid
+            for analysis_result in analysis_results
+            for item in analysis_result.raster_outputs.all()
+        }
+        if not uuids:
+            return {}
+        layers = Layer.objects.filter(
+            unique_id__in=uuids,
+            layer_type=LayerType.RASTER_TILE
+        )
+        return {str(layer.unique_id): layer for layer in layers}
+
     def _make_cog_url(self, layer_uuid: str):
         base_url = settings.DJANGO_BACKEND_URL
         if base_url.endswith('/'):
@@ -597,12 +1062,19 @@ class UserAnalysisResults(models.Model):
     def save(self, *args, **kwargs):
         if not self.pk:
             data = (
-                self.analysis_results.get('data', {}) if
-                self.analysis_results else {}
+                self.analysis_metadata.get('data', {}) if
+                isinstance(self.analysis_metadata, dict) else {}
             )
             # set name and description
             self.name = self.name or self._get_name(data)
             self.description = self.description or self._get_description(data)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'analysis_results' in update_fields:
+            # analysis_results is stored in analysis_metadata and payload
+            kwargs['update_fields'] = [
+                field for field in update_fields
+                if field != 'analysis_results'
+            ] + ['analysis_metadata', 'results']
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -670,6 +1142,77 @@ class GEEAssetType:
             )
 
 
+class GEEAssetRegistry:
+    """In-memory registry of GEE assets that is shared in the process.
+
+    Assets are loaded per model and scope (user) on first lookup. Changes
+    to the assets bump a version key in redis, other processes check the
+    version at most every VERSION_CHECK_INTERVAL seconds. Missing key
+    reloads its scope, so newly created asset is found immediately.
+    """
+
+    VERSION_CACHE_KEY = 'gee-asset-registry-version'
+    VERSION_CHECK_INTERVAL = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._version = None
+        self._checked_at = None
+
+    def _check_version(self):
+        """Clear the registry when the version in redis is changed."""
+        now = time.monotonic()
+        if (
+            self._checked_at is not None and
+            now - self._checked_at < self.VERSION_CHECK_INTERVAL
+        ):
+            return
+        self._checked_at = now
+        try:
+            version = cache.get(self.VERSION_CACHE_KEY)
+        except Exception as ex:
+            logger.warning(f'Failed to get GEE asset registry version: {ex}')
+            version = None
+        if version != self._version:
+            self._assets = {}
+            self._version = version
+
+    def get(self, model, asset_key: str, scope=None, queryset=None):
+        """Get asset by its key within the scope."""
+        if queryset is None:
+            queryset = model.objects.all()
+        if not settings.GEE_ASSET_REGISTRY_ENABLED:
+            return queryset.filter(key=asset_key).first()
+
+        registry_key = (model._meta.label, scope)
+        with self._lock:
+            self._check_version()
+            assets = self._assets.get(registry_key)
+            if assets is None or asset_key not in assets:
+                assets = {}
+                for asset in queryset.order_by('id'):
+                    assets.setdefault(asset.key, asset)
+                self._assets[registry_key] = assets
+            return assets.get(asset_key)
+
+    def invalidate(self):
+        """Clear the registry in all processes."""
+        with self._lock:
+            self._assets = {}
+            self._version = uuid.uuid4().hex
+            self._checked_at = time.monotonic()
+        try:
+            cache.set(self.VERSION_CACHE_KEY, self._version, timeout=None)
+        except Exception as ex:
+            logger.warning(
+                f'Failed to update GEE asset registry version: {ex}'
+            )
+
+
+gee_asset_registry = GEEAssetRegistry()
+
+
 class BaseGEEAsset(models.Model):
     """Base model to store the GEE Asset that is used in the analysis."""
 
@@ -706,28 +1249,31 @@ class BaseGEEAsset(models.Model):
         return end_date_str
 
     @classmethod
-    def fetch_asset_source(cls, asset_key: str) -> str:
-        """Fetch asset source by its key."""
-        asset = cls.objects.filter(key=asset_key).first()
-        if asset is None:
-            raise KeyError(f'Asset with key {asset_key} not found!')
-        return asset.source
+    def get_by_key(cls, asset_key: str):
+        """Get asset by its key from the asset registry."""
+        return gee_asset_registry.get(cls, asset_key)
 
     @classmethod
-    def fetch_asset_metadata(cls, asset_key: str) -> str:
-        """Fetch asset metadata by its key."""
-        asset = cls.objects.filter(key=asset_key).first()
+    def _get_asset(cls, asset_key: str, *args):
+        """Get asset by its key or raise KeyError."""
+        asset = cls.get_by_key(asset_key, *args)
         if asset is None:
             raise KeyError(f'Asset with key {asset_key} not found!')
-        return asset.metadata
+        return asset
 
     @classmethod
-    def is_date_within_asset_period(cls, asset_key: str, date: str) -> bool:
-        """Check if the given date is within the asset's start and end date."""
-        asset = cls.objects.filter(key=asset_key).first()
-        if asset is None:
-            raise KeyError(f'Asset with key {asset_key} not found!')
+    def fetch_asset_source(cls, asset_key: str, *args) -> str:
+        """Fetch asset source by its key."""
+        return cls._get_asset(asset_key, *args).source
+
+    @classmethod
+    def fetch_asset_metadata(cls, asset_key: str, *args) -> str:
+        """Fetch asset metadata by its key."""
+        return cls._get_asset(asset_key, *args).metadata
 
+    @staticmethod
+    def _is_date_within_period(asset, date: str) -> bool:
+        """Check if the given date is within the asset's period."""
         start_date = asset.start_date
         end_date = asset.end_date
 
@@ -738,23 +1284,28 @@ class BaseGEEAsset(models.Model):
         # compare only the year
         return int(start_date[:4]) <= int(date[:4]) <= int(end_date[:4])
 
+    @classmethod
+    def is_date_within_asset_period(
+        cls, asset_key: str, date: str, *args
+    ) -> bool:
+        """Check if the given date is within the asset's start and end date."""
+        return cls._is_date_within_period(
+            cls._get_asset(asset_key, *args), date
+        )
+
     @classmethod
     def get_dates_within_asset_period(
-        cls, asset_key: str, start_date: str, end_date: str
+        cls, asset_key: str, start_date: str, end_date: str, *args
     ) -> Tuple[bool, str, str]:
         """Check and get given dates within asset's start and end date."""
-        valid_start_date = cls.is_date_within_asset_period(
-            asset_key,
-            start_date
-        )
-        valid_end_date = cls.is_date_within_asset_period(asset_key, end_date)
+        asset = cls._get_asset(asset_key, *args)
+        valid_start_date = cls._is_date_within_period(asset, start_date)
+        valid_end_date = cls._is_date_within_period(asset, end_date)
         if not valid_start_date and not valid_end_date:
             return (False, None, None,)
         elif valid_start_date and not valid_end_date:
-            asset = cls.objects.filter(key=asset_key).first()
             return (True, start_date, asset.end_date)
         elif not valid_start_date and valid_end_date:
-            asset = cls.objects.filter(key=asset_key).first()
             return (True, asset.start_date, end_date)
 
         return (True, start_date, end_date,)
@@ -777,33 +1328,68 @@ class GEEAsset(BaseGEEAsset):
         db_table = 'analysis_gee_asset'
 
 
-class AnalysisResultsCache(models.Model):
-    analysis_results = models.JSONField(
+class AnalysisResultsCache(PayloadModelMixin, models.Model):
+    PAYLOAD_FIELDS = {'analysis_results': 'results_payload'}
+
+    results_payload = models.ForeignKey(
+        AnalysisPayload,
+        on_delete=models.PROTECT,
         null=True,
-        blank=True
+        blank=True,
+        related_name='+'
     )
+    analysis_results = payload_property('results_payload')
     analysis_inputs = models.JSONField(
         null=True,
         blank=True
     )
+    analysis_inputs_hash = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='SHA256 digest of the sorted analysis inputs.'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
-    expired_at = models.DateTimeField(null=True, blank=True)
+    expired_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    @staticmethod
+    def get_inputs_hash(analysis_inputs):
+        """Get digest of the analysis inputs."""
+        from analysis.utils import get_nested_structure_digest
+        return get_nested_structure_digest(analysis_inputs)
+
+    @classmethod
+    def get_by_inputs_hash(cls, inputs_hash: str):
+        """Get non-expired AnalysisResultsCache by its inputs digest."""
+        return cls.objects.filter(
+            models.Q(expired_at__isnull=True) |
+            models.Q(expired_at__gt=timezone.now()),
+            analysis_inputs_hash=inputs_hash
+        ).first()
 
     @classmethod
     def save_cache_with_ttl(cls, ttl, **kwargs):
-        """Save AnalysisResultsCache with ttl."""
-        obj = AnalysisResultsCache.objects.create(**kwargs)
+        """Save or replace AnalysisResultsCache with ttl."""
         if ttl is None:
             # default to 1 hour
             ttl = 1
-        obj.expired_at = obj.created_at + timezone.timedelta(
+        inputs_hash = kwargs.pop('analysis_inputs_hash', None)
+        if inputs_hash is None:
+            inputs_hash = cls.get_inputs_hash(kwargs.get('analysis_inputs'))
+        kwargs['expired_at'] = timezone.now() + timezone.timedelta(
             hours=ttl
         )
-        obj.save()
+        obj, _ = AnalysisResultsCache.objects.update_or_create(
+            analysis_inputs_hash=inputs_hash,
+            defaults=kwargs
+        )
         return obj
 
 
-class AnalysisTask(models.Model):
+class AnalysisTask(PayloadModelMixin, models.Model):
+    PAYLOAD_FIELDS = {'result': 'result_payload'}
+
     analysis_inputs = models.JSONField(
         null=True,
         blank=True
@@ -833,16 +1419,95 @@ class AnalysisTask(models.Model):
         blank=True,
         help_text='Date and time when the task was completed.'
     )
-    result = models.JSONField(
+    result_payload = models.ForeignKey(
+        AnalysisPayload,
+        on_delete=models.PROTECT,
         null=True,
         blank=True,
+        related_name='+',
         help_text='Result of the analysis task.'
     )
+    result = payload_property('result_payload')
     error = models.JSONField(
         null=True,
         blank=True,
         help_text='Error message if the task failed.'
     )
+    analysis_inputs_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text=(
+            'SHA256 digest of the analysis cache inputs, '
+            'used to share identical in-flight submissions.'
+        )
+    )
+
+    IN_FLIGHT_MAX_AGE = datetime.timedelta(hours=2)
+    STATUS_CACHE_KEY_PREFIX = 'analysis-task-status'
+    STATUS_FIELDS = ['status', 'error', 'created_at', 'completed_at']
+
+    @classmethod
+    def get_status_cache_key(cls, task_id):
+        """Get cache key of the task status."""
+        return f'{cls.STATUS_CACHE_KEY_PREFIX}:{task_id}'
+
+    def publish_status(self):
+        """Push current status of the task to the cache.
+
+        Called on status transitions, so status polls do not query the
+        database.
+        """
+        try:
+            cache.set(
+                self.get_status_cache_key(self.id),
+                {field: getattr(self, field) for field in self.STATUS_FIELDS},
+                timeout=settings.ANALYSIS_TASK_STATUS_CACHE_TIMEOUT
+            )
+        except Exception as e:
+            logger.warning(
+                f'Failed to publish status of analysis task {self.id}: {e}'
+            )
+
+    @classmethod
+    def get_status(cls, task_id):
+        """Get status of the task from the cache or the status columns.
+
+        :return: Dictionary of STATUS_FIELDS or None if task is not found.
+        """
+        cache_key = cls.get_status_cache_key(task_id)
+        try:
+            status = cache.get(cache_key)
+        except Exception:
+            status = None
+        if status is not None:
+            return status
+
+        status = cls.objects.filter(id=task_id).values(
+            *cls.STATUS_FIELDS
+        ).first()
+        if status is not None:
+            try:
+                # do not override status published meanwhile
+                cache.add(
+                    cache_key, status,
+                    timeout=settings.ANALYSIS_TASK_STATUS_CACHE_TIMEOUT
+                )
+            except Exception:
+                pass
+        return status
+
+    @classmethod
+    def get_in_flight_task(cls, inputs_hash):
+        """Get pending/running task with the same analysis inputs."""
+        if not inputs_hash:
+            return None
+        return cls.objects.filter(
+            analysis_inputs_hash=inputs_hash,
+            status__in=[TaskStatus.PENDING, TaskStatus.RUNNING],
+            created_at__gte=timezone.now() - cls.IN_FLIGHT_MAX_AGE
+        ).order_by('-created_at').first()
 
     def get_indicator(self):
         variable = self.analysis_inputs['variable']
@@ -863,6 +1528,15 @@ class AnalysisTask(models.Model):
             return indicator
 
 
+@receiver(post_delete, sender=UserAnalysisResults)
+@receiver(post_delete, sender=AnalysisResultsCache)
+@receiver(post_delete, sender=AnalysisTask)
+def payload_model_post_delete(
+        sender, instance: PayloadModelMixin, *args, **kwargs):
+    """Release payloads of the deleted record."""
+    instance.release_payloads()
+
+
 class IndicatorSource(models.TextChoices):
     """Choices for the source of an indicator."""
 
@@ -1036,6 +1710,14 @@ class UserGEEAsset(BaseGEEAsset):
         blank=True,
         help_text="The status of GEE ingestion task."
     )
+    is_ingesting = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text=(
+            "Whether the GEE ingestion tasks are still checked by "
+            "sweep_ingestor_asset_status."
+        )
+    )
 
     def clean(self):
         super().clean()
@@ -1045,63 +1727,38 @@ class UserGEEAsset(BaseGEEAsset):
                 "Attribute 'band_names' is needed in metadata."
             )
 
+    @classmethod
+    def get_by_key(cls, asset_key: str, user: User):
+        """Get asset by its key and user from the asset registry."""
+        return gee_asset_registry.get(
+            cls, asset_key, scope=user.pk if user else None,
+            queryset=cls.objects.filter(created_by=user)
+        )
+
     @classmethod
     def fetch_asset_source(cls, asset_key: str, user: User) -> str:
         """Fetch asset source by its key and user."""
-        asset = cls.objects.filter(key=asset_key, created_by=user).first()
-        if asset is None:
-            raise KeyError(f'Asset with key {asset_key} not found!')
-        return asset.source
+        return super().fetch_asset_source(asset_key, user)
 
     @classmethod
     def fetch_asset_metadata(cls, asset_key: str, user: User) -> str:
         """Fetch asset metadata by its key."""
-        asset = cls.objects.filter(key=asset_key, created_by=user).first()
-        if asset is None:
-            raise KeyError(f'Asset with key {asset_key} not found!')
-        return asset.metadata
+        return super().fetch_asset_metadata(asset_key, user)
 
     @classmethod
     def is_date_within_asset_period(cls, asset_key: str,
                                     date: str, user: User) -> bool:
         """Check if the given date is within the asset's start and end date."""
-        asset = cls.objects.filter(key=asset_key, created_by=user).first()
-        if asset is None:
-            raise KeyError(f'Asset with key {asset_key} not found!')
-
-        start_date = asset.start_date
-        end_date = asset.end_date
-
-        if not start_date or not end_date:
-            raise ValueError(
-                'Asset metadata must contain start_date and end_date.'
-            )
-        # compare only the year
-        return int(start_date[:4]) <= int(date[:4]) <= int(end_date[:4])
+        return super().is_date_within_asset_period(asset_key, date, user)
 
     @classmethod
     def get_dates_within_asset_period(
         cls, asset_key: str, start_date: str, end_date: str, user: User
     ) -> Tuple[bool, str, str]:
         """Check and get given dates within asset's start and end date."""
-        valid_start_date = cls.is_date_within_asset_period(
-            asset_key,
-            start_date,
-            user
+        return super().get_dates_within_asset_period(
+            asset_key, start_date, end_date, user
         )
-        valid_end_date = cls.is_date_within_asset_period(
-            asset_key, end_date, user
-        )
-        if not valid_start_date and not valid_end_date:
-            return (False, None, None,)
-        elif valid_start_date and not valid_end_date:
-            asset = cls.objects.filter(key=asset_key, created_by=user).first()
-            return (True, start_date, asset.end_date)
-        elif not valid_start_date and valid_end_date:
-            asset = cls.objects.filter(key=asset_key, created_by=user).first()
-            return (True, asset.start_date, end_date)
-
-        return (True, start_date, end_date,)
 
     def get_running_ingestion_task_id(self):
         """Get the ID of the currently running ingestion task."""
@@ -1112,12 +1769,48 @@ class UserGEEAsset(BaseGEEAsset):
                 task_ids.append(task_id)
         return task_ids
 
+    def update_ingestion_status(self, status: dict) -> bool:
+        """Update ingestion status from the GEE task status.
+
+        :return: True if the status of the task is changed.
+        """
+        ingestion_status_dict = self.ingestion_status.get(status['id'])
+        if not ingestion_status_dict:
+            return False
+        error = status.get('error_message')
+        if (
+            ingestion_status_dict.get('status') == status['state'] and
+            ingestion_status_dict.get('error') == error
+        ):
+            return False
+        ingestion_status_dict['status'] = status['state']
+        ingestion_status_dict['error'] = error
+        return True
+
+    def is_ingestion_completed(self) -> bool:
+        """Check whether all ingestion tasks are completed."""
+        return all(
+            item.get('status') == 'COMPLETED'
+            for item in self.ingestion_status.values()
+        )
+
     class Meta:
         verbose_name_plural = 'User GEE Assets'
         db_table = 'analysis_user_gee_asset'
         unique_together = ('key', 'created_by')
 
 
+@receiver(post_save, sender=GEEAsset)
+@receiver(post_delete, sender=GEEAsset)
+@receiver(post_save, sender=UserGEEAsset)
+@receiver(post_delete, sender=UserGEEAsset)
+def gee_asset_post_change(sender, instance, *args, **kwargs):
+    """Refresh the GEE asset registry when the asset is changed."""
+    gee_asset_registry.invalidate()
+    # other processes may have reloaded the asset before commit
+    transaction.on_commit(gee_asset_registry.invalidate)
+
+
 class UserIndicator(BaseIndicator):
     name = models.CharField(
         max_length=255,
@@ -1175,9 +1868,9 @@ class UserIndicator(BaseIndicator):
             # Use the first asset key
             asset_key = asset_keys[0]
 
-            gee_asset: UserGEEAsset = UserGEEAsset.objects.filter(
-                key=asset_key, created_by=user
-            ).first()
+            gee_asset: UserGEEAsset = UserGEEAsset.get_by_key(
+                asset_key, user
+            )
             if not gee_asset:
                 continue
 
@@ -7,9 +7,7 @@ Africa Rangeland Watch (ARW).
 import typing
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from collections import OrderedDict
 from datetime import date
-from copy import deepcopy
 
 from core.models import Preferences
 from analysis.models import Indicator, IndicatorSource, AnalysisTask
@@ -23,6 +21,7 @@ from analysis.analysis import (
     validate_spatial_date_range_filter,
     UserIndicator
 )
+from analysis.temporal_statistics import add_empty_records, compute_statistics
 
 
 def _temporal_analysis(locations, analysis_dict, custom_geom):
@@ -259,116 +258,6 @@ class AnalysisRunner:
                     unique_dict[key] = item
             return list(unique_dict.values())
 
-        def add_empty_records(existing_records):
-            new_records = {}
-            for year in years:
-                has_record = len(
-                    list(
-                        filter(
-                            lambda x: x['properties']['year'] == year,
-                            existing_records
-                        )
-                    )
-                ) > 0
-                if not has_record:
-                    for record in existing_records:
-                        key = f'{record["properties"]["Name"]}-{year}'
-                        if key not in new_records:
-                            new_record = deepcopy(record)
-                            new_record['properties']['year'] = year
-                            new_record['properties']['Bare ground'] = None
-                            new_record['properties']['EVI'] = None
-                            new_record['properties']['NDVI'] = None
-                            new_records[key] = new_record
-            return new_records.values()
-
-        def add_statistics(features):
-            new_features = [
-                a['properties'] for a in filter(
-                    lambda x: x['properties']['year'] in years,
-                    features
-                )
-            ]
-
-            # Process data
-            aggregated = {}
-
-            for row in new_features:
-                name, year = row["Name"], int(row["year"])
-
-                # Convert numeric values
-                bare_ground = row["Bare ground"]
-                evi = row["EVI"]
-                ndvi = row["NDVI"]
-
-                key = (name, year)
-                if key not in aggregated:
-                    aggregated[key] = {
-                        "Bare ground": [],
-                        "EVI": [],
-                        "NDVI": []
-                    }
-
-                aggregated[key]["Bare ground"].append(bare_ground)
-                aggregated[key]["EVI"].append(evi)
-                aggregated[key]["NDVI"].append(ndvi)
-
-            # Compute min, max, and mean
-            results = {}
-            unprocessed_years = [y for y in years]
-            names = set()
-
-            for location_year, values in aggregated.items():
-                location, year = location_year
-                if year in unprocessed_years:
-                    unprocessed_years.remove(year)
-                names.add(location)
-                if year not in results:
-                    results[year] = {}
-                if location not in results[year]:
-                    results[year][location] = {}
-
-                for category, numbers in values.items():
-                    min_val = min(numbers)
-                    max_val = max(numbers)
-                    mean_val = sum(numbers) / len(numbers)
-                    results[year][location][category] = {
-                        'min': min_val,
-                        'max': max_val,
-                        'mean': mean_val
-                    }
-
-            empty_data = {
-                'Bare ground': {
-                    'min': None, 'max': None, 'mean': None
-                },
-                'EVI': {
-                    'min': None, 'max': None, 'mean': None
-                },
-                'NDVI': {
-                    'min': None, 'max': None, 'mean': None
-                },
-            }
-            for year in unprocessed_years:
-                for name in names:
-                    if results.get(year, None):
-                        results[year].update({
-                            name: empty_data
-                        })
-                    else:
-                        results[year] = {
-                            name: empty_data
-                        }
-
-            results = {
-                year: {
-                    name: OrderedDict(
-                        sorted(value.items())
-                    ) for name, value in sorted(group.items())
-                } for year, group in sorted(results.items())
-            }
-            return results
-
         output_results = []
         output_results.append(input_results[0][0])
         output_results.append(input_results[0][1])
@@ -377,7 +266,7 @@ class AnalysisRunner:
         )
 
         output_results[0]['features'].extend(
-            add_empty_records(output_results[1]['features'])
+            add_empty_records(output_results[1]['features'], years)
         )
         # add empty result if no data exist for certain year
         output_results[1]['features'] = merge_and_sort(
@@ -392,100 +281,15 @@ class AnalysisRunner:
             output_results[1]['features'],
             key=lambda x: x['properties']['date']
         )
-        output_results[0]['statistics'] = add_statistics(
-            output_results[1]['features']
+        output_results[0]['statistics'] = compute_statistics(
+            output_results[1]['features'], years
         )
 
         return output_results
 
     def add_statistics(self, years, features):
-        years = years if isinstance(years, list) else [years]
-        new_features = [
-            a['properties'] for a in filter(
-                lambda x: x['properties']['year'] in years,
-                features
-            )
-        ]
-
-        # Process data
-        aggregated = {}
-
-        for row in new_features:
-            name, year = row["Name"], int(row["year"])
-
-            # Convert numeric values
-            bare_ground = row["Bare ground"]
-            evi = row["EVI"]
-            ndvi = row["NDVI"]
-
-            key = (name, year)
-            if key not in aggregated:
-                aggregated[key] = {
-                    "Bare ground": [],
-                    "EVI": [],
-                    "NDVI": []
-                }
-
-            aggregated[key]["Bare ground"].append(bare_ground)
-            aggregated[key]["EVI"].append(evi)
-            aggregated[key]["NDVI"].append(ndvi)
-
-        # Compute min, max, and mean
-        results = {}
-        unprocessed_years = [y for y in years] \
-            if isinstance(years, list) else [years]
-        names = set()
-
-        for location_year, values in aggregated.items():
-            location, year = location_year
-            if year in unprocessed_years:
-                unprocessed_years.remove(year)
-            names.add(location)
-            if year not in results:
-                results[year] = {}
-            if location not in results[year]:
-                results[year][location] = {}
-
-            for category, numbers in values.items():
-                min_val = min(numbers)
-                max_val = max(numbers)
-                mean_val = sum(numbers) / len(numbers)
-                results[year][location][category] = {
-                    'min': min_val,
-                    'max': max_val,
-                    'mean': mean_val
-                }
-
-        empty_data = {
-            'Bare ground': {
-                'min': None, 'max': None, 'mean': None
-            },
-            'EVI': {
-                'min': None, 'max': None, 'mean': None
-            },
-            'NDVI': {
-                'min': None, 'max': None, 'mean': None
-            },
-        }
-        for year in unprocessed_years:
-            for name in names:
-                if results.get(year, None):
-                    results[year].update({
-                        name: empty_data
-                    })
-                else:
-                    results[year] = {
-                        name: empty_data
-                    }
-
-        results = {
-            year: {
-                name: OrderedDict(
-                    sorted(value.items())
-                ) for name, value in sorted(group.items())
-            } for year, group in sorted(results.items())
-        }
-        return results
+        """Add statistics of the features per year and community."""
+        return compute_statistics(features, years)
 
     def run_temporal_analysis(self, data, analysis_dict=None):
         """Run the temporal analysis."""
@@ -1,9 +1,29 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from .models import UserAnalysisResults
 
 
+class UserAnalysisResultsListSerializer(serializers.ListSerializer):
+    """List serializer that queries raster layers of all items at once."""
+
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, 'all') else data
+        items = list(iterable)
+        if self.child.load_results:
+            UserAnalysisResults.prefetch_payloads(items)
+        self.child.raster_layers = UserAnalysisResults.get_raster_layers(
+            items
+        )
+        try:
+            return super().to_representation(items)
+        finally:
+            self.child.raster_layers = None
+
+
 class UserAnalysisResultsSerializer(serializers.ModelSerializer):
+    # decoded from the analysis payload by the model
+    analysis_results = serializers.JSONField(required=False, allow_null=True)
     created_by = serializers.SerializerMethodField()
     dashboards = serializers.SerializerMethodField()
     raster_output_list = serializers.SerializerMethodField()
@@ -21,6 +41,24 @@ class UserAnalysisResultsSerializer(serializers.ModelSerializer):
             'name',
             'description'
         ]
+        list_serializer_class = UserAnalysisResultsListSerializer
+
+    # whether the results payload is serialized
+    load_results = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # raster layers of the list, set by the list serializer
+        self.raster_layers = None
+
+    @staticmethod
+    def setup_queryset(queryset):
+        """Prefetch relations of the queryset."""
+        return queryset.select_related(
+            'created_by'
+        ).prefetch_related(
+            'dashboards', 'raster_outputs'
+        )
 
     def get_created_by(self, obj):
         if obj.created_by:
@@ -38,4 +76,32 @@ class UserAnalysisResultsSerializer(serializers.ModelSerializer):
         return [{"id": d.uuid, "title": d.title} for d in obj.dashboards.all()]
 
     def get_raster_output_list(self, obj):
-        return obj.rasters
+        return obj.get_rasters(self.raster_layers)
+
+
+class UserAnalysisResultsSummarySerializer(UserAnalysisResultsSerializer):
+    """Lightweight serializer of analysis results for listings.
+
+    Only the analysis input (data) is returned in analysis_results,
+    so the results payload is not loaded. The full results are fetched
+    from the detail endpoint.
+    """
+
+    analysis_results = serializers.SerializerMethodField()
+    load_results = False
+
+    @staticmethod
+    def get_prefetch(lookup):
+        """Get Prefetch of analysis results relation for the summaries."""
+        return Prefetch(
+            lookup,
+            queryset=UserAnalysisResultsSummarySerializer.setup_queryset(
+                UserAnalysisResults.objects.all()
+            )
+        )
+
+    def get_analysis_results(self, obj):
+        metadata = obj.analysis_metadata
+        if not isinstance(metadata, dict):
+            return {'data': None}
+        return {'data': metadata.get('data')}
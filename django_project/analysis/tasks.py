@@ -4,6 +4,7 @@ Africa Rangeland Watch (ARW).
 
 .. note:: Background task for analysis
 """
+import datetime
 import typing
 import os
 from core.celery import app
@@ -16,12 +17,14 @@ import subprocess
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import F, Q
 from django.contrib.auth import get_user_model
 
 from cloud_native_gis.models.layer import Layer, LayerType
 from cloud_native_gis.models.layer_upload import LayerUpload
 from core.models import TaskStatus, Preferences
 from analysis.models import (
+    AnalysisPayload,
     AnalysisResultsCache,
     AnalysisRasterOutput,
     AnalysisTask,
@@ -32,7 +35,9 @@ from analysis.models import (
     IndicatorSource
 )
 from analysis.analysis import (
+    EXPORT_TASK_FINAL_STATES,
     export_image_to_drive,
+    get_task_statuses,
     initialize_engine_analysis, InputLayer,
     get_rel_diff, calculate_temporal_modis_veg,
     spatial_get_date_filter
@@ -44,13 +49,17 @@ from analysis.utils import (
     get_gdrive_file,
     delete_gdrive_file,
     get_cog_bounds,
+    is_cog_with_no_data,
     get_date_range_for_analysis
 )
-from layers.models import InputLayer as InputLayerFixture
+from layers.models import InputLayer as InputLayerFixture, ExportedCog
+from layers.tasks.export_nrt_cog import store_exported_cog_task
 from layers.utils import upload_file
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
+# no data value of the exported raster, see export_image_to_drive
+NO_DATA_VALUE = -9999
 
 
 def _get_indicator(raster_output: AnalysisRasterOutput):
@@ -62,7 +71,7 @@ def _get_indicator(raster_output: AnalysisRasterOutput):
         raise ValueError("No User Analysis Result found!")
 
     analysis_task: AnalysisTask = AnalysisTask.objects.filter(
-        analysis_inputs=user_analysis_result.analysis_results['data']
+        analysis_inputs=user_analysis_result.analysis_metadata['data']
     ).first()
     if not analysis_task:
         raise ValueError("No Analysis Task found!")
@@ -91,7 +100,7 @@ def _run_spatial_analysis(
     ).first()
 
     analysis_task: AnalysisTask = AnalysisTask.objects.filter(
-        analysis_inputs=user_analysis_result.analysis_results['data']
+        analysis_inputs=user_analysis_result.analysis_metadata['data']
     ).first()
     indicator = analysis_task.get_indicator()
 
@@ -127,38 +136,44 @@ def _get_bounds(raster_output):
     return communities.filterBounds(selected_geos)
 
 
-@app.task(name='store_spatial_analysis_raster_output')
-def store_spatial_analysis_raster_output(raster_output_id: int):
-    """Trigger task to store analysis raster output."""
-    raster_output = AnalysisRasterOutput.objects.get(uuid=raster_output_id)
-    # clear existing raster if exist in gdrive
-    delete_gdrive_file(raster_output.raster_filename)
-    raster_output.status = 'RUNNING'
-    raster_output.generate_start_time = timezone.now()
-    raster_output.save()
-
-    initialize_engine_analysis()
-
-    indicator = _get_indicator(raster_output)
-    aoi = _get_bounds(raster_output)
+def _get_spatial_vis_params(
+    indicator: typing.Union[UserIndicator, Indicator]
+):
+    """Get visualization parameters of spatial analysis raster."""
     if isinstance(indicator, UserIndicator) or\
         indicator.source == IndicatorSource.GPW:
         metadata = indicator.metadata
-        vis_params = {
+        return {
             'min': metadata['minValue'],
             'max': metadata['maxValue'],
             'palette': metadata['colors'],
             'opacity': metadata['opacity']
         }
-    else:
-        vis_params = {
-            'min': -25,
-            'max': 25,
-            'palette': ['#f9837b', '#fffcb9', '#fffcb9', '#32c2c8'],
-            'opacity': 0.7
-        }
-    image = _run_spatial_analysis(raster_output, indicator)
+    return {
+        'min': -25,
+        'max': 25,
+        'palette': ['#f9837b', '#fffcb9', '#fffcb9', '#32c2c8'],
+        'opacity': 0.7
+    }
+
+
+def _get_raster_output_vis_params(raster_output: AnalysisRasterOutput):
+    """Get visualization parameters of analysis raster output."""
+    if raster_output.analysis.get('analysisType') == 'Spatial':
+        return _get_spatial_vis_params(_get_indicator(raster_output))
+    return InputLayerFixture.objects.get(
+        name=raster_output.analysis.get('variable')
+    ).get_vis_params()
+
+
+def _submit_raster_output_export(
+    raster_output: AnalysisRasterOutput, image, aoi, vis_params
+):
+    """Submit export of raster output to Google Drive.
 
+    The export is checked by poll_gee_export_tasks, which triggers
+    store_raster_output_export once the export is finished.
+    """
     status = export_image_to_drive(
         image=image,
         description=raster_output.name,
@@ -166,28 +181,68 @@ def store_spatial_analysis_raster_output(raster_output_id: int):
         file_name_prefix=str(raster_output.uuid),
         scale=120,  # same with temporal calc result
         region=aoi.geometry(),
-        vis_params=vis_params
+        vis_params=vis_params,
+        wait=False
     )
+    raster_output.gee_task_id = status['id']
+    raster_output.status_logs = status
+    raster_output.save()
 
+
+@app.task(name='store_spatial_analysis_raster_output')
+def store_spatial_analysis_raster_output(raster_output_id: int):
+    """Trigger task to store analysis raster output."""
+    raster_output = AnalysisRasterOutput.objects.get(uuid=raster_output_id)
+    # clear existing raster if exist in gdrive
+    delete_gdrive_file(raster_output.raster_filename)
+    raster_output.status = 'RUNNING'
+    raster_output.gee_task_id = None
+    raster_output.generate_start_time = timezone.now()
+    raster_output.save()
+
+    initialize_engine_analysis()
+
+    indicator = _get_indicator(raster_output)
+    aoi = _get_bounds(raster_output)
+    vis_params = _get_spatial_vis_params(indicator)
+    image = _run_spatial_analysis(raster_output, indicator)
+
+    _submit_raster_output_export(raster_output, image, aoi, vis_params)
+
+
+@app.task(name='store_raster_output_export')
+def store_raster_output_export(raster_output_id, status: dict):
+    """Store the exported raster output from Google Drive as a layer."""
+    raster_output = AnalysisRasterOutput.objects.get(uuid=raster_output_id)
     final_status = status['state']
     size = 0
-    if final_status == 'COMPLETED':
-        # check exist and get size
-        gdrive_file = get_gdrive_file(raster_output.raster_filename)
-        if gdrive_file is None:
+    try:
+        if final_status == 'COMPLETED':
+            # check exist and get size
+            gdrive_file = get_gdrive_file(raster_output.raster_filename)
+            if gdrive_file is None:
+                final_status = 'FAILED'
+                status['gdrive_error'] = (
+                    f'File {raster_output.raster_filename} not found!'
+                )
+            else:
+                gdrive_file.FetchMetadata()
+                size = gdrive_file.get("fileSize", 0)
+                store_cog_as_layer(
+                    raster_output.uuid,
+                    raster_output.name,
+                    gdrive_file,
+                    metadata=_get_raster_output_vis_params(raster_output)
+                )
+        elif final_status != 'FAILED':
             final_status = 'FAILED'
-            status['gdrive_error'] = (
-                f'File {raster_output.raster_filename} not found!'
-            )
-        else:
-            gdrive_file.FetchMetadata()
-            size = gdrive_file.get("fileSize", 0)
-            store_cog_as_layer(
-                raster_output.uuid,
-                raster_output.name,
-                gdrive_file,
-                metadata=vis_params
-            )
+    except Exception as ex:
+        logger.error(
+            f'Failed to store raster output {raster_output_id}: {ex}',
+            exc_info=True
+        )
+        final_status = 'FAILED'
+        status['store_error'] = str(ex)
 
     raster_output.status = final_status
     raster_output.size = size
@@ -197,12 +252,19 @@ def store_spatial_analysis_raster_output(raster_output_id: int):
 
 
 def fix_no_data_value(working_dir, file_name):
-    """Fix no data value in the raster file."""
+    """Fix no data value in the raster file.
+
+    The file is kept as is when it is already a COG with the no data
+    value, otherwise it is translated to COG and the source is removed
+    right after the translation.
+    """
+    file_path = os.path.join(working_dir, file_name)
+    if is_cog_with_no_data(file_path, NO_DATA_VALUE):
+        return
     tmp_path = os.path.join(
         working_dir,
         f'{time.time()}_{file_name}'
     )
-    file_path = os.path.join(working_dir, file_name)
     # rename the file to tmp_path
     shutil.move(file_path, tmp_path)
     # use gdal to fix no data value
@@ -211,11 +273,14 @@ def fix_no_data_value(working_dir, file_name):
         '-of',
         'COG',
         '-a_nodata',
-        '-9999',
+        str(NO_DATA_VALUE),
         tmp_path,
         file_path
     ]
-    subprocess.run(cmd, check=True)
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        os.remove(tmp_path)
 
 
 def store_cog_as_layer(uuid, name, gdrive_file, metadata={}):
@@ -233,7 +298,10 @@ def store_cog_as_layer(uuid, name, gdrive_file, metadata={}):
     bounds = None
     with tempfile.TemporaryDirectory() as working_dir:
         file_path = f'{working_dir}/{gdrive_file["title"]}'
-        gdrive_file.GetContentFile(file_path)
+        # download in chunks to keep memory bounded
+        gdrive_file.GetContentFile(
+            file_path, chunksize=settings.GDRIVE_DOWNLOAD_CHUNK_SIZE
+        )
 
         # fix no data value
         fix_no_data_value(working_dir, gdrive_file["title"])
@@ -249,8 +317,8 @@ def store_cog_as_layer(uuid, name, gdrive_file, metadata={}):
                 }
             )
             layer_upload.emptying_folder()
-            # copy file to media folder for local testing
-            shutil.copy(
+            # move file to media folder for local testing
+            shutil.move(
                 file_path,
                 layer_upload.filepath(gdrive_file["title"])
             )
@@ -299,6 +367,7 @@ def generate_temporal_analysis_raster_output(raster_output_id):
     delete_gdrive_file(raster_output.raster_filename)
     temporal_resolution = raster_output.analysis.get('temporalResolution')
     raster_output.status = 'RUNNING'
+    raster_output.gee_task_id = None
     raster_output.generate_start_time = timezone.now()
     raster_output.save()
 
@@ -378,42 +447,10 @@ def generate_temporal_analysis_raster_output(raster_output_id):
             )
         ).first()
 
-    status = export_image_to_drive(
-        image=img,
-        description=raster_output.name,
-        folder='GEE_EXPORTS',
-        file_name_prefix=str(raster_output.uuid),
-        scale=120,  # same with temporal calc result
-        region=aoi.geometry(),
-        vis_params=input_layer_fixture.get_vis_params()
+    _submit_raster_output_export(
+        raster_output, img, aoi, input_layer_fixture.get_vis_params()
     )
 
-    final_status = status['state']
-    size = 0
-    if final_status == 'COMPLETED':
-        # check exist and get size
-        gdrive_file = get_gdrive_file(raster_output.raster_filename)
-        if gdrive_file is None:
-            final_status = 'FAILED'
-            status['gdrive_error'] = (
-                f'File {raster_output.raster_filename} not found!'
-            )
-        else:
-            gdrive_file.FetchMetadata()
-            size = gdrive_file.get("fileSize", 0)
-            store_cog_as_layer(
-                raster_output.uuid,
-                raster_output.name,
-                gdrive_file,
-                metadata=input_layer_fixture.get_vis_params()
-            )
-
-    raster_output.status = final_status
-    raster_output.size = size
-    raster_output.generate_end_time = timezone.now()
-    raster_output.status_logs = status
-    raster_output.save()
-
 
 @app.task(name='clear_analysis_results_cache', ignore_result=True)
 def clear_analysis_results_cache():
@@ -423,6 +460,15 @@ def clear_analysis_results_cache():
     ).delete()
 
 
+@app.task(name='sweep_analysis_payloads', ignore_result=True)
+def sweep_analysis_payloads():
+    """Correct references of analysis payloads and delete orphans."""
+    recounted, deleted = AnalysisPayload.recount_references()
+    logger.info(
+        f'Analysis payloads recounted: {recounted}, deleted: {deleted}.'
+    )
+
+
 @app.task(name='run_analysis_task')
 def run_analysis_task(analysis_task_id: int):
     """Trigger task to run analysis task."""
@@ -433,6 +479,7 @@ def run_analysis_task(analysis_task_id: int):
     analysis_task.result = None
     analysis_task.completed_at = None
     analysis_task.save()
+    analysis_task.publish_status()
 
     try:
         runner = AnalysisRunner(analysis_task=analysis_task)
@@ -452,74 +499,217 @@ def run_analysis_task(analysis_task_id: int):
         analysis_task.completed_at = timezone.now()
         analysis_task.updated_at = timezone.now()
         analysis_task.save()
+        analysis_task.publish_status()
 
 
 @app.task(name='check_ingestor_asset_status')
 def check_ingestor_asset_status(user_gee_asset_id: int):
-    """Check ingestor asset status."""
-    gee_asset = UserGEEAsset.objects.filter(
+    """Check ingestor asset status.
+
+    Ingestion tasks are checked by sweep_ingestor_asset_status, this only
+    marks the asset to be checked by the sweeper.
+    """
+    # updated_at is the start of the ingestion timeout
+    updated = UserGEEAsset.objects.filter(
         id=user_gee_asset_id
-    ).first()
-    if not gee_asset:
+    ).update(is_ingesting=True, updated_at=timezone.now())
+    if not updated:
         logger.error(
             f'UserGEEAsset with id {user_gee_asset_id} not found.'
         )
+
+
+@app.task(name='sweep_ingestor_asset_status', ignore_result=True)
+def sweep_ingestor_asset_status():
+    """Check ingestion tasks of all ingesting UserGEEAsset in one sweep.
+
+    Statuses of the running tasks are collected first, then the changed
+    assets are saved in bulk and indicators of the finished assets are
+    activated when all of their tasks are completed. Running tasks of an
+    asset without status change for USER_GEE_ASSET_INGESTION_TIMEOUT
+    seconds are marked as failed.
+    """
+    gee_assets = list(
+        UserGEEAsset.objects.filter(
+            is_ingesting=True
+        ).only('id', 'key', 'ingestion_status', 'updated_at')
+    )
+    if not gee_assets:
         return
 
-    if not gee_asset.ingestion_status:
-        logger.error(
-            f'UserGEEAsset with id {user_gee_asset_id} '
-            'has no ingestion status.'
+    running_task_ids = [
+        task_id for gee_asset in gee_assets
+        for task_id in gee_asset.get_running_ingestion_task_id()
+    ]
+    statuses = {}
+    if running_task_ids:
+        initialize_engine_analysis()
+        statuses = get_task_statuses(running_task_ids)
+
+    now = timezone.now()
+    timed_out_before = now - datetime.timedelta(
+        seconds=settings.USER_GEE_ASSET_INGESTION_TIMEOUT
+    )
+    changed_assets = []
+    finished_assets = []
+    for gee_asset in gee_assets:
+        gee_asset.ingestion_status = gee_asset.ingestion_status or {}
+        is_changed = False
+        for task_id in gee_asset.get_running_ingestion_task_id():
+            status = statuses.get(task_id)
+            if status and gee_asset.update_ingestion_status(status):
+                is_changed = True
+        if not is_changed and gee_asset.updated_at < timed_out_before:
+            for task_id in gee_asset.get_running_ingestion_task_id():
+                logger.warning(
+                    f'GEE ingestion task {task_id} of asset {gee_asset.id} '
+                    'is timed out.'
+                )
+                gee_asset.update_ingestion_status({
+                    'id': task_id,
+                    'state': 'FAILED',
+                    'error_message': 'Ingestion status check timed out.'
+                })
+        if not gee_asset.get_running_ingestion_task_id():
+            gee_asset.is_ingesting = False
+            finished_assets.append(gee_asset)
+            is_changed = True
+        if is_changed:
+            gee_asset.updated_at = now
+            changed_assets.append(gee_asset)
+
+    UserGEEAsset.objects.bulk_update(
+        changed_assets,
+        ['ingestion_status', 'is_ingesting', 'updated_at'],
+        batch_size=100
+    )
+
+    # update the indicator status if it's completed or failed
+    for gee_asset in finished_assets:
+        is_completed = gee_asset.is_ingestion_completed()
+        logger.info(
+            f'GEE ingestion of asset {gee_asset.id} is '
+            f'{"completed" if is_completed else "failed"}.'
         )
-        return
+        UserIndicator.set_status_by_asset_key(gee_asset.key, is_completed)
+
+
+def _claim_export(
+        queryset, claimed_at, store_attempts, now, claimed, failed
+):
+    """Claim finished export to be stored or mark it as failed.
+
+    The claim is a conditional update on the previous claim time, so
+    the export is claimed by one sweep only.
+
+    :return: True if the store task should be queued.
+    """
+    queryset = queryset.filter(store_claimed_at=claimed_at)
+    if store_attempts >= settings.GEE_EXPORT_STORE_MAX_ATTEMPTS:
+        queryset.update(**failed)
+        return False
+    return bool(
+        queryset.update(
+            store_claimed_at=now,
+            store_attempts=F('store_attempts') + 1,
+            **claimed
+        )
+    )
+
 
-    task_ids = gee_asset.get_running_ingestion_task_id()
-    if not task_ids:
-        UserIndicator.set_status_by_asset_key(gee_asset.key, True)
+@app.task(name='poll_gee_export_tasks', ignore_result=True)
+def poll_gee_export_tasks():
+    """Check the running Earth Engine exports and store the finished ones.
+
+    Status of the exports is requested in one sweep and each finished
+    export is claimed with a conditional update before its store task is
+    triggered, so the export is stored once. Export whose store task is
+    not finished after GEE_EXPORT_STORE_TIMEOUT seconds is claimed and
+    queued again, up to GEE_EXPORT_STORE_MAX_ATTEMPTS before it is
+    marked as failed.
+    """
+    now = timezone.now()
+    stale_before = now - datetime.timedelta(
+        seconds=settings.GEE_EXPORT_STORE_TIMEOUT
+    )
+    fields = ('gee_task_id', 'store_claimed_at', 'store_attempts')
+    raster_outputs = list(
+        AnalysisRasterOutput.objects.filter(
+            Q(store_claimed_at__isnull=True) |
+            Q(store_claimed_at__lt=stale_before),
+            status='RUNNING',
+            gee_task_id__isnull=False
+        ).values_list('uuid', *fields)
+    )
+    exported_cogs = list(
+        ExportedCog.objects.filter(
+            Q(status='PROCESSING', store_claimed_at__isnull=True) |
+            Q(status='DOWNLOADING', store_claimed_at__lt=stale_before),
+            gee_task_id__isnull=False
+        ).values_list('id', 'status', *fields)
+    )
+    if not raster_outputs and not exported_cogs:
         return
 
-    max_wait_time = 3600
-    start_time = time.time()
-    # Check the status of the GEE ingestion task
     initialize_engine_analysis()
-    status_list = ee.data.getTaskStatus(task_ids)
-
-    while (
-        (time.time() - start_time) < max_wait_time
-    ):
-        for status in status_list:
-            ingestion_status_dict = gee_asset.ingestion_status.get(
-                status['id']
-            )
-            if ingestion_status_dict:
-                ingestion_status_dict['status'] = status['state']
-                ingestion_status_dict['error'] = status.get('error_message')
-                gee_asset.ingestion_status[status['id']] = (
-                    ingestion_status_dict
-                )
-        gee_asset.save()
-        task_ids = gee_asset.get_running_ingestion_task_id()
-        if not task_ids:
-            break  # all tasks are completed
-        time.sleep(60)
-        status_list = ee.data.getTaskStatus(task_ids)
-
-    # count stats
-    completed_count = 0
-    failed_count = 0
-    for _, status in gee_asset.ingestion_status.items():
-        if status['status'] == 'COMPLETED':
-            completed_count += 1
-        elif status['status'] == 'FAILED':
-            failed_count += 1
-
-    logger.info(
-        f'GEE task {user_gee_asset_id} completed with '
-        f'{completed_count} and failed with {failed_count}.'
+    statuses = get_task_statuses(
+        [item[-3] for item in raster_outputs + exported_cogs]
     )
 
-    # update the indicator status if it's completed or failed
-    if failed_count > 0 or len(gee_asset.ingestion_status) != completed_count:
-        UserIndicator.set_status_by_asset_key(gee_asset.key, False)
-    else:
-        UserIndicator.set_status_by_asset_key(gee_asset.key, True)
+    for (
+        raster_output_id, task_id, claimed_at, store_attempts
+    ) in raster_outputs:
+        status = statuses.get(task_id)
+        if not status or status['state'] not in EXPORT_TASK_FINAL_STATES:
+            continue
+        if claimed_at:
+            logger.warning(
+                f'Store task of raster output {raster_output_id} '
+                'is timed out.'
+            )
+        claimed = _claim_export(
+            AnalysisRasterOutput.objects.filter(
+                uuid=raster_output_id,
+                status='RUNNING',
+                gee_task_id=task_id
+            ),
+            claimed_at, store_attempts, now,
+            claimed={'status_logs': status},
+            failed={
+                'status': 'FAILED',
+                'generate_end_time': now,
+                'status_logs': {
+                    **status, 'store_error': 'Store task timed out.'
+                }
+            }
+        )
+        if claimed:
+            store_raster_output_export.delay(str(raster_output_id), status)
+
+    for (
+        exported_cog_id, cog_status, task_id, claimed_at, store_attempts
+    ) in exported_cogs:
+        status = statuses.get(task_id)
+        if not status or status['state'] not in EXPORT_TASK_FINAL_STATES:
+            continue
+        if claimed_at:
+            logger.warning(
+                f'Store task of exported COG {exported_cog_id} '
+                'is timed out.'
+            )
+        claimed = _claim_export(
+            ExportedCog.objects.filter(
+                id=exported_cog_id,
+                status=cog_status,
+                gee_task_id=task_id
+            ),
+            claimed_at, store_attempts, now,
+            claimed={'status': 'DOWNLOADING'},
+            failed={
+                'status': 'FAILED',
+                'completed_at': now,
+                'errors': 'Store task timed out.'
+            }
+        )
+        if claimed:
+            store_exported_cog_task.delay(exported_cog_id, status)
@@ -0,0 +1,320 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Columnar statistics of temporal analysis results.
+"""
+import typing
+from collections import OrderedDict
+from operator import itemgetter
+
+import numpy as np
+
+# Feature properties that are not indicator bands
+NON_BAND_PROPERTIES = (
+    'Name', 'Project', 'area', 'year', 'month', 'date', 'system:index'
+)
+
+
+def get_bands(rows: typing.List[dict]) -> typing.List[str]:
+    """Get the numeric indicator bands from feature properties."""
+    keys = set().union(*map(dict.keys, rows))
+    bands = []
+    for key in keys.difference(NON_BAND_PROPERTIES):
+        value = next(
+            (row[key] for row in rows if row.get(key) is not None), None
+        )
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            bands.append(key)
+    return sorted(bands)
+
+
+def to_structured_array(
+    rows: typing.List[dict], bands: typing.List[str]
+) -> typing.Tuple[np.ndarray, typing.List[str]]:
+    """Convert feature properties to structured array.
+
+    Community names are stored as codes of the sorted unique names and
+    missing or null band values are stored as NaN.
+
+    :return: Tuple of structured array and the sorted unique names.
+    """
+    keys = ['Name', 'year'] + list(bands)
+    try:
+        values = list(map(itemgetter(*keys), rows))
+    except KeyError:
+        values = [tuple(row.get(key) for key in keys) for row in rows]
+    columns = list(zip(*values)) if values else [()] * len(keys)
+
+    names = sorted(dict.fromkeys(columns[0]))
+    name_codes = {name: code for code, name in enumerate(names)}
+
+    dtype = [('name', np.int64), ('year', np.int64)] + [
+        (band, np.float64) for band in bands
+    ]
+    array = np.empty(len(rows), dtype=dtype)
+    array['name'] = np.fromiter(
+        map(name_codes.__getitem__, columns[0]), dtype=np.int64,
+        count=len(rows)
+    )
+    array['year'] = np.asarray(columns[1]).astype(np.int64)
+    for band, column in zip(bands, columns[2:]):
+        # None is converted to NaN
+        array[band] = np.asarray(column, dtype=np.float64)
+    return array, names
+
+
+def _empty_statistics(bands):
+    """Get statistics of band without any value."""
+    return OrderedDict(
+        (band, {'min': None, 'max': None, 'mean': None})
+        for band in sorted(bands)
+    )
+
+
+def compute_statistics(
+    features: typing.List[dict], years,
+    bands: typing.Optional[typing.List[str]] = None
+) -> dict:
+    """Compute min, max and mean of bands per year and community name.
+
+    :param features: List of GeoJSON features of temporal analysis.
+    :param years: Year or list of years to be computed.
+    :param bands: List of bands, detected from the features if None.
+    :return: Dictionary of year -> name -> band -> statistics, sorted by
+        year, name and band. Years without data have null statistics.
+    """
+    years = years if isinstance(years, list) else [years]
+    years = [int(year) for year in years]
+    rows = list(map(itemgetter('properties'), features))
+    if bands is None:
+        bands = get_bands(rows)
+    bands = sorted(bands)
+    array, names = to_structured_array(rows, bands)
+    array = array[np.isin(array['year'], np.asarray(years, dtype=np.int64))]
+
+    # group rows by (name, year), names are sorted so the groups are
+    # ordered by name then year
+    name_idx = array['name']
+    group_years, year_idx = np.unique(array['year'], return_inverse=True)
+    group_key = name_idx * len(group_years) + year_idx
+    order = np.argsort(group_key, kind='stable')
+    sorted_key = group_key[order]
+    starts = np.flatnonzero(
+        np.r_[True, sorted_key[1:] != sorted_key[:-1]]
+    ) if len(sorted_key) else np.array([], dtype=np.int64)
+    first_rows = order[starts]
+
+    stats = []
+    for band in bands:
+        values = array[band][order]
+        is_valid = ~np.isnan(values)
+        if len(values):
+            count = np.add.reduceat(is_valid.astype(np.int64), starts)
+            total = np.add.reduceat(np.where(is_valid, values, 0), starts)
+            min_val = np.fmin.reduceat(values, starts)
+            max_val = np.fmax.reduceat(values, starts)
+        else:
+            count = total = min_val = max_val = np.array([])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_val = total / count
+        stats.append(
+            (
+                band, count.tolist(), min_val.tolist(), max_val.tolist(),
+                mean_val.tolist()
+            )
+        )
+
+    results = {}
+    group_name_codes = name_idx[first_rows].tolist()
+    group_year_values = group_years[year_idx[first_rows]].tolist()
+    for group, (name_code, year) in enumerate(
+        zip(group_name_codes, group_year_values)
+    ):
+        band_stats = OrderedDict()
+        for band, count, min_val, max_val, mean_val in stats:
+            if count[group]:
+                band_stats[band] = {
+                    'min': min_val[group],
+                    'max': max_val[group],
+                    'mean': mean_val[group]
+                }
+            else:
+                band_stats[band] = {'min': None, 'max': None, 'mean': None}
+        results.setdefault(year, {})[names[name_code]] = band_stats
+
+    # add empty statistics if no data exist for certain year
+    empty_data = _empty_statistics(bands)
+    selected_names = [names[code] for code in np.unique(name_idx).tolist()]
+    for year in years:
+        if year in results or not selected_names:
+            continue
+        results[year] = {name: empty_data for name in selected_names}
+
+    return {year: results[year] for year in sorted(results)}
+
+
+def add_empty_records(
+    records: typing.List[dict], years: typing.List[int],
+    bands: typing.Optional[typing.List[str]] = None
+) -> typing.List[dict]:
+    """Create null records for the years that have no record.
+
+    One record is created per community name, copied from the first
+    record of the name with the bands set to None.
+    """
+    existing_years = {record['properties']['year'] for record in records}
+    missing_years = [year for year in years if year not in existing_years]
+    if not missing_years:
+        return []
+    if bands is None:
+        bands = get_bands([record['properties'] for record in records])
+
+    first_records = {}
+    for record in records:
+        first_records.setdefault(record['properties']['Name'], record)
+
+    empty_bands = dict.fromkeys(bands)
+    new_records = []
+    for year in dict.fromkeys(missing_years):
+        for record in first_records.values():
+            new_record = dict(record)
+            new_record['properties'] = {
+                **record['properties'],
+                **empty_bands,
+                'year': year
+            }
+            new_records.append(new_record)
+    return new_records
+
+
+class ResultFormat:
+    """Response format of the analysis results."""
+
+    GEOJSON = 'geojson'
+    COLUMNAR = 'columnar'
+
+
+# Type of FeatureCollection in columnar form
+COLUMNAR_TYPE = 'ColumnarFeatureCollection'
+# Keys of the FeatureCollection that are not kept in metadata
+FEATURE_COLLECTION_KEYS = ('type', 'features')
+
+
+def is_feature_collection(value) -> bool:
+    """Check whether value is GeoJSON FeatureCollection."""
+    return (
+        isinstance(value, dict) and
+        value.get('type') == 'FeatureCollection'
+    )
+
+
+def is_columnar(value) -> bool:
+    """Check whether value is FeatureCollection in columnar form."""
+    return isinstance(value, dict) and value.get('type') == COLUMNAR_TYPE
+
+
+def to_columnar(feature_collection: dict) -> dict:
+    """Convert GeoJSON FeatureCollection to columnar form.
+
+    Each feature property becomes an array of values in feature order.
+    Community names are dictionary encoded: the Name column stores the
+    index to the sorted names. Rows that do not have the property are
+    listed in missing, so the conversion can be reverted losslessly.
+    Other keys of the collection, e.g. statistics, are kept in metadata.
+    """
+    features = feature_collection.get('features', [])
+    properties = [feature.get('properties') or {} for feature in features]
+    keys = sorted(set().union(*properties))
+
+    columns = {}
+    missing = {}
+    for key in keys:
+        columns[key] = [row.get(key) for row in properties]
+        missing_rows = [
+            idx for idx, row in enumerate(properties) if key not in row
+        ]
+        if missing_rows:
+            missing[key] = missing_rows
+
+    names = []
+    if 'Name' in columns:
+        names = sorted(
+            {name for name in columns['Name'] if name is not None}, key=str
+        )
+        name_codes = {name: code for code, name in enumerate(names)}
+        columns['Name'] = [
+            name_codes.get(name) if name is not None else None
+            for name in columns['Name']
+        ]
+
+    columnar = {
+        'type': COLUMNAR_TYPE,
+        'length': len(features),
+        'names': names,
+        'columns': columns,
+        'metadata': {
+            key: value for key, value in feature_collection.items()
+            if key not in FEATURE_COLLECTION_KEYS
+        }
+    }
+    if missing:
+        columnar['missing'] = missing
+    ids = [feature.get('id') for feature in features]
+    if any(feature_id is not None for feature_id in ids):
+        columnar['ids'] = ids
+    geometries = [feature.get('geometry') for feature in features]
+    if any(geometry is not None for geometry in geometries):
+        columnar['geometries'] = geometries
+    return columnar
+
+
+def from_columnar(columnar: dict) -> dict:
+    """Convert FeatureCollection in columnar form back to GeoJSON."""
+    columns = dict(columnar.get('columns', {}))
+    names = columnar.get('names', [])
+    if 'Name' in columns:
+        columns['Name'] = [
+            names[code] if code is not None else None
+            for code in columns['Name']
+        ]
+    missing = {
+        key: set(rows) for key, rows in columnar.get('missing', {}).items()
+    }
+    ids = columnar.get('ids')
+    geometries = columnar.get('geometries')
+
+    features = []
+    for idx in range(columnar.get('length', 0)):
+        feature = {
+            'geometry': geometries[idx] if geometries else None
+        }
+        if ids and ids[idx] is not None:
+            feature['id'] = ids[idx]
+        feature['properties'] = {
+            key: values[idx] for key, values in columns.items()
+            if idx not in missing.get(key, ())
+        }
+        feature['type'] = 'Feature'
+        features.append(feature)
+
+    feature_collection = dict(columnar.get('metadata', {}))
+    feature_collection['features'] = features
+    feature_collection['type'] = 'FeatureCollection'
+    return dict(sorted(feature_collection.items()))
+
+
+def convert_results(results, result_format: str):
+    """Convert FeatureCollections of the results to the format.
+
+    :param results: FeatureCollection or list of FeatureCollections,
+        either in GeoJSON or columnar form.
+    :param result_format: ResultFormat value.
+    """
+    if result_format == ResultFormat.COLUMNAR:
+        check, convert = is_feature_collection, to_columnar
+    else:
+        check, convert = is_columnar, from_columnar
+    if isinstance(results, (list, tuple)):
+        return [convert(item) if check(item) else item for item in results]
+    return convert(results) if check(results) else results
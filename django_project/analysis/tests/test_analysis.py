@@ -1,12 +1,19 @@
 import datetime
 from unittest.mock import patch, MagicMock
-from django.test import TestCase
+from django.contrib.gis.geos import Polygon
+from django.test import TestCase, override_settings
 from analysis.analysis import (
     spatial_get_date_filter,
     validate_spatial_date_range_filter,
     calculate_baci,
+    get_community_names,
+    fetch_feature_collection,
+    train_bgt,
+    get_task_statuses,
     InputLayer
 )
+from analysis.utils import get_info_concurrently
+from analysis.models import Landscape, LandscapeCommunity
 
 
 class TestSpatialDateFilter(TestCase):
@@ -770,3 +777,385 @@ class TestSpatialArrayValueHandling(TestCase):
             self.assertIsNotNone(end)
         except TypeError as e:
             self.fail(f"spatial_get_date_filter raised TypeError: {e}")
+
+
+class TestSpatialLayerDict(TestCase):
+    """Test lazy spatial layer dictionary."""
+
+    fixtures = [
+        '3.gee_asset.json'
+    ]
+
+    @patch('analysis.analysis.user_spatial_analysis_dict')
+    @patch('analysis.analysis.ee')
+    def test_get_spatial_layer_dict_is_lazy(
+        self, mock_ee, mock_user_dict
+    ):
+        """Test only the accessed layer is built."""
+        mock_user_dict.return_value = {
+            'User layer': 'user_image',
+            'Grazing capacity': 'user_grazing_image'
+        }
+        input_layer = InputLayer()
+        mock_ee.ImageCollection.reset_mock()
+
+        with patch.object(
+            InputLayer, 'get_grazing_capacity'
+        ) as mock_grazing, patch.object(
+            InputLayer, 'get_soil_carbon'
+        ) as mock_soil_carbon:
+            layer_dict = input_layer.get_spatial_layer_dict(
+                datetime.date(2020, 1, 1), datetime.date(2021, 1, 1)
+            )
+            mock_ee.ImageCollection.assert_not_called()
+
+            evi = layer_dict['EVI']
+            self.assertIs(evi, layer_dict['EVI'])
+            # NDVI shares the MODIS collection with EVI
+            layer_dict['NDVI']
+            self.assertEqual(mock_ee.ImageCollection.call_count, 1)
+            mock_soil_carbon.assert_not_called()
+
+            self.assertEqual(layer_dict['User layer'], 'user_image')
+            # user layer overrides the built-in layer with the same name
+            self.assertEqual(
+                layer_dict['Grazing capacity'], 'user_grazing_image'
+            )
+            mock_grazing.assert_not_called()
+            mock_user_dict.assert_called_once()
+            with self.assertRaises(KeyError):
+                layer_dict['Unknown']
+
+
+class TestCommunityNames(TestCase):
+    """Test community names resolution."""
+
+    fixtures = [
+        '1.project.json',
+        '2.landscape.json'
+    ]
+
+    def setUp(self):
+        self.communities = MagicMock()
+        self.communities.filterBounds.return_value.distinct.return_value.\
+            reduceColumns.return_value.getInfo.return_value = {
+                'list': ['GEE community']
+            }
+        self.locations = [{'lat': -23.5, 'lon': 32.5}]
+
+    def test_fallback_to_gee_without_local_communities(self):
+        """Test GEE is used when LandscapeCommunity is empty."""
+        names = get_community_names(
+            self.communities, MagicMock(), locations=self.locations
+        )
+        self.assertEqual(names, ['GEE community'])
+        self.communities.filterBounds.assert_called_once()
+
+    def create_communities(self):
+        landscape = Landscape.objects.get(pk=1)
+        LandscapeCommunity.objects.create(
+            landscape=landscape,
+            community_id='community-1',
+            community_name='Local community',
+            geometry=Polygon.from_bbox((32, -24, 33, -23))
+        )
+        LandscapeCommunity.objects.create(
+            landscape=landscape,
+            community_id='community-2',
+            community_name='Other community',
+            geometry=Polygon.from_bbox((31, -24, 32, -22))
+        )
+
+    def test_resolve_from_local_communities(self):
+        """Test names are resolved by PostGIS without GEE."""
+        self.create_communities()
+        names = get_community_names(
+            self.communities, MagicMock(), locations=self.locations
+        )
+        self.assertEqual(names, ['Local community'])
+
+        names = get_community_names(
+            self.communities, MagicMock(),
+            custom_geom={
+                'type': 'Polygon',
+                'coordinates': [[
+                    [31.5, -23.9], [32.5, -23.9], [32.5, -23.5],
+                    [31.5, -23.5], [31.5, -23.9]
+                ]]
+            }
+        )
+        self.assertEqual(names, ['Local community', 'Other community'])
+
+        # geometry partly outside the communities of fetched landscape
+        names = get_community_names(
+            self.communities, MagicMock(),
+            custom_geom={
+                'type': 'Polygon',
+                'coordinates': [[
+                    [32.9, -23.9], [33.3, -23.9], [33.3, -23.6],
+                    [32.9, -23.6], [32.9, -23.9]
+                ]]
+            }
+        )
+        self.assertEqual(names, ['Local community'])
+        self.communities.filterBounds.assert_not_called()
+
+    def test_fallback_to_gee_not_fetched(self):
+        """Test GEE is used when a landscape of input is not fetched."""
+        self.create_communities()
+        names = get_community_names(
+            self.communities, MagicMock(),
+            locations=self.locations + [{'lat': -10.5, 'lon': 20.5}]
+        )
+        self.assertEqual(names, ['GEE community'])
+
+        names = get_community_names(
+            self.communities, MagicMock(),
+            custom_geom={
+                'type': 'Polygon',
+                'coordinates': [[
+                    [32.5, -23.5], [33.5, -23.5], [33.5, -23.1],
+                    [32.5, -23.1], [32.5, -23.5]
+                ]]
+            }
+        )
+        self.assertEqual(names, ['GEE community'])
+        self.assertEqual(self.communities.filterBounds.call_count, 2)
+
+
+class TestGetInfoConcurrently(TestCase):
+    """Test concurrent evaluation of Earth Engine objects."""
+
+    def test_results_keep_order(self):
+        """Test results are returned in the order of the objects."""
+        to_plot = MagicMock()
+        to_plot.getInfo.return_value = {'features': [1]}
+        to_plot_ts = MagicMock()
+        to_plot_ts.getInfo.return_value = {'features': [1, 2]}
+
+        self.assertEqual(
+            get_info_concurrently(to_plot, to_plot_ts),
+            ({'features': [1]}, {'features': [1, 2]})
+        )
+        to_plot.getInfo.assert_called_once()
+        to_plot_ts.getInfo.assert_called_once()
+
+    def test_error_is_raised(self):
+        """Test error of any evaluation is raised."""
+        failed = MagicMock()
+        failed.getInfo.side_effect = Exception('Computation timed out.')
+        with self.assertRaises(Exception):
+            get_info_concurrently(MagicMock(), failed)
+
+
+class TestFetchFeatureCollection(TestCase):
+    """Test fetching FeatureCollection in pages."""
+
+    class EEException(Exception):
+        pass
+
+    def _feature(self, name, value):
+        return {
+            'type': 'Feature',
+            'geometry': None,
+            'id': name,
+            'properties': {'Name': name, 'mean': value}
+        }
+
+    @patch('analysis.analysis.ee')
+    def test_small_collection_single_page(self, mock_ee):
+        """Test small collection is fetched with one page."""
+        collection = MagicMock()
+        mock_ee.data.computeFeatures.return_value = {'features': []}
+        self.assertEqual(
+            fetch_feature_collection(collection),
+            {
+                'type': 'FeatureCollection',
+                'columns': {'system:index': 'String'},
+                'features': []
+            }
+        )
+        mock_ee.data.computeFeatures.assert_called_once()
+        collection.getInfo.assert_not_called()
+
+    @patch('analysis.analysis.ee')
+    def test_large_collection_is_paginated(self, mock_ee):
+        """Test features are fetched in pages without getInfo."""
+        collection = MagicMock()
+        mock_ee.data.computeFeatures.side_effect = [
+            {
+                'features': [self._feature('A', 1.5)],
+                'nextPageToken': 'token-1'
+            },
+            {
+                'features': [self._feature('B', 2)]
+            }
+        ]
+        result = fetch_feature_collection(collection, page_size=1)
+        self.assertEqual(
+            [ft['id'] for ft in result['features']], ['A', 'B']
+        )
+        self.assertEqual(
+            result['columns'],
+            {'Name': 'String', 'mean': 'Float', 'system:index': 'String'}
+        )
+        self.assertEqual(mock_ee.data.computeFeatures.call_count, 2)
+        self.assertEqual(
+            mock_ee.data.computeFeatures.call_args[0][0]['pageToken'],
+            'token-1'
+        )
+        collection.getInfo.assert_not_called()
+
+    @patch('analysis.analysis.ee')
+    def test_error_is_raised(self, mock_ee):
+        """Test Earth Engine errors are raised."""
+        mock_ee.EEException = self.EEException
+        mock_ee.data.computeFeatures.side_effect = self.EEException(
+            'User memory limit exceeded.'
+        )
+        with self.assertRaises(self.EEException):
+            fetch_feature_collection(MagicMock())
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-bgt-classifier',
+        }
+    },
+    BGT_CLASSIFIER_GRID_SIZE=0.05
+)
+class TestTrainBGTCache(TestCase):
+    """Test caching of the trained bare ground classifier."""
+
+    class EEException(Exception):
+        pass
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def _aoi(self, xmin, ymin, xmax, ymax):
+        aoi = MagicMock()
+        aoi.toGeoJSON.return_value = {
+            'type': 'Polygon',
+            'coordinates': [[
+                [xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax],
+                [xmin, ymin]
+            ]]
+        }
+        return aoi
+
+    def _mock_ee(self, mock_ee, sample_count=10, distinct_classes=3):
+        mock_ee.EEException = self.EEException
+        mock_ee.data.getAsset.return_value = {'updateTime': 'v1'}
+        mock_ee.Dictionary.return_value.getInfo.side_effect = lambda: {
+            'sample_count': sample_count,
+            'distinct_classes': distinct_classes
+        }
+        mock_ee.Dictionary.return_value.get.return_value.getInfo.\
+            return_value = ['tree-1', 'tree-2']
+
+    @patch('analysis.analysis.ee')
+    def test_classifier_reused_within_snapped_bounds(self, mock_ee):
+        """Test nearly identical AOIs reuse the trained trees."""
+        self._mock_ee(mock_ee)
+        train_bgt(self._aoi(30.01, -1.02, 30.09, -0.91), 'training')
+        train_bgt(self._aoi(30.02, -1.01, 30.08, -0.92), 'training')
+        mock_ee.Classifier.smileRandomForest.assert_called_once()
+        mock_ee.Geometry.Rectangle.assert_called_once_with(
+            [30.0, -1.05, 30.1, -0.9]
+        )
+        mock_ee.Classifier.decisionTreeEnsemble.assert_called_with(
+            ['tree-1', 'tree-2']
+        )
+        self.assertEqual(
+            mock_ee.Classifier.decisionTreeEnsemble.call_count, 2
+        )
+
+        # different bounds
+        train_bgt(self._aoi(31.01, -1.02, 31.09, -0.91), 'training')
+        self.assertEqual(mock_ee.Classifier.smileRandomForest.call_count, 2)
+
+    @patch('analysis.analysis.ee')
+    def test_bounds_of_computed_geometry(self, mock_ee):
+        """Test bounds of computed geometry are fetched with getInfo."""
+        self._mock_ee(mock_ee)
+        aoi = MagicMock()
+        aoi.toGeoJSON.side_effect = self.EEException('Computed geometry')
+        aoi.bounds.return_value.coordinates.return_value.getInfo.\
+            return_value = [[
+                [30.01, -1.02], [30.09, -1.02], [30.09, -0.91],
+                [30.01, -0.91], [30.01, -1.02]
+            ]]
+        train_bgt(aoi, 'training')
+        mock_ee.Geometry.Rectangle.assert_called_once_with(
+            [30.0, -1.05, 30.1, -0.9]
+        )
+
+    @patch('analysis.analysis.get_training_asset_version')
+    @patch('analysis.analysis.ee')
+    def test_classifier_retrained_on_new_asset_version(
+        self, mock_ee, mock_version
+    ):
+        """Test classifier is retrained when training asset is updated."""
+        self._mock_ee(mock_ee)
+        mock_version.side_effect = ['v1', 'v1', 'v2']
+        for _ in range(3):
+            train_bgt(self._aoi(30.01, -1.02, 30.09, -0.91), 'training')
+        self.assertEqual(mock_ee.Classifier.smileRandomForest.call_count, 2)
+
+    @patch('analysis.analysis.ee')
+    def test_validation_counts_cached(self, mock_ee):
+        """Test insufficient training data is validated from the cache."""
+        self._mock_ee(mock_ee, sample_count=5, distinct_classes=1)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                train_bgt(self._aoi(30.01, -1.02, 30.09, -0.91), 'training')
+        self.assertEqual(
+            mock_ee.Dictionary.return_value.getInfo.call_count, 1
+        )
+        mock_ee.Classifier.smileRandomForest.assert_not_called()
+
+
+class TestGetTaskStatuses(TestCase):
+    """Test getting status of Earth Engine tasks."""
+
+    def _status(self, task_id, state='RUNNING'):
+        return {'id': task_id, 'state': state}
+
+    @patch('analysis.analysis.ee')
+    def test_few_tasks_requested_by_id(self, mock_ee):
+        """Test few tasks are requested by their ids."""
+        mock_ee.data.getTaskStatus.return_value = [self._status('task-1')]
+        self.assertEqual(
+            get_task_statuses(['task-1']),
+            {'task-1': self._status('task-1')}
+        )
+        mock_ee.data.getTaskList.assert_not_called()
+        self.assertEqual(get_task_statuses([]), {})
+
+    @patch('analysis.analysis.TASK_LIST_MIN_TASKS', 2)
+    @patch('analysis.analysis.ee')
+    def test_many_tasks_from_task_list(self, mock_ee):
+        """Test many tasks are taken from the task list."""
+        mock_ee.data.getTaskList.return_value = [
+            self._status('task-1', 'COMPLETED'),
+            self._status('task-2'),
+            self._status('other-task')
+        ]
+        mock_ee.data.getTaskStatus.return_value = [
+            self._status('task-3', 'UNKNOWN')
+        ]
+        statuses = get_task_statuses(['task-1', 'task-2', 'task-3'])
+        self.assertEqual(
+            statuses,
+            {
+                'task-1': self._status('task-1', 'COMPLETED'),
+                'task-2': self._status('task-2'),
+                'task-3': self._status('task-3', 'UNKNOWN')
+            }
+        )
+        mock_ee.data.getTaskList.assert_called_once()
+        mock_ee.data.getTaskStatus.assert_called_once_with(['task-3'])
@@ -0,0 +1,160 @@
+from django.test import TestCase
+
+from analysis.models import (
+    AnalysisPayload,
+    AnalysisResultsCache,
+    AnalysisTask,
+    UserAnalysisResults
+)
+from core.factories import UserF
+
+
+RESULTS = {
+    'type': 'FeatureCollection',
+    'features': [
+        {
+            'type': 'Feature',
+            'properties': {'Name': f'Community {idx}', 'EVI': 0.5}
+        } for idx in range(100)
+    ]
+}
+
+
+class AnalysisPayloadTest(TestCase):
+    """Test content addressed analysis payload."""
+
+    def setUp(self):
+        self.user = UserF()
+
+    def get_payload(self, digest):
+        return AnalysisPayload.objects.filter(digest=digest).first()
+
+    def test_acquire_release(self):
+        digest = AnalysisPayload.acquire(RESULTS)
+        self.assertEqual(AnalysisPayload.acquire(RESULTS), digest)
+        payload = self.get_payload(digest)
+        self.assertEqual(payload.ref_count, 2)
+        self.assertLess(payload.compressed_size, payload.size)
+        self.assertEqual(AnalysisPayload.load(digest), RESULTS)
+
+        AnalysisPayload.release(digest)
+        self.assertEqual(self.get_payload(digest).ref_count, 1)
+        AnalysisPayload.release(digest)
+        self.assertIsNone(self.get_payload(digest))
+        self.assertIsNone(AnalysisPayload.acquire(None))
+
+    def test_shared_payload(self):
+        task = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Baseline'},
+            result=RESULTS
+        )
+        cache = AnalysisResultsCache.save_cache_with_ttl(
+            1, analysis_inputs={'analysisType': 'Baseline'},
+            analysis_results=RESULTS
+        )
+        user_result = UserAnalysisResults.objects.create(
+            created_by=self.user,
+            analysis_results={
+                'data': {'analysisType': 'Baseline'},
+                'results': RESULTS
+            }
+        )
+        self.assertEqual(AnalysisPayload.objects.count(), 1)
+        payload = AnalysisPayload.objects.get()
+        self.assertEqual(payload.ref_count, 3)
+        self.assertEqual(task.result_payload_id, payload.digest)
+        self.assertEqual(cache.results_payload_id, payload.digest)
+        self.assertEqual(user_result.results_payload_id, payload.digest)
+
+        # decoded transparently
+        task = AnalysisTask.objects.get(id=task.id)
+        self.assertEqual(task.result, RESULTS)
+        cache = AnalysisResultsCache.objects.get(id=cache.id)
+        self.assertEqual(cache.analysis_results, RESULTS)
+        user_result = UserAnalysisResults.objects.get(id=user_result.id)
+        self.assertEqual(
+            user_result.analysis_metadata,
+            {'data': {'analysisType': 'Baseline'}}
+        )
+        self.assertEqual(
+            user_result.analysis_results,
+            {'data': {'analysisType': 'Baseline'}, 'results': RESULTS}
+        )
+
+        task.delete()
+        AnalysisResultsCache.objects.filter(id=cache.id).delete()
+        self.assertEqual(self.get_payload(payload.digest).ref_count, 1)
+        user_result.delete()
+        self.assertFalse(AnalysisPayload.objects.exists())
+
+    def test_replace_payload(self):
+        task = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Baseline'},
+            result=RESULTS
+        )
+        digest = task.result_payload_id
+        task.result = None
+        task.save()
+        self.assertIsNone(task.result_payload_id)
+        self.assertIsNone(self.get_payload(digest))
+
+        task.result = [1, 2, 3]
+        task.save(update_fields=['result'])
+        task.refresh_from_db()
+        self.assertEqual(task.result, [1, 2, 3])
+        self.assertEqual(self.get_payload(task.result_payload_id).ref_count, 1)
+
+    def test_prefetch_payloads(self):
+        for idx in range(3):
+            UserAnalysisResults.objects.create(
+                created_by=self.user,
+                analysis_results={'data': {'idx': idx}, 'results': [idx]}
+            )
+        user_results = list(UserAnalysisResults.objects.order_by('id'))
+        with self.assertNumQueries(1):
+            UserAnalysisResults.prefetch_payloads(user_results)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [result.analysis_results['results'] for result in user_results],
+                [[0], [1], [2]]
+            )
+
+    def test_recount_references(self):
+        task = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Baseline'},
+            result=RESULTS
+        )
+        orphan = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Temporal'},
+            result=[1, 2, 3]
+        )
+        orphan_digest = orphan.result_payload_id
+        # bulk paths skip acquire and release
+        AnalysisTask.objects.filter(id=orphan.id).update(result_payload=None)
+        UserAnalysisResults.objects.bulk_create([
+            UserAnalysisResults(
+                created_by=self.user,
+                analysis_metadata={'data': {'idx': idx}},
+                results_payload_id=task.result_payload_id
+            ) for idx in range(2)
+        ])
+        self.assertEqual(self.get_payload(task.result_payload_id).ref_count, 1)
+
+        self.assertEqual(AnalysisPayload.recount_references(), (2, 1))
+        self.assertEqual(self.get_payload(task.result_payload_id).ref_count, 3)
+        self.assertIsNone(self.get_payload(orphan_digest))
+        self.assertEqual(AnalysisPayload.recount_references(), (0, 0))
+
+    def test_save_analysis_results_update_fields(self):
+        user_result = UserAnalysisResults.objects.create(
+            created_by=self.user,
+            analysis_results={'data': {'idx': 0}, 'results': [0]}
+        )
+        user_result.analysis_results = {'data': {'idx': 1}, 'results': [1]}
+        user_result.save(update_fields=['analysis_results'])
+        user_result = UserAnalysisResults.objects.get(id=user_result.id)
+        self.assertEqual(
+            user_result.analysis_results,
+            {'data': {'idx': 1}, 'results': [1]}
+        )
+        self.assertEqual(AnalysisPayload.objects.count(), 1)
@@ -1,8 +1,17 @@
 from unittest.mock import patch, MagicMock
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
-from django.test import TestCase
-from analysis.models import UserIndicator, UserGEEAsset, GEEAssetType
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from analysis.analysis import AnalysisResultsCacheUtils
+from analysis.models import (
+    UserIndicator,
+    UserGEEAsset,
+    GEEAssetType,
+    GEEAsset,
+    AnalysisResultsCache,
+    gee_asset_registry
+)
 from analysis.factories import UserIndicatorF, UserGEEAssetF
 from core.factories import UserF
 
@@ -181,4 +190,160 @@ class GEEAssetTypeTest(TestCase):
         asset.type = "non_existing_type"
         with self.assertRaises(ValueError) as ctx:
             GEEAssetType.get_ee_asset_class(asset)
-        self.assertIn("Unsupported GEE asset type", str(ctx.exception))
\ No newline at end of file
+        self.assertIn("Unsupported GEE asset type", str(ctx.exception))
+
+class AnalysisResultsCacheTest(TestCase):
+
+    def _inputs(self):
+        return {
+            'locations': [{'lat': -23.0, 'lon': 32.1}],
+            'analysis_dict': {'variable': 'EVI', 'analysisType': 'Baseline'},
+            'args': [],
+            'kwargs': {'custom_geom': None}
+        }
+
+    def test_inputs_hash_ignores_key_order(self):
+        inputs = self._inputs()
+        reordered = {
+            'kwargs': {'custom_geom': None},
+            'args': [],
+            'analysis_dict': {'analysisType': 'Baseline', 'variable': 'EVI'},
+            'locations': [{'lon': 32.1, 'lat': -23.0}],
+        }
+        self.assertEqual(
+            AnalysisResultsCacheUtils(inputs).inputs_hash,
+            AnalysisResultsCacheUtils(reordered).inputs_hash
+        )
+        inputs['analysis_dict']['variable'] = 'NDVI'
+        self.assertNotEqual(
+            AnalysisResultsCacheUtils(inputs).inputs_hash,
+            AnalysisResultsCacheUtils(reordered).inputs_hash
+        )
+
+    def test_create_analysis_cache_upsert(self):
+        cache_utils = AnalysisResultsCacheUtils(self._inputs())
+        self.assertIsNone(cache_utils.get_analysis_cache())
+
+        cache_utils.create_analysis_cache({'result': 1}, 1)
+        cache_utils.create_analysis_cache({'result': 2}, 1)
+        self.assertEqual(AnalysisResultsCache.objects.count(), 1)
+        self.assertEqual(cache_utils.get_analysis_cache(), {'result': 2})
+
+    def test_expired_cache_is_ignored(self):
+        cache_utils = AnalysisResultsCacheUtils(self._inputs())
+        cache_utils.create_analysis_cache({'result': 1}, 1)
+        AnalysisResultsCache.objects.update(
+            expired_at=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        self.assertIsNone(cache_utils.get_analysis_cache())
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }
+    },
+    ANALYSIS_RESULTS_REDIS_CACHE_ENABLED=True
+)
+class AnalysisResultsCacheTierTest(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.cache_utils = AnalysisResultsCacheUtils({
+            'locations': [],
+            'analysis_dict': {'variable': 'EVI'},
+            'args': [],
+            'kwargs': {}
+        })
+
+    def test_write_through_and_redis_hit(self):
+        self.cache_utils.create_analysis_cache({'result': 1}, 1)
+        # remove the db tier, results should come from redis tier
+        AnalysisResultsCache.objects.all().delete()
+        self.assertEqual(self.cache_utils.get_analysis_cache(), {'result': 1})
+        stats = AnalysisResultsCacheUtils.get_stats()
+        self.assertEqual(stats['redis'], {'hit': 1, 'miss': 0})
+        self.assertEqual(stats['db'], {'hit': 0, 'miss': 0})
+
+    def test_db_hit_warms_redis(self):
+        self.cache_utils.create_analysis_cache({'result': 1}, 1)
+        from django.core.cache import cache
+        cache.delete(self.cache_utils.redis_key)
+
+        self.assertEqual(self.cache_utils.get_analysis_cache(), {'result': 1})
+        self.assertEqual(self.cache_utils.get_analysis_cache(), {'result': 1})
+        stats = AnalysisResultsCacheUtils.get_stats()
+        self.assertEqual(stats['redis'], {'hit': 1, 'miss': 1})
+        self.assertEqual(stats['db'], {'hit': 1, 'miss': 0})
+
+    @override_settings(ANALYSIS_RESULTS_REDIS_CACHE_MAX_SIZE=1)
+    def test_large_results_skip_redis(self):
+        self.cache_utils.create_analysis_cache({'result': 1}, 1)
+        from django.core.cache import cache
+        self.assertIsNone(cache.get(self.cache_utils.redis_key))
+        self.assertEqual(self.cache_utils.get_analysis_cache(), {'result': 1})
+
+
+@override_settings(
+    GEE_ASSET_REGISTRY_ENABLED=True,
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }
+    }
+)
+class GEEAssetRegistryTest(TestCase):
+
+    def setUp(self):
+        gee_asset_registry.invalidate()
+        self.asset = GEEAsset.objects.create(
+            key='registry_asset',
+            source='projects/sample/registry_asset',
+            type=GEEAssetType.IMAGE_COLLECTION,
+            metadata={'start_date': '2000-01-01', 'end_date': '2010-12-31'}
+        )
+
+    def tearDown(self):
+        gee_asset_registry.invalidate()
+
+    def test_asset_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                GEEAsset.fetch_asset_source('registry_asset'),
+                'projects/sample/registry_asset'
+            )
+            self.assertTrue(
+                GEEAsset.is_date_within_asset_period(
+                    'registry_asset', '2005-01-01'
+                )
+            )
+            self.assertEqual(
+                GEEAsset.get_dates_within_asset_period(
+                    'registry_asset', '2005-01-01', '2015-01-01'
+                ),
+                (True, '2005-01-01', '2010-12-31')
+            )
+
+    def test_registry_is_refreshed_on_save(self):
+        GEEAsset.fetch_asset_source('registry_asset')
+        self.asset.source = 'projects/sample/updated'
+        self.asset.save()
+        self.assertEqual(
+            GEEAsset.fetch_asset_source('registry_asset'),
+            'projects/sample/updated'
+        )
+        self.asset.delete()
+        with self.assertRaises(KeyError):
+            GEEAsset.fetch_asset_source('registry_asset')
+
+    def test_user_asset_is_scoped_per_user(self):
+        asset = UserGEEAssetF()
+        other_user = UserF()
+        self.assertEqual(
+            UserGEEAsset.fetch_asset_source(asset.key, asset.created_by),
+            asset.source
+        )
+        with self.assertRaises(KeyError):
+            UserGEEAsset.fetch_asset_source(asset.key, other_user)
@@ -1,11 +1,16 @@
 import datetime
 from django.test import TestCase
+from django.utils import timezone
+from django.conf import settings
 from unittest.mock import patch, ANY, MagicMock
 from django.contrib.auth.models import User
 
 from analysis.tasks import (
     store_spatial_analysis_raster_output,
-    generate_temporal_analysis_raster_output
+    generate_temporal_analysis_raster_output,
+    store_raster_output_export,
+    poll_gee_export_tasks,
+    sweep_ingestor_asset_status
 )
 from core.factories import UserF
 from django.test import TestCase
@@ -15,6 +20,7 @@ from analysis.models import (
     UserAnalysisResults, 
     AnalysisRasterOutput, 
     UserIndicator,
+    UserGEEAsset,
     AnalysisTask,
     GEEAssetType,
     IndicatorSource,
@@ -93,13 +99,21 @@ class TestStoreAnalysisRasterOutput(TestCase):
         )
         mock_ee.return_value = MagicMock()
         mock_run_spatial_analysis.return_value = 'mock_image'
-        mock_export_image_to_drive.return_value = {'state': 'COMPLETED'}
+        mock_export_image_to_drive.return_value = {
+            'id': 'task-1', 'state': 'READY'
+        }
         gdrive_file = MagicMock()
         gdrive_file.get.return_value = 100
         mock_get_gdrive_file.return_value = gdrive_file
         mock_store_cog_as_layer.side_effect = do_nothing
 
         store_spatial_analysis_raster_output(mock_raster_output.uuid)
+        mock_raster_output.refresh_from_db()
+        self.assertEqual(mock_raster_output.status, 'RUNNING')
+        self.assertEqual(mock_raster_output.gee_task_id, 'task-1')
+        store_raster_output_export(
+            mock_raster_output.uuid, {'id': 'task-1', 'state': 'COMPLETED'}
+        )
         
         # Assertions
         mock_initialize_engine_analysis.assert_called_once()
@@ -213,13 +227,21 @@ class TestStoreAnalysisRasterOutput(TestCase):
         # Mock return values
         # mock_get_bounds.return_value = {'coordinates': [34.0, -1.0]}
         mock_ee.return_value = MagicMock()
-        mock_export_image_to_drive.return_value = {'state': 'COMPLETED'}
+        mock_export_image_to_drive.return_value = {
+            'id': 'task-1', 'state': 'READY'
+        }
         gdrive_file = MagicMock()
         gdrive_file.get.return_value = 100
         mock_get_gdrive_file.return_value = gdrive_file
         mock_store_cog_as_layer.side_effect = do_nothing
 
         store_spatial_analysis_raster_output(mock_raster_output.uuid)
+        mock_raster_output.refresh_from_db()
+        self.assertEqual(mock_raster_output.status, 'RUNNING')
+        self.assertEqual(mock_raster_output.gee_task_id, 'task-1')
+        store_raster_output_export(
+            mock_raster_output.uuid, {'id': 'task-1', 'state': 'COMPLETED'}
+        )
         
         # Assertions
         mock_initialize_engine_analysis.assert_called_once()
@@ -290,13 +312,21 @@ class TestStoreAnalysisRasterOutput(TestCase):
         mock_input_layer.get_communities.return_value = MagicMock()
         mock_ee.return_value = MagicMock()
         mock_calculate_temporal_to_img.return_value = MagicMock()
-        mock_export_image_to_drive.return_value = {'state': 'COMPLETED'}
+        mock_export_image_to_drive.return_value = {
+            'id': 'task-1', 'state': 'READY'
+        }
         gdrive_file = MagicMock()
         gdrive_file.get.return_value = 100
         mock_get_gdrive_file.return_value = gdrive_file
         mock_store_cog_as_layer.side_effect = do_nothing
 
         generate_temporal_analysis_raster_output(mock_raster_output.uuid)
+        mock_raster_output.refresh_from_db()
+        self.assertEqual(mock_raster_output.status, 'RUNNING')
+        self.assertEqual(mock_raster_output.gee_task_id, 'task-1')
+        store_raster_output_export(
+            mock_raster_output.uuid, {'id': 'task-1', 'state': 'COMPLETED'}
+        )
 
         # Assertions
         mock_initialize_engine_analysis.assert_called_once()
@@ -311,7 +341,8 @@ class TestStoreAnalysisRasterOutput(TestCase):
             file_name_prefix=str(mock_raster_output.uuid),
             scale=120,
             region=ANY,
-            vis_params=ANY
+            vis_params=ANY,
+            wait=False
         )
         mock_raster_output.refresh_from_db()
         self.assertEqual(mock_raster_output.status, 'COMPLETED')
@@ -379,11 +410,19 @@ class TestStoreAnalysisRasterOutput(TestCase):
         mock_input_layer.get_communities.return_value = MagicMock()
         mock_ee.return_value = MagicMock()
         mock_calculate_temporal_to_img.return_value = MagicMock()
-        mock_export_image_to_drive.return_value = {'state': 'COMPLETED'}
+        mock_export_image_to_drive.return_value = {
+            'id': 'task-1', 'state': 'READY'
+        }
         mock_get_gdrive_file.return_value = None
         mock_store_cog_as_layer.side_effect = do_nothing
 
         generate_temporal_analysis_raster_output(mock_raster_output.uuid)
+        mock_raster_output.refresh_from_db()
+        self.assertEqual(mock_raster_output.status, 'RUNNING')
+        self.assertEqual(mock_raster_output.gee_task_id, 'task-1')
+        store_raster_output_export(
+            mock_raster_output.uuid, {'id': 'task-1', 'state': 'COMPLETED'}
+        )
 
         # Assertions
         mock_initialize_engine_analysis.assert_called_once()
@@ -398,7 +437,8 @@ class TestStoreAnalysisRasterOutput(TestCase):
             file_name_prefix=str(mock_raster_output.uuid),
             scale=120,
             region=ANY,
-            vis_params=ANY
+            vis_params=ANY,
+            wait=False
         )
         mock_raster_output.refresh_from_db()
         self.assertEqual(mock_raster_output.status, 'FAILED')
@@ -406,3 +446,217 @@ class TestStoreAnalysisRasterOutput(TestCase):
             mock_raster_output.status_logs['gdrive_error'],
             f'File {mock_raster_output.raster_filename} not found!'
         )
+
+
+class TestPollGEEExportTasks(TestCase):
+
+    def _create_raster_output(self, task_id):
+        return AnalysisRasterOutput.objects.create(
+            analysis={'analysisType': 'Spatial'},
+            name='mock_filename',
+            status='RUNNING',
+            gee_task_id=task_id,
+            status_logs={'id': task_id, 'state': 'READY'}
+        )
+
+    @patch('analysis.tasks.store_raster_output_export')
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_poll_gee_export_tasks(
+        self, mock_initialize_engine_analysis, mock_get_statuses,
+        mock_store
+    ):
+        running = self._create_raster_output('task-1')
+        completed = self._create_raster_output('task-2')
+        mock_get_statuses.return_value = {
+            'task-1': {'id': 'task-1', 'state': 'RUNNING'},
+            'task-2': {'id': 'task-2', 'state': 'COMPLETED'}
+        }
+
+        poll_gee_export_tasks()
+
+        mock_get_statuses.assert_called_once()
+        self.assertCountEqual(
+            mock_get_statuses.call_args[0][0], ['task-1', 'task-2']
+        )
+        mock_store.delay.assert_called_once_with(
+            str(completed.uuid), {'id': 'task-2', 'state': 'COMPLETED'}
+        )
+        completed.refresh_from_db()
+        self.assertEqual(completed.status_logs['state'], 'COMPLETED')
+        running.refresh_from_db()
+        self.assertEqual(running.status_logs['state'], 'READY')
+
+        # finished export is not stored twice
+        mock_store.reset_mock()
+        mock_get_statuses.reset_mock()
+        poll_gee_export_tasks()
+        mock_get_statuses.assert_called_once_with(['task-1'])
+        mock_store.delay.assert_not_called()
+
+    @patch('analysis.tasks.store_raster_output_export')
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_poll_requeue_timed_out_store(
+        self, mock_initialize_engine_analysis, mock_get_statuses,
+        mock_store
+    ):
+        status = {'id': 'task-1', 'state': 'COMPLETED'}
+        raster_output = self._create_raster_output('task-1')
+        AnalysisRasterOutput.objects.filter(id=raster_output.id).update(
+            status_logs=status,
+            store_claimed_at=timezone.now() - datetime.timedelta(
+                seconds=settings.GEE_EXPORT_STORE_TIMEOUT + 60
+            ),
+            store_attempts=1
+        )
+        mock_get_statuses.return_value = {'task-1': status}
+
+        poll_gee_export_tasks()
+
+        mock_store.delay.assert_called_once_with(
+            str(raster_output.uuid), status
+        )
+        raster_output.refresh_from_db()
+        self.assertEqual(raster_output.status, 'RUNNING')
+        self.assertEqual(raster_output.store_attempts, 2)
+
+    @patch('analysis.tasks.store_raster_output_export')
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_poll_fail_timed_out_store(
+        self, mock_initialize_engine_analysis, mock_get_statuses,
+        mock_store
+    ):
+        status = {'id': 'task-1', 'state': 'COMPLETED'}
+        raster_output = self._create_raster_output('task-1')
+        AnalysisRasterOutput.objects.filter(id=raster_output.id).update(
+            status_logs=status,
+            store_claimed_at=timezone.now() - datetime.timedelta(
+                seconds=settings.GEE_EXPORT_STORE_TIMEOUT + 60
+            ),
+            store_attempts=settings.GEE_EXPORT_STORE_MAX_ATTEMPTS
+        )
+        mock_get_statuses.return_value = {'task-1': status}
+
+        poll_gee_export_tasks()
+
+        mock_store.delay.assert_not_called()
+        raster_output.refresh_from_db()
+        self.assertEqual(raster_output.status, 'FAILED')
+        self.assertIn('store_error', raster_output.status_logs)
+
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_poll_without_running_export(
+        self, mock_initialize_engine_analysis, mock_get_statuses
+    ):
+        poll_gee_export_tasks()
+        mock_initialize_engine_analysis.assert_not_called()
+        mock_get_statuses.assert_not_called()
+
+
+class TestSweepIngestorAssetStatus(TestCase):
+
+    def setUp(self):
+        self.user = UserF.create()
+
+    def _create_asset(self, key, task_statuses):
+        return UserGEEAssetF(
+            key=key,
+            created_by=self.user,
+            is_ingesting=True,
+            ingestion_status={
+                task_id: {'status': status, 'error': None}
+                for task_id, status in task_statuses.items()
+            }
+        )
+
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_sweep_ingestor_asset_status(
+        self, mock_initialize_engine_analysis, mock_get_statuses
+    ):
+        completed = self._create_asset(
+            'completed-asset', {'task-1': 'COMPLETED', 'task-2': 'RUNNING'}
+        )
+        failed = self._create_asset('failed-asset', {'task-3': 'PENDING'})
+        running = self._create_asset('running-asset', {'task-4': 'READY'})
+        done = self._create_asset('done-asset', {'task-5': 'COMPLETED'})
+        for asset in [completed, failed, running, done]:
+            UserIndicatorF(
+                name=asset.key,
+                variable_name=asset.key,
+                created_by=self.user,
+                is_active=False,
+                config={'asset_keys': [asset.key]}
+            )
+        mock_get_statuses.return_value = {
+            'task-2': {'id': 'task-2', 'state': 'COMPLETED'},
+            'task-3': {
+                'id': 'task-3', 'state': 'FAILED',
+                'error_message': 'Invalid file'
+            },
+            'task-4': {'id': 'task-4', 'state': 'RUNNING'}
+        }
+
+        sweep_ingestor_asset_status()
+
+        mock_get_statuses.assert_called_once()
+        self.assertCountEqual(
+            mock_get_statuses.call_args[0][0], ['task-2', 'task-3', 'task-4']
+        )
+        for asset in [completed, failed, running, done]:
+            asset.refresh_from_db()
+        self.assertFalse(completed.is_ingesting)
+        self.assertFalse(failed.is_ingesting)
+        self.assertTrue(running.is_ingesting)
+        self.assertFalse(done.is_ingesting)
+        self.assertEqual(
+            failed.ingestion_status['task-3'],
+            {'status': 'FAILED', 'error': 'Invalid file'}
+        )
+        self.assertEqual(
+            running.ingestion_status['task-4']['status'], 'RUNNING'
+        )
+        indicators = dict(
+            UserIndicator.objects.values_list('variable_name', 'is_active')
+        )
+        self.assertTrue(indicators['completed-asset'])
+        self.assertFalse(indicators['failed-asset'])
+        self.assertFalse(indicators['running-asset'])
+        self.assertTrue(indicators['done-asset'])
+
+    @patch('analysis.tasks.get_task_statuses')
+    @patch('analysis.tasks.initialize_engine_analysis')
+    def test_sweep_ingestor_asset_status_timeout(
+        self, mock_initialize_engine_analysis, mock_get_statuses
+    ):
+        stale = self._create_asset('stale-asset', {'task-1': 'RUNNING'})
+        recent = self._create_asset('recent-asset', {'task-2': 'RUNNING'})
+        UserGEEAsset.objects.filter(id=stale.id).update(
+            updated_at=timezone.now() - datetime.timedelta(hours=2)
+        )
+        UserIndicatorF(
+            name=stale.key,
+            variable_name=stale.key,
+            created_by=self.user,
+            is_active=True,
+            config={'asset_keys': [stale.key]}
+        )
+        # task status is not resolved
+        mock_get_statuses.return_value = {}
+
+        sweep_ingestor_asset_status()
+
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertFalse(stale.is_ingesting)
+        self.assertEqual(stale.ingestion_status['task-1']['status'], 'FAILED')
+        self.assertTrue(recent.is_ingesting)
+        self.assertEqual(
+            recent.ingestion_status['task-2']['status'], 'RUNNING'
+        )
+        self.assertFalse(
+            UserIndicator.objects.get(variable_name=stale.key).is_active
+        )
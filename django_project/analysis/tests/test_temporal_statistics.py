@@ -0,0 +1,163 @@
+from django.test import TestCase
+
+from analysis.temporal_statistics import (
+    COLUMNAR_TYPE,
+    ResultFormat,
+    add_empty_records,
+    compute_statistics,
+    convert_results,
+    get_bands
+)
+
+
+def _feature(name, year, month, **bands):
+    return {
+        'type': 'Feature',
+        'geometry': None,
+        'properties': {
+            'Name': name,
+            'year': year,
+            'month': month,
+            'date': 0,
+            **bands
+        }
+    }
+
+
+class TemporalStatisticsTest(TestCase):
+    """Test columnar statistics of temporal analysis results."""
+
+    def setUp(self):
+        self.features = [
+            _feature('B', 2019, 1, EVI=0.2, NDVI=0.4),
+            _feature('B', 2019, 2, EVI=0.4, NDVI=None),
+            _feature('A', 2019, 1, EVI=0.1, NDVI=0.3),
+            _feature('A', 2020, 1, EVI=0.5, NDVI=0.7),
+            _feature('C', 2018, 1, EVI=0.9, NDVI=0.9),
+        ]
+
+    def test_get_bands(self):
+        """Test numeric bands are detected from the properties."""
+        self.assertEqual(
+            get_bands([f['properties'] for f in self.features]),
+            ['EVI', 'NDVI']
+        )
+
+    def test_compute_statistics(self):
+        """Test min, max and mean per year and name."""
+        results = compute_statistics(self.features, [2019, 2020, 2021])
+        self.assertEqual(list(results.keys()), [2019, 2020, 2021])
+        self.assertEqual(list(results[2019].keys()), ['A', 'B'])
+        self.assertEqual(list(results[2019]['B'].keys()), ['EVI', 'NDVI'])
+        self.assertAlmostEqual(results[2019]['B']['EVI']['mean'], 0.3)
+        self.assertEqual(results[2019]['B']['EVI']['min'], 0.2)
+        self.assertEqual(results[2019]['B']['EVI']['max'], 0.4)
+        # null value is ignored
+        self.assertEqual(
+            results[2019]['B']['NDVI'],
+            {'min': 0.4, 'max': 0.4, 'mean': 0.4}
+        )
+        self.assertEqual(list(results[2020].keys()), ['A'])
+        # year without data has null statistics for every name
+        self.assertEqual(list(results[2021].keys()), ['A', 'B'])
+        self.assertEqual(
+            results[2021]['A']['EVI'],
+            {'min': None, 'max': None, 'mean': None}
+        )
+
+    def test_compute_statistics_custom_bands(self):
+        """Test statistics of arbitrary indicator band."""
+        features = [
+            _feature('A', 2019, 1, **{'Grassland': 10}),
+            _feature('A', 2019, 2, **{'Grassland': 20}),
+        ]
+        results = compute_statistics(features, 2019)
+        self.assertEqual(
+            results[2019]['A']['Grassland'],
+            {'min': 10.0, 'max': 20.0, 'mean': 15.0}
+        )
+        self.assertEqual(compute_statistics([], [2019]), {})
+
+    def test_add_empty_records(self):
+        """Test null record is added for each name of missing year."""
+        records = add_empty_records(self.features, [2019, 2021, 2021])
+        self.assertEqual(len(records), 3)
+        self.assertEqual(
+            [r['properties']['Name'] for r in records], ['B', 'A', 'C']
+        )
+        for record in records:
+            self.assertEqual(record['properties']['year'], 2021)
+            self.assertIsNone(record['properties']['EVI'])
+            self.assertIsNone(record['properties']['NDVI'])
+        # source features are not modified
+        self.assertEqual(self.features[0]['properties']['year'], 2019)
+        self.assertEqual(add_empty_records(self.features, [2019]), [])
+
+
+class ColumnarResultsTest(TestCase):
+    """Test columnar form of temporal analysis results."""
+
+    def setUp(self):
+        self.feature_collection = {
+            'type': 'FeatureCollection',
+            'columns': {'EVI': 'Float', 'Name': 'String'},
+            'statistics': {'2019': {}},
+            'features': [
+                _feature('B', 2019, 1, EVI=0.2),
+                _feature('A', 2019, 1, EVI=None),
+                {
+                    'type': 'Feature',
+                    'geometry': None,
+                    'id': '2',
+                    'properties': {'Name': 'B', 'year': 2020}
+                }
+            ]
+        }
+
+    def test_to_columnar(self):
+        """Test names are dictionary encoded and columns are parallel."""
+        results = convert_results(
+            [self.feature_collection, {'key': 'value'}],
+            ResultFormat.COLUMNAR
+        )
+        columnar = results[0]
+        self.assertEqual(columnar['type'], COLUMNAR_TYPE)
+        self.assertEqual(columnar['length'], 3)
+        self.assertEqual(columnar['names'], ['A', 'B'])
+        self.assertEqual(columnar['columns']['Name'], [1, 0, 1])
+        self.assertEqual(columnar['columns']['EVI'], [0.2, None, None])
+        self.assertEqual(columnar['columns']['year'], [2019, 2019, 2020])
+        self.assertEqual(
+            columnar['missing'], {'EVI': [2], 'date': [2], 'month': [2]}
+        )
+        self.assertEqual(columnar['ids'], [None, None, '2'])
+        self.assertNotIn('geometries', columnar)
+        self.assertEqual(
+            columnar['metadata'],
+            {
+                'columns': {'EVI': 'Float', 'Name': 'String'},
+                'statistics': {'2019': {}}
+            }
+        )
+        self.assertEqual(results[1], {'key': 'value'})
+
+    def test_from_columnar(self):
+        """Test columnar form is converted back losslessly."""
+        results = convert_results(
+            convert_results([self.feature_collection], ResultFormat.COLUMNAR),
+            ResultFormat.GEOJSON
+        )
+        feature_collection = results[0]
+        self.assertEqual(feature_collection, self.feature_collection)
+        # null value is kept, missing property is not added
+        self.assertIn('EVI', feature_collection['features'][1]['properties'])
+        self.assertNotIn(
+            'EVI', feature_collection['features'][2]['properties']
+        )
+        self.assertNotIn('id', feature_collection['features'][0])
+
+        # GeoJSON is kept when it is requested
+        self.assertEqual(
+            convert_results(self.feature_collection, ResultFormat.GEOJSON),
+            self.feature_collection
+        )
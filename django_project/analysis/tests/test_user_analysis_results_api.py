@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from analysis.models import AnalysisRasterOutput, UserAnalysisResults
+from dashboard.models import Dashboard
+
+User = get_user_model()
+
+
+class UserAnalysisResultsSummaryTestCase(APITestCase):
+    """Test summary and detail of user analysis results."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.dashboard = Dashboard.objects.create(
+            title="Dashboard 1",
+            created_by=self.user
+        )
+
+    def create_analysis(self, idx):
+        """Create analysis with two raster outputs and a dashboard."""
+        analysis = UserAnalysisResults.objects.create(
+            created_by=self.user,
+            name=f'Analysis {idx}',
+            analysis_results={
+                "data": {
+                    "analysisType": "Temporal",
+                    "landscape": "Test Landscape",
+                    "variable": "EVI"
+                },
+                "results": [
+                    {"features": [{"properties": {"EVI": 0.5}}] * 100}
+                ]
+            }
+        )
+        outputs = [
+            AnalysisRasterOutput.objects.create(
+                analysis={'analysisType': 'Temporal', 'idx': idx, 'n': n},
+                name=f'output_{idx}_{n}.tif',
+                status='COMPLETED'
+            ) for n in range(2)
+        ]
+        analysis.raster_outputs.set(outputs)
+        self.dashboard.analysis_results.add(analysis)
+        return analysis
+
+    def count_fetch_queries(self):
+        """Fetch the first page and return the number of queries."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                '/user_analysis_results/fetch/?page=1&limit=10'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response.data
+
+    def test_fetch_summary(self):
+        analysis = self.create_analysis(1)
+        _, data = self.count_fetch_queries()
+        self.assertEqual(data['count'], 1)
+        item = data['results'][0]
+        self.assertEqual(item['id'], analysis.id)
+        self.assertEqual(
+            item['analysis_results'],
+            {'data': analysis.analysis_results['data']}
+        )
+        self.assertEqual(
+            item['dashboards'],
+            [{'id': self.dashboard.uuid, 'title': self.dashboard.title}]
+        )
+        self.assertEqual(len(item['raster_output_list']), 2)
+        self.assertEqual(item['created_by']['id'], self.user.id)
+
+    def test_fetch_summary_queries(self):
+        self.create_analysis(1)
+        num_queries, _ = self.count_fetch_queries()
+        for idx in range(2, 6):
+            self.create_analysis(idx)
+        num_queries_more, data = self.count_fetch_queries()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(num_queries, num_queries_more)
+
+    def test_retrieve_full_results(self):
+        analysis = self.create_analysis(1)
+        response = self.client.get(
+            f'/user_analysis_results/{analysis.id}/'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['analysis_results'], analysis.analysis_results
+        )
+        self.assertEqual(len(response.data['raster_output_list']), 2)
+
+    def test_fetch_analysis_results_queries(self):
+        self.create_analysis(1)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/user_analysis_results/fetch_analysis_results/')
+        num_queries = len(context.captured_queries)
+        for idx in range(2, 6):
+            self.create_analysis(idx)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                '/user_analysis_results/fetch_analysis_results/'
+            )
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(
+            response.data[0]['analysis_results']['results'][0][
+                'features'][0],
+            {"properties": {"EVI": 0.5}}
+        )
+        self.assertEqual(num_queries, len(context.captured_queries))
@@ -1,9 +1,12 @@
 import base64
+import hashlib
 import json
 import os
 import logging
 import rasterio
 import calendar
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from pydrive2.auth import GoogleAuth
@@ -137,6 +140,75 @@ def sort_nested_structure(d):
     return d
 
 
+def get_nested_structure_digest(d):
+    """Get sha256 digest of the canonical form of nested structure."""
+    canonical = json.dumps(
+        sort_nested_structure(d),
+        sort_keys=True,
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LazyDict(Mapping):
+    """Read-only mapping that builds and memoizes values on first access.
+
+    :param builders: Dictionary of key to callable building its value.
+    :param overrides: Optional callable returning dictionary of extra
+        values that take precedence over the builders, called once on
+        the first access.
+    """
+
+    def __init__(self, builders: dict, overrides=None):
+        self._builders = builders
+        self._overrides = overrides
+        self._values = {}
+        self._override_values = None
+
+    def _get_override_values(self):
+        """Build the override values once."""
+        if self._override_values is None:
+            self._override_values = (
+                self._overrides() if self._overrides else {}
+            )
+        return self._override_values
+
+    def __getitem__(self, key):
+        override_values = self._get_override_values()
+        if key in override_values:
+            return override_values[key]
+        if key in self._values:
+            return self._values[key]
+        if key in self._builders:
+            self._values[key] = self._builders[key]()
+            return self._values[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        override_values = self._get_override_values()
+        yield from override_values
+        for key in self._builders:
+            if key not in override_values:
+                yield key
+
+    def __len__(self):
+        return len(
+            set(self._builders).union(self._get_override_values())
+        )
+
+
+def get_info_concurrently(*ee_objects):
+    """Evaluate Earth Engine objects concurrently.
+
+    Return tuple of getInfo results in the same order as the objects.
+    """
+    if len(ee_objects) < 2:
+        return tuple(obj.getInfo() for obj in ee_objects)
+    with ThreadPoolExecutor(max_workers=len(ee_objects)) as executor:
+        return tuple(executor.map(lambda obj: obj.getInfo(), ee_objects))
+
+
 def get_cog_bounds(cog_path):
     """Get bounds of a COG file."""
     try:
@@ -148,6 +220,17 @@ def get_cog_bounds(cog_path):
         return None
 
 
+def is_cog_with_no_data(cog_path, no_data_value):
+    """Check if the file is a COG that has the no data value."""
+    try:
+        with rasterio.open(cog_path) as src:
+            layout = src.tags(ns='IMAGE_STRUCTURE').get('LAYOUT')
+            return layout == 'COG' and src.nodata == no_data_value
+    except Exception as e:
+        logger.error(f"Error reading {cog_path}: {e}")
+        return False
+
+
 def split_dates_by_year(start_date: date, end_date: date):
     """Split a date range into yearly intervals."""
     if start_date > end_date:
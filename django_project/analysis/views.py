@@ -2,7 +2,7 @@ import math
 from rest_framework import viewsets
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from django.http import Http404, FileResponse
+from django.http import Http404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
@@ -12,9 +12,13 @@ from cloud_native_gis.models import (
     LayerUpload
 )
 
+from core.file_response import ranged_file_response
 from dashboard.models import Dashboard
 from .models import UserAnalysisResults
-from .serializer import UserAnalysisResultsSerializer
+from .serializer import (
+    UserAnalysisResultsSerializer,
+    UserAnalysisResultsSummarySerializer
+)
 from analysis.models import AnalysisRasterOutput
 from analysis.tasks import (
     generate_temporal_analysis_raster_output,
@@ -27,6 +31,15 @@ class UserAnalysisResultsViewSet(viewsets.ModelViewSet):
     serializer_class = UserAnalysisResultsSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        """Return queryset with prefetched relations.
+
+        The detail (retrieve) returns the full analysis results.
+        """
+        return UserAnalysisResultsSerializer.setup_queryset(
+            super().get_queryset()
+        )
+
     def perform_create(self, serializer):
         serializer.save(
             created_by=self.request.user,
@@ -35,8 +48,8 @@ class UserAnalysisResultsViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def fetch_analysis_results(self, request):
-        analysis_results = UserAnalysisResults.objects.filter(
-            created_by=request.user
+        analysis_results = UserAnalysisResultsSerializer.setup_queryset(
+            UserAnalysisResults.objects.filter(created_by=request.user)
         ).order_by('-created_at')
         serializer = self.get_serializer(analysis_results, many=True)
         return Response(serializer.data)
@@ -148,18 +161,19 @@ class UserAnalysisResultsViewSet(viewsets.ModelViewSet):
             if not layer.is_ready or not file:
                 raise Http404("File is not ready.")
 
-            response = FileResponse(
-                open(file, 'rb'),
-                content_type='image/tiff'
-            )
-            response['Content-Disposition'] = (
-                f'attachment; filename="{raster_output.name}"'
+            return ranged_file_response(
+                request,
+                file,
+                content_type='image/tiff',
+                filename=raster_output.name
             )
-            return response
 
     @action(detail=False, methods=['get'])
     def fetch(self, request):
-        """Fetch analysis results with pagination."""
+        """Fetch summary of analysis results with pagination.
+
+        Full analysis results should be fetched from the detail endpoint.
+        """
         page = request.GET.get('page', 1)
         limit = request.GET.get('limit', 10)
         search = request.GET.get('search', '')
@@ -193,8 +207,13 @@ class UserAnalysisResultsViewSet(viewsets.ModelViewSet):
 
         start = (int(page) - 1) * int(limit)
         end = start + int(limit)
-        paginated_results = queryset[start:end]
-        serializer = self.get_serializer(paginated_results, many=True)
+        paginated_results = (
+            UserAnalysisResultsSummarySerializer.setup_queryset(queryset)
+        )[start:end]
+        serializer = UserAnalysisResultsSummarySerializer(
+            paginated_results, many=True,
+            context=self.get_serializer_context()
+        )
         return Response({
             'results': serializer.data,
             'count': total_count,
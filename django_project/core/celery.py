@@ -45,6 +45,11 @@ app.conf.beat_schedule = {
         # Run every hour
         'schedule': crontab(minute='00', hour='*'),
     },
+    'sweep-analysis-payloads': {
+        'task': 'sweep_analysis_payloads',
+        # Run everyday at 01:00 UTC
+        'schedule': crontab(minute='00', hour='01'),
+    },
     'cleanup-old-export-request': {
         'task': 'cleanup_export_request',
         # Run everyday at 00:00 UTC
@@ -65,9 +70,24 @@ app.conf.beat_schedule = {
         # Run every week on Monday at 00:00 UTC
         'schedule': crontab(minute='00', hour='00', day_of_week='1'),
     },
+    'poll-gee-export-tasks': {
+        'task': 'poll_gee_export_tasks',
+        # Run every minute
+        'schedule': crontab(minute='*'),
+    },
+    'sweep-ingestor-asset-status': {
+        'task': 'sweep_ingestor_asset_status',
+        # Run every minute
+        'schedule': crontab(minute='*'),
+    },
     'fetch-earth-rangers': {
         'task': 'earthranger.tasks.scheduled_fetch',
-        # Run every week on Monday at 01:00 UTC
+        # Incremental fetch, run every hour
+        'schedule': crontab(minute='00', hour='*'),
+    },
+    'reconcile-earth-rangers': {
+        'task': 'earthranger.tasks.reconcile_earth_ranger_events',
+        # Full fetch, run every week on Monday at 02:00 UTC
         'schedule': crontab(minute='00', hour='02', day_of_week='1'),
     }
 }
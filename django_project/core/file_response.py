@@ -0,0 +1,94 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: File response with HTTP Range support.
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_HEADER_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def parse_range_header(range_header: str, file_size: int):
+    """Parse single byte range of Range header.
+
+    :return: Tuple of first and last byte position, None if the header
+        is not a single byte range that can be served partially.
+    :raises ValueError: When the range is not satisfiable.
+    """
+    match = RANGE_HEADER_RE.match(range_header.strip())
+    if not match:
+        # multiple or invalid ranges are served as full content
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError('Range is not satisfiable.')
+        return max(file_size - length, 0), file_size - 1
+    first = int(first)
+    last = int(last) if last else file_size - 1
+    if first >= file_size or last < first:
+        raise ValueError('Range is not satisfiable.')
+    return first, min(last, file_size - 1)
+
+
+def _iter_file_range(file, first, last):
+    """Read file from first to last byte position in chunks."""
+    try:
+        file.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = file.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def ranged_file_response(
+    request, file_path, content_type='application/octet-stream',
+    filename=None
+):
+    """Create file response that supports single byte range request."""
+    file_size = os.path.getsize(file_path)
+    range_header = request.META.get('HTTP_RANGE')
+    byte_range = None
+    if range_header:
+        try:
+            byte_range = parse_range_header(range_header, file_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{file_size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(file_path, 'rb'),
+            content_type=content_type
+        )
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(
+            _iter_file_range(open(file_path, 'rb'), first, last),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Length'] = str(last - first + 1)
+        response['Content-Range'] = f'bytes {first}-{last}/{file_size}'
+    response['Accept-Ranges'] = 'bytes'
+    if filename:
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+    return response
@@ -5,6 +5,7 @@
 Adjust these values as needed but don't commit passwords etc. to any public
 repository!
 """
+import ast  # noqa
 import os  # noqa
 
 from .contrib import *  # noqa
@@ -57,3 +58,110 @@ GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "ktz-dev-bkt-gcs-01")
 
 # GEE ASSET ID PREFIX
 GEE_ASSET_ID_PREFIX = os.getenv("GEE_ASSET_ID_PREFIX", "projects/ee-dng/assets/")
+
+# Redis hot tier of the analysis results cache
+ANALYSIS_RESULTS_REDIS_CACHE_ENABLED = ast.literal_eval(
+    os.getenv('ANALYSIS_RESULTS_REDIS_CACHE_ENABLED', 'True')
+)
+# Maximum size in bytes of compressed results that is stored in redis
+ANALYSIS_RESULTS_REDIS_CACHE_MAX_SIZE = int(
+    os.getenv('ANALYSIS_RESULTS_REDIS_CACHE_MAX_SIZE', str(8 * 1024 * 1024))
+)
+
+# In-memory GEE asset registry per worker, refreshed by a version key
+# in redis when GEEAsset/UserGEEAsset is changed
+GEE_ASSET_REGISTRY_ENABLED = ast.literal_eval(
+    os.getenv('GEE_ASSET_REGISTRY_ENABLED', 'True')
+)
+
+# Page size of features when fetching analysis FeatureCollection
+ANALYSIS_FEATURE_PAGE_SIZE = int(
+    os.getenv('ANALYSIS_FEATURE_PAGE_SIZE', '1000')
+)
+
+# Concurrency of near-real time layer generation and timeout in seconds
+# to wait for each layer of a landscape
+NRT_GENERATOR_MAX_WORKERS = int(
+    os.getenv('NRT_GENERATOR_MAX_WORKERS', '4')
+)
+NRT_GENERATOR_ITEM_TIMEOUT = int(
+    os.getenv('NRT_GENERATOR_ITEM_TIMEOUT', '600')
+)
+
+# Chunk size in bytes when downloading exported raster from GDrive
+GDRIVE_DOWNLOAD_CHUNK_SIZE = int(
+    os.getenv('GDRIVE_DOWNLOAD_CHUNK_SIZE', str(8 * 1024 * 1024))
+)
+
+# Local disk cache of exported COG files downloaded from GDrive
+EXPORTED_COG_CACHE_DIR = os.getenv(
+    'EXPORTED_COG_CACHE_DIR', '/tmp/exported-cog-cache'
+)
+EXPORTED_COG_CACHE_MAX_SIZE = int(
+    os.getenv('EXPORTED_COG_CACHE_MAX_SIZE', str(2 * 1024 * 1024 * 1024))
+)
+
+# Number of EarthRanger pages downloaded ahead of the stored pages and
+# number of EarthRanger URL/token groups that are fetched concurrently
+EARTH_RANGER_PAGE_QUEUE_SIZE = int(
+    os.getenv('EARTH_RANGER_PAGE_QUEUE_SIZE', '2')
+)
+EARTH_RANGER_MAX_CONCURRENT_FETCH = int(
+    os.getenv('EARTH_RANGER_MAX_CONCURRENT_FETCH', '4')
+)
+
+# Timeout in seconds of cached EarthRanger events vector tiles, the tiles
+# are also invalidated when events are stored
+EARTH_RANGER_TILE_CACHE_TIMEOUT = int(
+    os.getenv('EARTH_RANGER_TILE_CACHE_TIMEOUT', str(24 * 60 * 60))
+)
+
+# Landscape community vector tiles are cached until the communities are
+# changed, browsers revalidate them by ETag after max age in seconds
+LANDSCAPE_TILE_CACHE_TIMEOUT = int(
+    os.getenv('LANDSCAPE_TILE_CACHE_TIMEOUT', str(7 * 24 * 60 * 60))
+)
+LANDSCAPE_TILE_MAX_AGE = int(
+    os.getenv('LANDSCAPE_TILE_MAX_AGE', str(60 * 60))
+)
+
+# Groups of vector input layers that are baked into PMTiles archives
+VECTOR_TILE_ARCHIVE_LAYER_GROUPS = ast.literal_eval(
+    os.getenv('VECTOR_TILE_ARCHIVE_LAYER_GROUPS', "['baseline']")
+)
+
+# Timeout in seconds of the columnar form of analysis task results,
+# keyed by the digest of the results payload
+ANALYSIS_COLUMNAR_RESULT_CACHE_TIMEOUT = int(
+    os.getenv('ANALYSIS_COLUMNAR_RESULT_CACHE_TIMEOUT', str(60 * 60))
+)
+
+# Timeout in seconds of analysis task status pushed to the cache on
+# status transitions
+ANALYSIS_TASK_STATUS_CACHE_TIMEOUT = int(
+    os.getenv('ANALYSIS_TASK_STATUS_CACHE_TIMEOUT', str(24 * 60 * 60))
+)
+
+# Bare ground classifier is trained within AOI bounds snapped outward to
+# this grid size in degrees and cached for the timeout in seconds
+BGT_CLASSIFIER_GRID_SIZE = float(
+    os.getenv('BGT_CLASSIFIER_GRID_SIZE', '0.05')
+)
+BGT_CLASSIFIER_CACHE_TIMEOUT = int(
+    os.getenv('BGT_CLASSIFIER_CACHE_TIMEOUT', str(7 * 24 * 60 * 60))
+)
+
+# Running ingestion tasks of user GEE asset are marked as failed when
+# the asset has no status change for this timeout in seconds
+USER_GEE_ASSET_INGESTION_TIMEOUT = int(
+    os.getenv('USER_GEE_ASSET_INGESTION_TIMEOUT', str(60 * 60))
+)
+
+# Finished GEE export whose store task is not done after this timeout in
+# seconds is queued again, up to the max attempts before it is failed
+GEE_EXPORT_STORE_TIMEOUT = int(
+    os.getenv('GEE_EXPORT_STORE_TIMEOUT', str(60 * 60))
+)
+GEE_EXPORT_STORE_MAX_ATTEMPTS = int(
+    os.getenv('GEE_EXPORT_STORE_MAX_ATTEMPTS', '3')
+)
@@ -8,4 +8,6 @@ CACHES = {
 
 WEBPACK_LOADER['DEFAULT']['STATS_FILE'] = absolute_path(
     'frontend', 'webpack-stats.prod.json'
-)
\ No newline at end of file
+)
+# rollback between tests does not send signals to refresh the registry
+GEE_ASSET_REGISTRY_ENABLED = False
@@ -0,0 +1,66 @@
+import os
+import tempfile
+from django.test import TestCase, RequestFactory
+
+from core.file_response import parse_range_header, ranged_file_response
+
+
+class RangedFileResponseTest(TestCase):
+    """Test file response with HTTP Range support."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = bytes(range(256)) * 4
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(self.content)
+            self.file_path = temp_file.name
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def _get(self, range_header=None):
+        headers = {'HTTP_RANGE': range_header} if range_header else {}
+        request = self.factory.get('/download', **headers)
+        return ranged_file_response(
+            request, self.file_path, 'image/tiff', 'test.tif'
+        )
+
+    def test_parse_range_header(self):
+        self.assertEqual(parse_range_header('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range_header('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=95-200', 100), (95, 99))
+        self.assertIsNone(parse_range_header('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range_header('items=0-1', 100))
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=100-', 100)
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=10-5', 100)
+
+    def test_full_response(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="test.tif"'
+        )
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_partial_response(self):
+        response = self._get('bytes=100-299')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], '200')
+        self.assertEqual(
+            response['Content-Range'], f'bytes 100-299/{len(self.content)}'
+        )
+        self.assertEqual(
+            b''.join(response.streaming_content), self.content[100:300]
+        )
+
+    def test_unsatisfiable_range(self):
+        response = self._get(f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(
+            response['Content-Range'], f'bytes */{len(self.content)}'
+        )
@@ -0,0 +1,15 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Vector tile utilities.
+"""
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+WEB_MERCATOR_MAX = 20037508.342789244
+
+
+def get_tile_buffer(z: int) -> float:
+    """Get size in web mercator meters of the tile buffer on the zoom."""
+    return TILE_BUFFER * (2 * WEB_MERCATOR_MAX / (2 ** z)) / TILE_EXTENT
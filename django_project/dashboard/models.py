@@ -144,7 +144,7 @@ class Dashboard(models.Model):
             return None
         result = UserAnalysisResults.objects.filter(id__in=result_ids).first()
         location_ids = [
-            loc['community'] for loc in result.analysis_results[
+            loc['community'] for loc in result.analysis_metadata[
                 'data'
             ]['locations']
         ]
@@ -1,4 +1,4 @@
-from analysis.serializer import UserAnalysisResultsSerializer
+from analysis.serializer import UserAnalysisResultsSummarySerializer
 from rest_framework import serializers
 from .models import Dashboard, DashboardWidget
 
@@ -6,7 +6,7 @@ from .models import Dashboard, DashboardWidget
 class DashboardSerializer(serializers.ModelSerializer):
     owner = serializers.SerializerMethodField()
     owner_name = serializers.SerializerMethodField()
-    analysis_results = UserAnalysisResultsSerializer(many=True)
+    analysis_results = UserAnalysisResultsSummarySerializer(many=True)
 
     class Meta:
         model = Dashboard
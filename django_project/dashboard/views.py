@@ -13,6 +13,7 @@ from rest_framework.views import APIView
 from django.utils import timezone
 from base.models import Organisation, UserOrganisations
 from analysis.models import UserAnalysisResults
+from analysis.serializer import UserAnalysisResultsSummarySerializer
 from dashboard.models import Dashboard, DashboardWidget
 from dashboard.serializers import (
     DashboardSerializer,
@@ -99,7 +100,7 @@ class DashboardListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(config__preference=keyword)
         if region:
             queryset = queryset.filter(
-                analysis_results__analysis_results__contains={
+                analysis_results__analysis_metadata__contains={
                     "data": {"landscape": region}
                 }
             )
@@ -119,7 +120,13 @@ class DashboardListCreateView(generics.ListCreateAPIView):
         return queryset
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = self.get_queryset().select_related(
+            'created_by'
+        ).prefetch_related(
+            UserAnalysisResultsSummarySerializer.get_prefetch(
+                'analysis_results'
+            )
+        )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
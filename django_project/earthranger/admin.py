@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     APISchedule,
     EarthRangerEvents,
-    EarthRangerSetting
+    EarthRangerSetting,
+    EarthRangerSyncState
 )
 from django.forms import ModelForm
 
@@ -59,3 +60,12 @@ class EarthRangerEventsAdmin(admin.ModelAdmin):
 class EarthRangerSettingAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "name", "url", "privacy", "is_active")
     search_fields = ("name", "user")
+
+
+@admin.register(EarthRangerSyncState)
+class EarthRangerSyncStateAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "url", "last_updated_at", "last_sync_at", "last_full_sync_at"
+    )
+    search_fields = ("url",)
+    readonly_fields = ("key",)
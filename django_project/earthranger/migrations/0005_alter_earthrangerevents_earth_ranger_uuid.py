@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2025-10-29 04:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicated_events(apps, schema_editor):
+    """Keep the latest event of duplicated uuid with all of its settings."""
+    EarthRangerEvents = apps.get_model('earthranger', 'EarthRangerEvents')
+    Through = EarthRangerEvents.earth_ranger_settings.through
+    duplicates = EarthRangerEvents.objects.filter(
+        earth_ranger_uuid__isnull=False
+    ).values('earth_ranger_uuid').annotate(
+        count=Count('id'), last_id=Max('id')
+    ).filter(count__gt=1)
+    for duplicate in duplicates.iterator():
+        events = EarthRangerEvents.objects.filter(
+            earth_ranger_uuid=duplicate['earth_ranger_uuid']
+        ).exclude(id=duplicate['last_id'])
+        setting_ids = set(
+            Through.objects.filter(
+                earthrangerevents__in=events
+            ).values_list('earthrangersetting_id', flat=True)
+        )
+        Through.objects.bulk_create(
+            [
+                Through(
+                    earthrangerevents_id=duplicate['last_id'],
+                    earthrangersetting_id=setting_id
+                )
+                for setting_id in setting_ids
+            ],
+            ignore_conflicts=True
+        )
+        events.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('earthranger', '0004_alter_apischedule_run_every_minutes_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicated_events, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='earthrangerevents',
+            name='earth_ranger_uuid',
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2025-10-30 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('earthranger', '0005_alter_earthrangerevents_earth_ranger_uuid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EarthRangerSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA256 digest of the URL and token.', max_length=64, unique=True)),
+                ('url', models.URLField(max_length=255)),
+                ('last_updated_at', models.DateTimeField(blank=True, help_text='Latest upstream updated_at of the synced events.', null=True)),
+                ('last_sync_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2025-11-03 03:40
+
+import django.contrib.gis.db.models.fields
+from django.contrib.gis.db.models.functions import Transform
+from django.db import migrations
+
+
+def fill_geometry_3857(apps, schema_editor):
+    """Transform geometry of existing events to web mercator."""
+    EarthRangerEvents = apps.get_model('earthranger', 'EarthRangerEvents')
+    EarthRangerEvents.objects.filter(geometry__isnull=False).update(
+        geometry_3857=Transform('geometry', 3857)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('earthranger', '0006_earthrangersyncstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='earthrangerevents',
+            name='geometry_3857',
+            field=django.contrib.gis.db.models.fields.GeometryField(blank=True, help_text='Geometry in web mercator for vector tiles.', null=True, srid=3857),
+        ),
+        migrations.RunPython(
+            fill_geometry_3857, migrations.RunPython.noop
+        ),
+    ]
@@ -1,3 +1,4 @@
+import hashlib
 from django.contrib.gis.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_delete
@@ -90,9 +91,12 @@ class EarthRangerSetting(models.Model):
 
     def save(self, *args, **kwargs):
         from earthranger.tasks import fetch_earth_ranger_events
+        from earthranger.utils import invalidate_events_tiles
 
         is_new = not self.pk
         super().save(*args, **kwargs)
+        # privacy of the setting decides the visible events
+        invalidate_events_tiles()
 
         # when adding new setting, assign existing events to new setting
         # based on similar URL and token. If not, fetch events
@@ -104,8 +108,17 @@ class EarthRangerSetting(models.Model):
                 earth_ranger_settings=self
             ).distinct()
             if events.exists():
-                for event in events:
-                    event.earth_ranger_settings.add(self)
+                Through = EarthRangerEvents.earth_ranger_settings.through
+                Through.objects.bulk_create(
+                    [
+                        Through(
+                            earthrangerevents_id=event_id,
+                            earthrangersetting_id=self.pk
+                        )
+                        for event_id in events.values_list('id', flat=True)
+                    ],
+                    ignore_conflicts=True
+                )
             else:
                 fetch_earth_ranger_events.delay([self.pk])
 
@@ -115,11 +128,67 @@ class EarthRangerEvents(models.Model):
         EarthRangerSetting,
         related_name="events"
     )
-    earth_ranger_uuid = models.UUIDField(null=True, blank=True)
+    earth_ranger_uuid = models.UUIDField(null=True, blank=True, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     data = models.JSONField(default=dict)
     geometry = models.GeometryField(null=True, blank=True)
+    geometry_3857 = models.GeometryField(
+        srid=3857,
+        null=True,
+        blank=True,
+        help_text="Geometry in web mercator for vector tiles."
+    )
+
+    @staticmethod
+    def get_geometry_3857(geometry):
+        """Transform geometry to web mercator."""
+        if geometry is None:
+            return None
+        geometry = geometry.clone()
+        if not geometry.srid:
+            geometry.srid = 4326
+        geometry.transform(3857)
+        return geometry
+
+    def save(self, *args, **kwargs):
+        self.geometry_3857 = self.get_geometry_3857(self.geometry)
+        super().save(*args, **kwargs)
+
+
+class EarthRangerSyncState(models.Model):
+    """High-water mark of events sync per EarthRanger URL and token."""
+
+    key = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA256 digest of the URL and token."
+    )
+    url = models.URLField(max_length=255)
+    last_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Latest upstream updated_at of the synced events."
+    )
+    last_sync_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.url} - {self.last_updated_at}"
+
+    @staticmethod
+    def get_key(url: str, token: str):
+        """Get key of the URL and token."""
+        return hashlib.sha256(f'{url}|{token}'.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_for(cls, url: str, token: str):
+        """Get or create sync state of the URL and token."""
+        state, _ = cls.objects.get_or_create(
+            key=cls.get_key(url, token),
+            defaults={'url': url}
+        )
+        return state
 
 
 class EarthRangerObservation(models.Model):
@@ -160,6 +229,10 @@ def cleanup_orphaned_events(sender, instance, **kwargs):
     Delete EarthRangerEvents that have no associated EarthRangerSettings
     after a setting is deleted.
     """
+    from earthranger.utils import invalidate_events_tiles
+
+    invalidate_events_tiles()
+
     # Find events that have no associated settings (orphaned events)
     orphaned_events = EarthRangerEvents.objects.filter(
         earth_ranger_settings__isnull=True
@@ -1,11 +1,18 @@
 import logging
-from celery import shared_task
+from urllib.parse import quote
+from celery import chain, group, shared_task
+from django.conf import settings
 from django.utils.timezone import now
 from earthranger.utils import (
     fetch_and_store_data,
     get_grouped_settings
 )
-from earthranger.models import EarthRangerEvents, APISchedule
+from earthranger.models import (
+    EarthRangerEvents,
+    EarthRangerSetting,
+    EarthRangerSyncState,
+    APISchedule
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,28 +24,122 @@ def scheduled_fetch():
     fetch_all_earth_ranger_data()
 
 
+EVENTS_URL = (
+    'activity/events?{updated_since}include_notes=true&include_related_events=true&state=active&state='  # noqa: E501
+    'new&filter={{"text":"","sort":["down",{{"value":"updated_at","key":"updatedAtLabel"}}]}}&'  # noqa: E501
+    'include_updates=false&sort_by=-updated_at'
+)
+
+
+def _get_url_token(setting_ids=None):
+    """Get EarthRanger URL and token of the settings group."""
+    if setting_ids:
+        setting = EarthRangerSetting.objects.filter(id__in=setting_ids).first()
+        if setting:
+            return setting.url, setting.token
+        return None, None
+    return (
+        settings.EARTH_RANGER_API_URL,
+        settings.EARTH_RANGER_AUTH_TOKEN
+    )
+
+
+def _has_events(setting_ids=None):
+    """Check whether events of the settings group are stored."""
+    if setting_ids:
+        return EarthRangerEvents.objects.filter(
+            earth_ranger_settings__in=setting_ids
+        ).exists()
+    return EarthRangerEvents.objects.filter(
+        earth_ranger_settings__isnull=True
+    ).exists()
+
+
 @shared_task
-def fetch_earth_ranger_events(setting_ids=None):
+def fetch_earth_ranger_events(setting_ids=None, full_sync=False):
+    """Fetch events of EarthRanger settings group.
+
+    Only events updated after the high-water mark of the group are
+    fetched unless full_sync is True or no event of the group exists.
+    """
     if setting_ids:
         logger.info(f"Fetching EarthRanger events for settings: {setting_ids}")
     else:
         logger.info(
             "Fetching EarthRanger events for default EarthRanger settings"
         )
-    events_url = (
-        'activity/events?include_notes=true&include_related_events=true&state=active&state='  # noqa: E501
-        'new&filter={"text":"","sort":["down",{"value":"updated_at","key":"updatedAtLabel"}]}&'  # noqa: E501
-        'include_updates=false&sort_by=-updated_at'
+    url, token = _get_url_token(setting_ids)
+    sync_state = None
+    updated_since = None
+    if url:
+        sync_state = EarthRangerSyncState.get_for(url, token)
+        if (
+            not full_sync and sync_state.last_updated_at and
+            _has_events(setting_ids)
+        ):
+            updated_since = sync_state.last_updated_at
+        else:
+            full_sync = True
+
+    events_url = EVENTS_URL.format(
+        updated_since=(
+            f'updated_since={quote(updated_since.isoformat())}&'
+            if updated_since else ''
+        )
+    )
+    latest_updated_at = fetch_and_store_data(
+        events_url, EarthRangerEvents, setting_ids,
+        updated_since=updated_since
     )
-    fetch_and_store_data(events_url, EarthRangerEvents, setting_ids)
+    if sync_state is None or latest_updated_at is None:
+        return
+
+    # move the mark only after all newer events are stored
+    if (
+        not sync_state.last_updated_at or
+        latest_updated_at > sync_state.last_updated_at
+    ):
+        sync_state.last_updated_at = latest_updated_at
+    sync_state.last_sync_at = now()
+    if full_sync:
+        sync_state.last_full_sync_at = sync_state.last_sync_at
+    sync_state.save()
+
+
+def fetch_grouped_earth_ranger_events(full_sync=False):
+    """Queue fetch task of every EarthRanger settings group.
+
+    The group tasks are spread over EARTH_RANGER_MAX_CONCURRENT_FETCH
+    chains, so at most that many groups are fetched at once. Each task
+    fetches from the high-water mark of its own group.
+    """
+    groups = list(get_grouped_settings().values())
+    concurrency = min(
+        settings.EARTH_RANGER_MAX_CONCURRENT_FETCH, len(groups)
+    )
+    if not concurrency:
+        return
+    group([
+        chain(*[
+            fetch_earth_ranger_events.si(
+                group_settings, full_sync=full_sync
+            )
+            for group_settings in groups[index::concurrency]
+        ])
+        for index in range(concurrency)
+    ]).apply_async()
+
+
+@shared_task
+def reconcile_earth_ranger_events():
+    """Fetch all events of every EarthRanger settings group."""
+    fetch_grouped_earth_ranger_events(full_sync=True)
 
 
 # Function to fetch all Earth Ranger data
 def fetch_all_earth_ranger_data():
     # then fetch for user's EarthRangers
-    groups = get_grouped_settings()
-    for (url, token), group_settings in groups.items():
-        fetch_earth_ranger_events.delay(group_settings)
+    fetch_grouped_earth_ranger_events()
 
     # Get or create the schedule object
     schedule, _ = APISchedule.objects.get_or_create(
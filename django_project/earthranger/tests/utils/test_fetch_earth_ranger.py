@@ -2,15 +2,20 @@ import json
 import pytest
 from unittest.mock import Mock, patch, call
 from django.test import TestCase, override_settings
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import now
 from django.contrib.gis.geos import GEOSGeometry
 from django.contrib.gis.gdal.error import GDALException
 from django.conf import settings
 
 from core.factories import UserF as UserFactory
-from earthranger.utils import fetch_and_store_data
-from earthranger.tasks import fetch_all_earth_ranger_data
-from earthranger.models import EarthRangerEvents
+from earthranger.utils import fetch_and_store_data, store_events
+from earthranger.tasks import (
+    fetch_all_earth_ranger_data,
+    fetch_earth_ranger_events,
+    fetch_grouped_earth_ranger_events
+)
+from earthranger.models import EarthRangerEvents, EarthRangerSyncState
 from earthranger.factories import EarthRangerSettingFactory
 
 
@@ -57,7 +62,7 @@ class TestFetchAndStoreData(TestCase):
             }
         }
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.now')
     def test_successful_fetch_and_store_single_page_default_settings(self, mock_now, mock_get):
         """Test successful data fetch and storage for single page with default settings"""
@@ -93,7 +98,7 @@ class TestFetchAndStoreData(TestCase):
         self.assertEqual(len(mock_get.call_args_list), 2)
         self.assertEqual(last_call, call(expected_url, headers=expected_headers, timeout=30))
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.now')
     def test_successful_fetch_and_store_with_setting_ids(self, mock_now, mock_get):
         """Test successful data fetch and storage with specific setting IDs"""
@@ -122,7 +127,7 @@ class TestFetchAndStoreData(TestCase):
         self.assertEqual(event.data, self.mock_feature)
         self.assertIn(self.setting.id, event.earth_ranger_settings.values_list('id', flat=True))
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.now')
     def test_successful_fetch_with_pagination(self, mock_now, mock_get):
         """Test successful data fetch with pagination"""
@@ -167,7 +172,7 @@ class TestFetchAndStoreData(TestCase):
         self.assertTrue(EarthRangerEvents.objects.filter(earth_ranger_uuid='0b2711a4-ee4b-4e93-8f03-a97072c4783a').exists())
         self.assertTrue(EarthRangerEvents.objects.filter(earth_ranger_uuid='0cddf94d-bb86-4294-9ce3-1009d6068dbb').exists())
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.logging.error')
     def test_api_error_response(self, mock_logging_error, mock_get):
         """Test handling of API error responses"""
@@ -187,7 +192,7 @@ class TestFetchAndStoreData(TestCase):
         # Verify no data was stored
         self.assertEqual(EarthRangerEvents.objects.count(), 0)
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.logging.error')
     def test_api_error_with_retries(self, mock_logging_error, mock_get):
         """Test handling of retryable API errors"""
@@ -199,15 +204,16 @@ class TestFetchAndStoreData(TestCase):
         # Execute function
         fetch_and_store_data('events', EarthRangerEvents, max_retries=2)
         
-        # Verify retries were attempted
-        self.assertEqual(mock_get.call_count, 3)  # Initial + 2 retries
+        # Retries are done by the session adapter,
+        # see test_fetch_stub_server.py
+        self.assertEqual(mock_get.call_count, 1)
         
         # Verify final error was logged
         mock_logging_error.assert_called_with(
             "Failed to fetch <class 'earthranger.models.EarthRangerEvents'> data after 2 retries: 500 - Internal Server Error"
         )
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.GEOSGeometry')
     @patch('earthranger.utils.now')
     def test_geometry_parsing_error_handling(self, mock_now, mock_geos_geometry, mock_get):
@@ -229,7 +235,7 @@ class TestFetchAndStoreData(TestCase):
         # Verify no data was stored due to geometry error
         self.assertEqual(EarthRangerEvents.objects.count(), 0)
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.json.dumps')
     @patch('earthranger.utils.now')
     def test_json_serialization_error_handling(self, mock_now, mock_json_dumps, mock_get):
@@ -251,7 +257,7 @@ class TestFetchAndStoreData(TestCase):
         # Verify no data was stored due to JSON error
         self.assertEqual(EarthRangerEvents.objects.count(), 0)
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     @patch('earthranger.utils.now')
     def test_update_existing_record(self, mock_now, mock_get):
         """Test updating existing records"""
@@ -282,7 +288,56 @@ class TestFetchAndStoreData(TestCase):
         updated_event = EarthRangerEvents.objects.get(earth_ranger_uuid='0b2711a4-ee4b-4e93-8f03-a97072c4783a')
         self.assertEqual(updated_event.data, self.mock_feature)
 
-    @patch('earthranger.utils.requests.get')
+    def test_store_events_skip_unchanged(self):
+        """Test unchanged events are not rewritten but linked to setting"""
+        unchanged_uuid = '0b2711a4-ee4b-4e93-8f03-a97072c4783a'
+        changed_uuid = '0cddf94d-bb86-4294-9ce3-1009d6068dbb'
+        EarthRangerEvents.objects.create(
+            earth_ranger_uuid=unchanged_uuid,
+            data={'id': unchanged_uuid, 'updated_at': '2025-01-01', 'old': 1},
+            geometry=GEOSGeometry('POINT(0 0)')
+        )
+        EarthRangerEvents.objects.create(
+            earth_ranger_uuid=changed_uuid,
+            data={'id': changed_uuid, 'updated_at': '2025-01-01', 'old': 1},
+            geometry=GEOSGeometry('POINT(0 0)')
+        )
+        features = [
+            {
+                'id': unchanged_uuid,
+                'updated_at': '2025-01-01',
+                'geojson': {'geometry': {'type': 'Point', 'coordinates': [1, 2]}}
+            },
+            {
+                'id': changed_uuid,
+                'updated_at': '2025-02-01',
+                'geojson': {'geometry': {'type': 'Point', 'coordinates': [3, 4]}}
+            },
+            {
+                'id': 'not-a-uuid',
+                'geojson': {'geometry': {'type': 'Point', 'coordinates': [5, 6]}}
+            }
+        ]
+
+        self.assertEqual(store_events(features, [self.setting.id]), 1)
+
+        self.assertEqual(EarthRangerEvents.objects.count(), 2)
+        unchanged = EarthRangerEvents.objects.get(earth_ranger_uuid=unchanged_uuid)
+        self.assertEqual(unchanged.data['old'], 1)
+        changed = EarthRangerEvents.objects.get(earth_ranger_uuid=changed_uuid)
+        self.assertEqual(changed.data, features[1])
+        self.assertEqual(changed.geometry.coords, (3.0, 4.0))
+        for event in [unchanged, changed]:
+            self.assertEqual(
+                list(event.earth_ranger_settings.values_list('id', flat=True)),
+                [self.setting.id]
+            )
+
+        # linking twice does not duplicate the settings
+        store_events(features, [self.setting.id])
+        self.assertEqual(changed.earth_ranger_settings.count(), 1)
+
+    @patch('earthranger.utils.requests.Session.get')
     def test_non_earth_ranger_events_model(self, mock_get):
         """Test function behavior with non-EarthRangerEvents model"""
         mock_response = Mock()
@@ -304,7 +359,7 @@ class TestFetchAndStoreData(TestCase):
         }
         mock_get.assert_called_once_with(expected_url, headers=expected_headers, timeout=30)
 
-    @patch('earthranger.utils.requests.get')
+    @patch('earthranger.utils.requests.Session.get')
     def test_empty_results(self, mock_get):
         """Test handling of empty results"""
         empty_response_data = {
@@ -337,9 +392,9 @@ class TestFetchAndStoreData(TestCase):
         # Verify no data was stored
         self.assertEqual(EarthRangerEvents.objects.count(), 0)
 
-    @patch('earthranger.utils.requests.get')
-    @patch('earthranger.utils.time.sleep')
-    def test_timeout_retry_logic(self, mock_sleep, mock_get):
+    @patch('earthranger.utils.requests.Session.get')
+    @patch('earthranger.utils.logging.error')
+    def test_timeout_retry_logic(self, mock_logging_error, mock_get):
         """Test timeout retry logic"""
         import requests
         
@@ -347,7 +402,12 @@ class TestFetchAndStoreData(TestCase):
         mock_get.side_effect = requests.exceptions.Timeout("Request timed out")
         
         # Execute function with retries
-        fetch_and_store_data('events', EarthRangerEvents, max_retries=2)
+        self.assertIsNone(
+            fetch_and_store_data('events', EarthRangerEvents, max_retries=2)
+        )
+        mock_logging_error.assert_called_once_with(
+            "Failed to fetch <class 'earthranger.models.EarthRangerEvents'> data after 2 retries due to: Request timed out"
+        )
 
     @patch('earthranger.utils.fetch_earth_ranger_events.delay')
     def test_fetch_all_earth_ranger_data_calls_fetch_earth_ranger_events(self, mock_fetch_task):
@@ -366,8 +426,10 @@ class TestFetchAndStoreData(TestCase):
         # Verify fetch_earth_ranger_events task was called once with the setting ID
         mock_fetch_task.assert_called_once_with([setting.id])
 
-    @patch('earthranger.tasks.fetch_earth_ranger_events.delay')
-    def test_fetch_all_earth_ranger_data_groups_settings_by_url_token(self, mock_fetch_task):
+    @patch('earthranger.tasks.group')
+    @patch('earthranger.tasks.chain')
+    @patch('earthranger.tasks.fetch_earth_ranger_events')
+    def test_fetch_all_earth_ranger_data_groups_settings_by_url_token(self, mock_fetch_task, mock_chain, mock_group):
         """Test that fetch_all_earth_ranger_data groups settings by URL and token"""
         # Create multiple settings with same URL/token
         setting1 = EarthRangerSettingFactory(
@@ -394,18 +456,20 @@ class TestFetchAndStoreData(TestCase):
         # Execute function
         fetch_all_earth_ranger_data()
         
-        # Verify fetch_earth_ranger_events task was called 7 times:
-        # Three times for each setting when created
+        # Verify fetch_earth_ranger_events task was queued three times,
+        # once for each setting when created
+        self.assertEqual(mock_fetch_task.delay.call_count, 3)
 
-        # Then when calling fetch_all_earth_ranger_data:
+        # Then fetch_all_earth_ranger_data queues 4 group tasks:
         # Once for grouped settings (setting1 & setting2)
         # Once for setting3
         # Once for setting0
         # Once for default EarthRangerSetting
-        self.assertEqual(mock_fetch_task.call_count, 7)
+        self.assertEqual(mock_fetch_task.si.call_count, 4)
+        mock_group.return_value.apply_async.assert_called_once()
         
         # Verify the calls contain the correct setting IDs
-        call_args_list = mock_fetch_task.call_args_list
+        call_args_list = mock_fetch_task.si.call_args_list
         
         # One call should have both setting1 and setting2 IDs (grouped)
         grouped_call = []
@@ -426,8 +490,10 @@ class TestFetchAndStoreData(TestCase):
         self.assertTrue(len(single_call) > 0)
         self.assertIn([setting3.id], single_call)
 
-    @patch('earthranger.tasks.fetch_earth_ranger_events.delay')
-    def test_fetch_all_earth_ranger_data_calls_fetch_earth_ranger_events(self, mock_fetch_task):
+    @patch('earthranger.tasks.group')
+    @patch('earthranger.tasks.chain')
+    @patch('earthranger.tasks.fetch_earth_ranger_events')
+    def test_fetch_all_earth_ranger_data_calls_fetch_earth_ranger_events(self, mock_fetch_task, mock_chain, mock_group):
         """Test that fetch_all_earth_ranger_data calls fetch_earth_ranger_events task"""
         # Create an EarthRangerSetting
         setting = EarthRangerSettingFactory(
@@ -440,5 +506,108 @@ class TestFetchAndStoreData(TestCase):
         # Execute function
         fetch_all_earth_ranger_data()
         
-        # Verify fetch_earth_ranger_events task was called once with the setting ID
-        self.assertEqual(mock_fetch_task.call_count, 3)
+        # Verify fetch_earth_ranger_events task was queued once when the
+        # setting is created, then queued for the setting group and
+        # the default settings
+        self.assertEqual(mock_fetch_task.delay.call_count, 1)
+        self.assertEqual(mock_fetch_task.si.call_count, 2)
+        self.assertEqual(
+            sorted(sorted(call[0][0]) for call in mock_fetch_task.si.call_args_list),
+            [[], sorted([self.setting.id, setting.id])]
+        )
+
+    @override_settings(EARTH_RANGER_MAX_CONCURRENT_FETCH=2)
+    @patch('earthranger.tasks.group')
+    @patch('earthranger.tasks.chain')
+    @patch('earthranger.tasks.fetch_earth_ranger_events')
+    def test_fetch_grouped_earth_ranger_events_concurrency(self, mock_fetch_task, mock_chain, mock_group):
+        """Test group tasks are spread over limited number of chains"""
+        for index in range(3):
+            EarthRangerSettingFactory(
+                user=self.user,
+                url=f'https://test-{index}.earthranger.com',
+                token=f'test-token-{index}',
+                is_active=True
+            )
+
+        fetch_grouped_earth_ranger_events(full_sync=True)
+
+        # 5 groups with self.setting and default settings
+        self.assertEqual(mock_fetch_task.si.call_count, 5)
+        for call_args in mock_fetch_task.si.call_args_list:
+            self.assertEqual(call_args[1], {'full_sync': True})
+        self.assertEqual(mock_chain.call_count, 2)
+        self.assertEqual(
+            sorted(len(call_args[0]) for call_args in mock_chain.call_args_list),
+            [2, 3]
+        )
+        self.assertEqual(len(mock_group.call_args[0][0]), 2)
+        mock_group.return_value.apply_async.assert_called_once_with()
+
+    @patch('earthranger.utils.requests.Session.get')
+    def test_stop_paging_on_older_events(self, mock_get):
+        """Test paging is stopped once a page has older events"""
+        updated_since = parse_datetime('2025-01-02T00:00:00+00:00')
+        first_response = Mock()
+        first_response.status_code = 200
+        first_response.json.return_value = {
+            'data': {
+                'results': [
+                    {**self.mock_feature, 'updated_at': '2025-01-03T00:00:00+00:00'},
+                    {
+                        **self.mock_feature,
+                        'id': '0cddf94d-bb86-4294-9ce3-1009d6068dbb',
+                        'updated_at': '2025-01-01T00:00:00+00:00'
+                    }
+                ],
+                'next': 'https://example.com/api/events?page=2'
+            }
+        }
+        mock_get.return_value = first_response
+
+        latest_updated_at = fetch_and_store_data(
+            'events', EarthRangerEvents, updated_since=updated_since
+        )
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(
+            latest_updated_at, parse_datetime('2025-01-03T00:00:00+00:00')
+        )
+
+    @patch('earthranger.tasks.fetch_and_store_data')
+    def test_fetch_earth_ranger_events_incremental(self, mock_fetch):
+        """Test events are fetched since the mark of the settings group"""
+        mark = parse_datetime('2025-01-02T00:00:00+00:00')
+        latest = parse_datetime('2025-01-03T00:00:00+00:00')
+        mock_fetch.return_value = latest
+
+        # No events are stored yet, so it is a full sync
+        fetch_earth_ranger_events([self.setting.id])
+        endpoint = mock_fetch.call_args[0][0]
+        self.assertNotIn('updated_since', endpoint)
+        state = EarthRangerSyncState.get_for(
+            self.setting.url, self.setting.token
+        )
+        self.assertEqual(state.last_updated_at, latest)
+        self.assertIsNotNone(state.last_full_sync_at)
+
+        event = EarthRangerEvents.objects.create(
+            earth_ranger_uuid=self.mock_feature['id'],
+            data=self.mock_feature
+        )
+        event.earth_ranger_settings.add(self.setting)
+        state.last_updated_at = mark
+        state.save()
+
+        fetch_earth_ranger_events([self.setting.id])
+        endpoint = mock_fetch.call_args[0][0]
+        self.assertIn('updated_since=2025-01-02T00%3A00%3A00%2B00%3A00&', endpoint)
+        self.assertEqual(mock_fetch.call_args[1]['updated_since'], mark)
+        state.refresh_from_db()
+        self.assertEqual(state.last_updated_at, latest)
+
+        # The mark is kept when the fetch is failed
+        mock_fetch.return_value = None
+        fetch_earth_ranger_events([self.setting.id])
+        state.refresh_from_db()
+        self.assertEqual(state.last_updated_at, latest)
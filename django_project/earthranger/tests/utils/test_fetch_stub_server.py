@@ -0,0 +1,173 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils.dateparse import parse_datetime
+
+from earthranger.models import EarthRangerEvents
+from earthranger.utils import fetch_and_store_data
+
+
+def make_feature(feature_id, updated_at):
+    """Create EarthRanger feature."""
+    return {
+        'id': feature_id,
+        'updated_at': updated_at,
+        'geojson': {
+            'geometry': {
+                'type': 'Point',
+                'coordinates': [1.0, 2.0]
+            }
+        }
+    }
+
+
+class StubEarthRangerHandler(BaseHTTPRequestHandler):
+    """Serve pages of events, failing the configured paths once."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address))
+        if self.path in server.failures:
+            server.failures.remove(self.path)
+            self.send_json(503, {'detail': 'unavailable'})
+            return
+        page = server.pages.get(self.path)
+        if page is None:
+            self.send_json(404, {'detail': 'not found'})
+            return
+        self.send_json(200, page)
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestFetchAndStoreDataStubServer(TestCase):
+    """Test fetch_and_store_data against a local EarthRanger server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), StubEarthRangerHandler
+        )
+        self.server.requests = []
+        self.server.failures = []
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.server.pages = {
+            '/api/v1.0/events/': {
+                'data': {
+                    'results': [
+                        make_feature(
+                            '0b2711a4-ee4b-4e93-8f03-a97072c4783a',
+                            '2025-01-03T00:00:00+00:00'
+                        )
+                    ],
+                    'next': f'{self.base_url}/api/v1.0/events/?page=2'
+                }
+            },
+            '/api/v1.0/events/?page=2': {
+                'data': {
+                    'results': [
+                        make_feature(
+                            '0cddf94d-bb86-4294-9ce3-1009d6068dbb',
+                            '2025-01-02T00:00:00+00:00'
+                        )
+                    ],
+                    'next': f'{self.base_url}/api/v1.0/events/?page=3'
+                }
+            },
+            '/api/v1.0/events/?page=3': {
+                'data': {
+                    'results': [
+                        make_feature(
+                            '1f5a6a0c-34b4-4a36-9d43-9a0d6a1a6c11',
+                            '2025-01-01T00:00:00+00:00'
+                        )
+                    ],
+                    'next': None
+                }
+            }
+        }
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        self.settings_override = override_settings(
+            EARTH_RANGER_API_URL=f'{self.base_url}/api/v1.0/',
+            EARTH_RANGER_AUTH_TOKEN='test-token'
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_fetch_all_pages_with_keep_alive(self):
+        """Test pages are fetched through one connection."""
+        latest_updated_at = fetch_and_store_data('events', EarthRangerEvents)
+
+        self.assertEqual(
+            [path for path, _ in self.server.requests],
+            [
+                '/api/v1.0/events/',
+                '/api/v1.0/events/?page=2',
+                '/api/v1.0/events/?page=3'
+            ]
+        )
+        self.assertEqual(
+            len({address for _, address in self.server.requests}), 1
+        )
+        self.assertEqual(EarthRangerEvents.objects.count(), 3)
+        self.assertEqual(
+            latest_updated_at.isoformat(), '2025-01-03T00:00:00+00:00'
+        )
+
+    def test_retry_server_error(self):
+        """Test server error is retried by the session."""
+        self.server.failures = ['/api/v1.0/events/?page=2']
+
+        latest_updated_at = fetch_and_store_data(
+            'events', EarthRangerEvents, retry_delay=0
+        )
+
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(EarthRangerEvents.objects.count(), 3)
+        self.assertIsNotNone(latest_updated_at)
+
+    @patch('earthranger.utils.logging.error')
+    def test_retry_exhausted(self, mock_logging_error):
+        """Test stored pages are kept when retries are exhausted."""
+        self.server.failures = ['/api/v1.0/events/?page=2'] * 3
+
+        latest_updated_at = fetch_and_store_data(
+            'events', EarthRangerEvents, max_retries=2, retry_delay=0
+        )
+
+        # initial request of the failed page + 2 retries
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertIsNone(latest_updated_at)
+        self.assertEqual(EarthRangerEvents.objects.count(), 1)
+        mock_logging_error.assert_called_once()
+
+    def test_stop_paging_on_older_events(self):
+        """Test pages older than updated_since are not fetched."""
+        fetch_and_store_data(
+            'events', EarthRangerEvents,
+            updated_since=parse_datetime('2025-01-02T12:00:00+00:00')
+        )
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(EarthRangerEvents.objects.count(), 2)
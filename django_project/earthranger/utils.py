@@ -1,16 +1,32 @@
-import time
+import datetime
 import logging
+import queue
+import threading
+import uuid
 import requests
 import json
-from django.utils.timezone import now
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now, is_naive, make_aware
 from django.contrib.gis.gdal.error import GDALException
-from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.gis.geos import GEOSException, GEOSGeometry
+from django.core.cache import cache
 from earthranger.models import (
     EarthRangerEvents,
     EarthRangerSetting
 )
 from django.conf import settings as django_settings
 
+# Responses that are retried by the session
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Marker of the last downloaded page
+PAGES_END = object()
+
+# Version of the cached events vector tiles, changed when events are stored
+EVENTS_TILE_VERSION_CACHE_KEY = 'earthranger-events-tile-version'
+
 
 def get_base_api_url(url: str):
     """Get EarthRanger base API URL from the specified URL.
@@ -36,10 +52,163 @@ def get_base_api_url(url: str):
     return api_url
 
 
+def parse_events(features):
+    """Parse page of EarthRanger features into unsaved events.
+
+    Features with invalid id or geometry are skipped and the last
+    feature is used when the id is duplicated in the page.
+    """
+    events = {}
+    for feature in features:
+        try:
+            earth_ranger_uuid = uuid.UUID(str(feature['id']))
+            geom = GEOSGeometry(
+                json.dumps(feature['geojson']['geometry'])
+            )
+            geom_3857 = EarthRangerEvents.get_geometry_3857(geom)
+        except (
+            GDALException, GEOSException, TypeError, ValueError, KeyError
+        ) as e:
+            logging.warning(
+                f"Failed to process feature"
+                f"{feature.get('id', 'unknown')}: {e}"
+            )
+            continue
+        events[earth_ranger_uuid] = EarthRangerEvents(
+            earth_ranger_uuid=earth_ranger_uuid,
+            data=feature,
+            updated_at=now(),
+            geometry=geom,
+            geometry_3857=geom_3857
+        )
+    return events
+
+
+def store_events(features, setting_ids=None):
+    """Upsert page of EarthRanger features in bulk.
+
+    Events whose upstream updated_at is not changed are not rewritten,
+    but they are still linked to the settings.
+
+    :return: Number of upserted events.
+    """
+    events = parse_events(features)
+    if not events:
+        return 0
+
+    existing_updated_at = dict(
+        EarthRangerEvents.objects.filter(
+            earth_ranger_uuid__in=events.keys()
+        ).values_list('earth_ranger_uuid', 'data__updated_at')
+    )
+    changed_events = [
+        event for earth_ranger_uuid, event in events.items()
+        if (
+            earth_ranger_uuid not in existing_updated_at or
+            existing_updated_at[earth_ranger_uuid] is None or
+            existing_updated_at[earth_ranger_uuid] !=
+            event.data.get('updated_at')
+        )
+    ]
+    if changed_events:
+        EarthRangerEvents.objects.bulk_create(
+            changed_events,
+            update_conflicts=True,
+            unique_fields=['earth_ranger_uuid'],
+            update_fields=[
+                'data', 'updated_at', 'geometry', 'geometry_3857'
+            ]
+        )
+
+    if setting_ids:
+        event_ids = EarthRangerEvents.objects.filter(
+            earth_ranger_uuid__in=events.keys()
+        ).values_list('id', flat=True)
+        Through = EarthRangerEvents.earth_ranger_settings.through
+        Through.objects.bulk_create(
+            [
+                Through(
+                    earthrangerevents_id=event_id,
+                    earthrangersetting_id=setting_id
+                )
+                for event_id in event_ids
+                for setting_id in setting_ids
+            ],
+            ignore_conflicts=True
+        )
+    return len(changed_events)
+
+
+def get_events_tile_cache_key(scope: str, z: int, x: int, y: int):
+    """Get cache key of events vector tile of the visibility scope."""
+    version = cache.get_or_set(
+        EVENTS_TILE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None
+    )
+    return f'earthranger-events-tile:{version}:{scope}:{z}:{x}:{y}'
+
+
+def invalidate_events_tiles():
+    """Invalidate all cached events vector tiles."""
+    try:
+        cache.set(
+            EVENTS_TILE_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None
+        )
+    except Exception as e:
+        logging.warning(f"Failed to invalidate events vector tiles: {e}")
+
+
+def get_event_updated_at(feature):
+    """Get upstream updated_at of EarthRanger feature as datetime."""
+    updated_at = feature.get('updated_at')
+    if not isinstance(updated_at, str):
+        return None
+    try:
+        updated_at = parse_datetime(updated_at)
+    except ValueError:
+        return None
+    if updated_at and is_naive(updated_at):
+        updated_at = make_aware(updated_at, datetime.timezone.utc)
+    return updated_at
+
+
+def create_session(max_retries: int = 3, retry_delay: float = 1.0):
+    """Create keep-alive session that retries failed GET requests.
+
+    Rate limited, server error, timeout and connection error are retried
+    with exponential backoff, honouring the Retry-After header.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=retry_delay,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 def fetch_and_store_data(
         endpoint, model_class, setting_ids=None,
-        max_retries: int = 3, retry_delay: float = 1.0
+        max_retries: int = 3, retry_delay: float = 1.0,
+        updated_since=None
 ):
+    """Fetch all pages of the endpoint and store the events.
+
+    Pages are downloaded in a thread through a keep-alive session while
+    the previous pages are stored, up to EARTH_RANGER_PAGE_QUEUE_SIZE
+    pages ahead. Events are sorted by -updated_at, so paging is stopped
+    once a page has an event older than updated_since.
+
+    :return: Latest upstream updated_at of the events when the fetch
+        is finished without error, otherwise None.
+    """
+    latest_updated_at = None
+    completed = False
     api_url = f"{django_settings.EARTH_RANGER_API_URL}{endpoint}/"
     headers = {
         "accept": "application/json",
@@ -49,7 +218,7 @@ def fetch_and_store_data(
         setting = EarthRangerSetting.objects.filter(id__in=setting_ids).first()
         if not setting:
             logging.error(f"No setting found with ID: {setting_ids}")
-            return
+            return None
 
         base_api_url = get_base_api_url(setting.url)
         api_url = f"{base_api_url}{endpoint}/"
@@ -57,127 +226,99 @@ def fetch_and_store_data(
             "accept": "application/json",
             "Authorization": f"Bearer {setting.token}"
         }
-    fetch_data = True
-    retry_count = 0
 
-    while fetch_data:
-        try:
-            response = requests.get(api_url, headers=headers, timeout=30)
+    session = create_session(max_retries, retry_delay)
+    pages = queue.Queue(maxsize=django_settings.EARTH_RANGER_PAGE_QUEUE_SIZE)
+    stop = threading.Event()
 
-            if response.status_code == 200:
-                data = response.json()
+    def put_page(page):
+        # give up when the consumer is stopped
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=1)
+                return
+            except queue.Full:
+                continue
 
-                if model_class == EarthRangerEvents:
-                    for feature in data['data']['results']:
-                        # Always replace the old data with new data
-                        try:
-                            geom = GEOSGeometry(
-                                json.dumps(feature['geojson']['geometry'])
-                            )
-                            event, created = model_class.objects.update_or_create(  # noqa
-                                earth_ranger_uuid=feature['id'],
-                                defaults={
-                                    "data": feature,
-                                    "updated_at": now(),
-                                    "geometry": geom
-                                }
-                            )
-                            if setting_ids:
-                                event.earth_ranger_settings.add(*setting_ids)
-                        except (GDALException, TypeError) as e:
-                            logging.warning(
-                                f"Failed to process feature"
-                                f"{feature.get('id', 'unknown')}: {e}"
-                            )
-                            pass
-                    if data['data']['next']:
-                        api_url = data['data']['next']
-                        retry_count = 0  # Reset retry count for next page
-                    else:
-                        fetch_data = False
-                else:
-                    fetch_data = False
-
-            elif response.status_code in [429, 500, 502, 503, 504]:
-                # Retry on rate limiting and server errors
-                retry_count += 1
-                if retry_count <= max_retries:
-                    wait_time = retry_delay * (2 ** (retry_count - 1))
-                    logging.warning(
-                        f"Request failed with status {response.status_code}. "
-                        f"Retrying in {wait_time} seconds... "
-                        f"(attempt {retry_count}/{max_retries})"
-                    )
-                    time.sleep(wait_time)
-                else:
+    def download_pages(url):
+        try:
+            while url and not stop.is_set():
+                response = session.get(url, headers=headers, timeout=30)
+                if response.status_code in RETRY_STATUS_CODES:
                     logging.error(
                         f"Failed to fetch {model_class} data "
                         f"after {max_retries} retries: "
                         f"{response.status_code} - {response.text}"
                     )
-                    fetch_data = False
-            else:
-                # Don't retry on client errors (4xx except 429)
-                logging.error(
-                    f"Failed to fetch {model_class} data: "
-                    f"{response.status_code} - {response.text}"
-                )
-                fetch_data = False
-
-        except requests.exceptions.Timeout:
-            retry_count += 1
-            if retry_count <= max_retries:
-                wait_time = retry_delay * (2 ** (retry_count - 1))
-                logging.warning(
-                    f"Request timed out. Retrying in {wait_time} seconds... "
-                    f"(attempt {retry_count}/{max_retries})"
-                )
-                time.sleep(wait_time)
-            else:
-                logging.error(
-                    f"Failed to fetch {model_class} data after "
-                    f"{max_retries} timeout retries"
-                )
-                fetch_data = False
-
-        except requests.exceptions.ConnectionError:
-            retry_count += 1
-            if retry_count <= max_retries:
-                wait_time = retry_delay * (2 ** (retry_count - 1))
-                logging.warning(
-                    f"Connection error. Retrying in {wait_time} seconds... "
-                    f"(attempt {retry_count}/{max_retries})"
-                )
-                time.sleep(wait_time)
-            else:
-                logging.error(
-                    f"Failed to fetch {model_class} data after "
-                    f"{max_retries} connection retries"
-                )
-                fetch_data = False
+                    put_page(None)
+                    return
+                if response.status_code != 200:
+                    # Don't retry on client errors (4xx except 429)
+                    logging.error(
+                        f"Failed to fetch {model_class} data: "
+                        f"{response.status_code} - {response.text}"
+                    )
+                    put_page(None)
+                    return
+                if model_class != EarthRangerEvents:
+                    break
 
-        except requests.exceptions.RequestException as e:
-            retry_count += 1
-            if retry_count <= max_retries:
-                wait_time = retry_delay * (2 ** (retry_count - 1))
-                logging.warning(
-                    f"Request exception: {e}. Retrying in"
-                    "{wait_time} seconds... "
-                    f"(attempt {retry_count}/{max_retries})"
-                )
-                time.sleep(wait_time)
-            else:
-                logging.error(
-                    f"Failed to fetch {model_class} data after "
-                    f"{max_retries} retries due to: {e}"
+                data = response.json()
+                results = data['data']['results']
+                page_updated_at = [
+                    updated_at for updated_at in
+                    map(get_event_updated_at, results) if updated_at
+                ]
+                put_page((results, page_updated_at))
+                is_older_page = (
+                    updated_since and page_updated_at and
+                    min(page_updated_at) < updated_since
                 )
-                fetch_data = False
-
+                url = None if is_older_page else data['data']['next']
+            put_page(PAGES_END)
+        except requests.exceptions.RequestException as e:
+            logging.error(
+                f"Failed to fetch {model_class} data after "
+                f"{max_retries} retries due to: {e}"
+            )
+            put_page(None)
         except Exception as e:
             logging.error(
                 f"Unexpected error while fetching {model_class} data: {e}"
             )
-            fetch_data = False
+            put_page(None)
+
+    producer = threading.Thread(
+        target=download_pages, args=(api_url,), daemon=True
+    )
+    producer.start()
+    try:
+        while True:
+            page = pages.get()
+            if page is None:
+                break
+            if page is PAGES_END:
+                completed = True
+                break
+            results, page_updated_at = page
+            if store_events(results, setting_ids):
+                invalidate_events_tiles()
+            if page_updated_at:
+                latest_updated_at = max(
+                    page_updated_at + (
+                        [latest_updated_at] if latest_updated_at else []
+                    )
+                )
+    except Exception as e:
+        logging.error(
+            f"Unexpected error while storing {model_class} data: {e}"
+        )
+    finally:
+        stop.set()
+        producer.join()
+        session.close()
+
+    return latest_updated_at if completed else None
 
 
 def get_grouped_settings():
@@ -6,9 +6,13 @@ Africa Rangeland Watch (ARW).
 """
 import logging
 from datetime import date
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework import serializers
 
@@ -21,6 +25,59 @@ from analysis.analysis import (
 from analysis.models import AnalysisTask
 from analysis.runner import AnalysisRunner
 from analysis.tasks import run_analysis_task
+from analysis.temporal_statistics import ResultFormat, convert_results
+
+# lock held while identical analysis is being submitted, its value is
+# the id of the submitted task once it is created
+IN_FLIGHT_LOCK_PREFIX = 'analysis-in-flight-lock'
+IN_FLIGHT_LOCK_TIMEOUT = 30
+COLUMNAR_RESULT_CACHE_PREFIX = 'analysis-columnar-result'
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """JSON renderer of analysis results in columnar form.
+
+    Requested by Accept header or format=columnar query parameter.
+    """
+
+    media_type = 'application/vnd.arw.columnar+json'
+    format = ResultFormat.COLUMNAR
+
+
+def get_result_format(request):
+    """Get the negotiated format of the analysis results."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer and renderer.format == ResultFormat.COLUMNAR:
+        return ResultFormat.COLUMNAR
+    return ResultFormat.GEOJSON
+
+
+def get_task_results(analysis_task: AnalysisTask, result_format):
+    """Get results of the analysis task in the format.
+
+    Only temporal analysis has columnar results, they are cached by
+    the digest of the results payload.
+    """
+    analysis_type = (analysis_task.analysis_inputs or {}).get('analysisType')
+    columnar_types = AnalysisResultsCacheUtils.COLUMNAR_ANALYSIS_TYPES
+    if (
+        result_format != ResultFormat.COLUMNAR or
+        analysis_type not in columnar_types or
+        not analysis_task.result_payload_id
+    ):
+        return analysis_task.result
+
+    cache_key = (
+        f'{COLUMNAR_RESULT_CACHE_PREFIX}:{analysis_task.result_payload_id}'
+    )
+    results = cache.get(cache_key)
+    if results is None:
+        results = convert_results(analysis_task.result, result_format)
+        cache.set(
+            cache_key, results,
+            timeout=settings.ANALYSIS_COLUMNAR_RESULT_CACHE_TIMEOUT
+        )
+    return results
 
 
 class AnalysisResultSerializer(serializers.Serializer):
@@ -35,26 +92,37 @@ class AnalysisResultSerializer(serializers.Serializer):
     completed_at = serializers.DateTimeField(allow_null=True, required=False)
 
 
+class AnalysisTaskStatusSerializer(serializers.Serializer):
+    """Serializer for analysis task status API response."""
+    task_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=TaskStatus.choices)
+    error = serializers.CharField(allow_null=True, required=False)
+    started_at = serializers.DateTimeField(allow_null=True, required=False)
+    completed_at = serializers.DateTimeField(allow_null=True, required=False)
+
+
 class AnalysisAPI(APIView):
     """API to do analysis."""
 
     permission_classes = [IsAuthenticated]
+    renderer_classes = (
+        list(api_settings.DEFAULT_RENDERER_CLASSES) + [ColumnarJSONRenderer]
+    )
 
-    def check_cache(self, data):
-        """Check if results are already cached."""
+    def get_analysis_cache(self, data):
+        """Get analysis cache utils of the analysis inputs."""
         analysis_dict = {}
         locations = data.get('locations', [])
         args = []
         kwargs = {}
         if data['analysisType'] == 'Temporal':
             analysis_dict = AnalysisRunner.get_analysis_dict_temporal(data)
-            analysis_cache = AnalysisResultsCacheUtils({
+            return AnalysisResultsCacheUtils({
                 'locations': locations,
                 'analysis_dict': analysis_dict,
                 'args': args,
                 'kwargs': kwargs
             })
-            return analysis_cache.get_analysis_cache()
 
         elif data['analysisType'] == 'Spatial':
             analysis_dict = AnalysisRunner.get_analysis_dict_spatial(data)
@@ -77,14 +145,64 @@ class AnalysisAPI(APIView):
                 'reference_layer': reference_layer_geom
             }
 
-        analysis_cache = AnalysisResultsCacheUtils({
+        return AnalysisResultsCacheUtils({
             'locations': locations,
             'analysis_dict': analysis_dict,
             'args': args,
             'kwargs': kwargs
         })
 
-        return analysis_cache.get_analysis_cache()
+    def check_cache(self, data):
+        """Check if results are already cached."""
+        return self.get_analysis_cache(data).get_analysis_cache()
+
+    def submit_analysis_task(self, data, inputs_hash, user):
+        """Submit analysis task or attach to identical in-flight task.
+
+        Duplicate request does not wait for the submission, it gets the
+        task id from the lock and polls the task status.
+
+        Return the task and whether it is newly created.
+        """
+        lock_key = f'{IN_FLIGHT_LOCK_PREFIX}-{inputs_hash}'
+        acquired = cache.add(lock_key, 0, timeout=IN_FLIGHT_LOCK_TIMEOUT)
+        try:
+            if not acquired:
+                # another request is submitting the same analysis
+                task_id = cache.get(lock_key)
+                analysis_task = (
+                    AnalysisTask.objects.filter(id=task_id).first() if
+                    task_id else None
+                )
+                if analysis_task:
+                    return analysis_task, False
+
+            analysis_task = AnalysisTask.get_in_flight_task(inputs_hash)
+            if analysis_task:
+                return analysis_task, False
+
+            # Create task object
+            analysis_task = AnalysisTask.objects.create(
+                analysis_inputs=data,
+                submitted_by=user
+            )
+            if acquired:
+                cache.set(
+                    lock_key, analysis_task.id,
+                    timeout=IN_FLIGHT_LOCK_TIMEOUT
+                )
+
+            # submit task
+            analysis_task.analysis_inputs_hash = inputs_hash
+            task = run_analysis_task.delay(analysis_task.id)
+            analysis_task.task_id = task.id
+            analysis_task.save(
+                update_fields=['task_id', 'analysis_inputs_hash']
+            )
+            return analysis_task, True
+        finally:
+            if acquired:
+                cache.delete(lock_key)
 
     def validate_spatial_analysis(self, data):
         """Validate spatial analysis inputs."""
@@ -137,7 +255,10 @@ class AnalysisAPI(APIView):
                 raise ValueError('Invalid analysis type')
 
             # check if analysis is already cached
-            results = self.check_cache(data)
+            analysis_cache = self.get_analysis_cache(data)
+            results = analysis_cache.get_analysis_cache(
+                get_result_format(request)
+            )
             if results is not None:
                 return Response(
                     AnalysisResultSerializer({
@@ -158,27 +279,29 @@ class AnalysisAPI(APIView):
             elif data['analysisType'] == 'BACI':
                 self.validate_baci_analysis(data)
 
-            # Create task object
-            analysis_task = AnalysisTask.objects.create(
-                analysis_inputs=data,
-                submitted_by=request.user
+            analysis_task, created = self.submit_analysis_task(
+                data, analysis_cache.inputs_hash, request.user
             )
 
-            # submit task
-            task = run_analysis_task.delay(analysis_task.id)
-            analysis_task.task_id = task.id
-            analysis_task.save(update_fields=['task_id'])
-
-            return Response(AnalysisResultSerializer({
-                'data': data,
-                'results': None,
-                'task_id': analysis_task.id,
-                'status': TaskStatus.PENDING,
-                'is_cached': False,
-                'error': None,
-                'started_at': analysis_task.created_at,
-                'completed_at': None
-            }).data)
+            return Response(
+                AnalysisResultSerializer({
+                    'data': data,
+                    'results': None,
+                    'task_id': analysis_task.id,
+                    'status': (
+                        TaskStatus.PENDING if created else
+                        analysis_task.status
+                    ),
+                    'is_cached': False,
+                    'error': None,
+                    'started_at': analysis_task.created_at,
+                    'completed_at': None
+                }).data,
+                status=(
+                    status.HTTP_200_OK if created else
+                    status.HTTP_202_ACCEPTED
+                )
+            )
         except ValueError as e:
             logging.error(f"Validation error: {e}")
             return Response(
@@ -202,7 +325,15 @@ class AnalysisAPI(APIView):
 
 
 class FetchAnalysisTaskAPI(APIView):
-    """API to fetch analysis task status and results."""
+    """API to fetch analysis task status and results.
+
+    Results of temporal analysis are returned in columnar form when
+    requested, GeoJSON is returned by default.
+    """
+
+    renderer_classes = (
+        list(api_settings.DEFAULT_RENDERER_CLASSES) + [ColumnarJSONRenderer]
+    )
 
     def get(self, request, *args, **kwargs):
         """Fetch analysis task status and results."""
@@ -210,7 +341,9 @@ class FetchAnalysisTaskAPI(APIView):
         try:
             analysis_task = AnalysisTask.objects.get(id=task_id)
             if analysis_task.status == TaskStatus.COMPLETED:
-                results = analysis_task.result
+                results = get_task_results(
+                    analysis_task, get_result_format(request)
+                )
             else:
                 results = None
 
@@ -231,3 +364,29 @@ class FetchAnalysisTaskAPI(APIView):
             return Response(
                 {'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND
             )
+
+
+class FetchAnalysisTaskStatusAPI(APIView):
+    """API to fetch analysis task status without the results.
+
+    The status is pushed to the cache by the analysis task on status
+    transitions. Clients poll this until the task is finished, then
+    fetch the results once from FetchAnalysisTaskAPI.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """Fetch analysis task status."""
+        task_id = kwargs.get('task_id')
+        task_status = AnalysisTask.get_status(task_id)
+        if task_status is None:
+            return Response(
+                {'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND
+            )
+        error = task_status['error']
+        return Response(AnalysisTaskStatusSerializer({
+            'task_id': task_id,
+            'status': task_status['status'],
+            'error': error.get('message') if error else None,
+            'started_at': task_status['created_at'],
+            'completed_at': task_status['completed_at']
+        }).data)
@@ -11,6 +11,7 @@ from rest_framework.views import APIView
 
 from core.models import Preferences
 from frontend.models import BaseMap
+from layers.models import VectorTileArchive
 from frontend.serializers.base_map import BaseMapSerializer
 
 
@@ -38,6 +39,9 @@ class MapConfigAPI(APIView):
     def get(self, request, *args, **kwargs):
         """Fetch map config."""
         preferences = Preferences.load()
+        community_archive = VectorTileArchive.objects.filter(
+            name=VectorTileArchive.LANDSCAPE_COMMUNITY
+        ).first()
 
         return Response(
             status=200,
@@ -51,6 +55,9 @@ class MapConfigAPI(APIView):
                 ),
                 'number_of_decimal_places': (
                     preferences.number_of_decimal_places
+                ),
+                'community_pmtiles_url': (
+                    community_archive.url if community_archive else None
                 )
             }
         )
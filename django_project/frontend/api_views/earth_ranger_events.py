@@ -7,75 +7,86 @@ Africa Rangeland Watch (ARW).
 import logging
 import math
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
-from django.db.models import Q
 from django.http import Http404, HttpResponse
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.viewsets import mixins, GenericViewSet
 
 from earthranger.models import EarthRangerEvents, EarthRangerSetting
+from earthranger.utils import get_events_tile_cache_key
 from core.pagination import Pagination
+from core.vector_tile import TILE_BUFFER, TILE_EXTENT, get_tile_buffer
 from frontend.serializers.earth_ranger import EarthRangerEventSerializer
 
 logger = logging.getLogger(__name__)
 
 
-def querying_vector_tile(
-        table_name: str, field_names: list, z: int, x: int, y: int,
-        json_fields: list = None, where_clause: str = ""
-):
-    """Return vector tile from table name."""
+def querying_events_vector_tile(z: int, x: int, y: int, user_id=None):
+    """Return vector tile of events that are visible to user.
+
+    Public settings are always visible and private settings only to
+    their owner. Events are selected through the settings through-table
+    and filtered by the tile envelope on the indexed 3857 geometry.
+    """
     # Define the zoom level at which to start simplifying geometries
     simplify_zoom_threshold = 5
-
     simplify_tolerance = (
         0 if z > simplify_zoom_threshold else
         1000 * math.exp(simplify_zoom_threshold - z)
     )
-
-    # Conditional geometry transformation
-    geometry_transform = (
-        f"ST_Simplify(ST_Transform(geometry, 3857), {simplify_tolerance})"
-        if simplify_tolerance > 0 else "ST_Transform(geometry, 3857)"
+    geometry = (
+        f"ST_Simplify(e.geometry_3857, {simplify_tolerance})"
+        if simplify_tolerance > 0 else "e.geometry_3857"
     )
+    # Envelope is expanded by the tile buffer
+    buffer = get_tile_buffer(z)
 
-    # Build field selection with JSON expansion
-    field_selections = []
-
-    for field in field_names:
-        if json_fields and field in json_fields:
-            # Option 1: Expand JSON as text (preserves structure)
-            field_selections.append(f'"{field}"::text as "{field}"')
-        else:
-            field_selections.append(f'"{field}"')
-
+    events_table = EarthRangerEvents._meta.db_table
+    Through = EarthRangerEvents.earth_ranger_settings.through
+    through_table = Through._meta.db_table
+    settings_table = EarthRangerSetting._meta.db_table
     sql = f"""
         WITH mvtgeom AS
         (
-            SELECT {','.join(field_selections)} ,
+            SELECT e.id, e.earth_ranger_uuid,
+                e.data::text as data,
                 ST_AsMVTGeom(
-                    {geometry_transform},
-                    ST_TileEnvelope({z}, {x}, {y}),
-                    extent => 4096, buffer => 64
+                    {geometry},
+                    ST_TileEnvelope(%(z)s, %(x)s, %(y)s),
+                    extent => {TILE_EXTENT}, buffer => {TILE_BUFFER}
                 ) as geom
-                FROM {table_name}
-                {where_clause}
+            FROM {events_table} e
+            WHERE e.geometry_3857 && ST_Expand(
+                ST_TileEnvelope(%(z)s, %(x)s, %(y)s), %(buffer)s
+            )
+            AND EXISTS (
+                SELECT 1
+                FROM {through_table} t
+                JOIN {settings_table} s
+                    ON s.id = t.earthrangersetting_id
+                WHERE t.earthrangerevents_id = e.id
+                AND (
+                    s.privacy = 'public' OR
+                    (s.privacy = 'private' AND
+                     s.user_id = %(user_id)s)
+                )
+            )
         )
         SELECT ST_AsMVT(mvtgeom.*)
         FROM mvtgeom;
     """
-
-    tiles = []
-
-    # Raw query it
     with connection.cursor() as cursor:
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        for row in rows:
-            tiles.append(bytes(row[0]))
-    return tiles
-
+        cursor.execute(
+            sql,
+            {'z': z, 'x': x, 'y': y, 'buffer': buffer, 'user_id': user_id}
+        )
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return b''
+    return bytes(row[0])
 
 
 class EarthRangerEventsViewSet(
@@ -98,47 +109,35 @@ class EarthRangerEventsViewSet(
             throttles = []
         return throttles
 
+    def get_visibility_scope(self, request):
+        """Get scope of the settings whose events are visible to user.
+
+        Users without private settings see the same events as anonymous
+        users, so they share the public tiles.
+        """
+        if request.user.is_authenticated and EarthRangerSetting.objects.filter(
+            user=request.user, privacy='private'
+        ).exists():
+            return f'user-{request.user.id}'
+        return 'public'
+
     @action(detail=False, methods=["get"])
     def vector_tile(self, request, z, x, y):
         """Return vector tile of landscape."""
-        # Determine which settings to include based on authentication
-        if request.user.is_authenticated:
-            # Authenticated users: public settings + their private settings
-            settings_filter = Q(privacy='public') | Q(user=request.user, privacy='private')  # noqa
-        else:
-            # Unauthenticated users: only public settings
-            settings_filter = Q(privacy='public')
-
-        # Get the relevant EarthRanger settings
-        earth_ranger_settings = EarthRangerSetting.objects.filter(
-            settings_filter,
-            # is_active=True  # Only include active settings
-        )
-
-        # Get events that belong to these settings
-        events = EarthRangerEvents.objects.filter(
-            earth_ranger_settings__in=earth_ranger_settings
-        ).distinct()
-
-        # If no events found, return 404
-        if not events.exists():
-            raise Http404()
-
-        # Build the WHERE clause for the SQL query to filter by event IDs
-        event_ids = list(events.values_list('id', flat=True))
-        where_clause = f"WHERE id IN ({','.join(map(str, event_ids))})"
-
-        tiles = querying_vector_tile(
-            EarthRangerEvents._meta.db_table,
-            field_names=[
-                'id', 'earth_ranger_uuid', 'data'
-            ],
-            json_fields=['data'],
-            z=z, x=x, y=y,
-            where_clause=where_clause  # Pass the WHERE clause
-        )
+        scope = self.get_visibility_scope(request)
+        cache_key = get_events_tile_cache_key(scope, z, x, y)
+        tile = cache.get(cache_key)
+        if tile is None:
+            tile = querying_events_vector_tile(
+                z, x, y,
+                user_id=request.user.id if scope != 'public' else None
+            )
+            cache.set(
+                cache_key, tile,
+                timeout=settings.EARTH_RANGER_TILE_CACHE_TIMEOUT
+            )
 
         # If no tile 404
-        if not len(tiles):
+        if not tile:
             raise Http404()
-        return HttpResponse(tiles, content_type="application/x-protobuf")
+        return HttpResponse(tile, content_type="application/x-protobuf")
@@ -16,7 +16,6 @@ from rest_framework.views import APIView
 from django.conf import settings
 from core.gcs import get_gcs_client, generate_object_name, rasterio_read_gcs
 from analysis.analysis import initialize_engine_analysis
-from analysis.tasks import check_ingestor_asset_status
 
 from analysis.models import (
     Indicator,
@@ -261,11 +260,10 @@ class UserIndicatorAPI(APIView):
                     'error': None,
                     'started_at': datetime.now().isoformat()
                 }
+            # status/any error is monitored by sweep_ingestor_asset_status
+            user_gee_asset.is_ingesting = True
             user_gee_asset.save()
 
-            # start celery task to monitor its status/any error
-            check_ingestor_asset_status.delay(user_gee_asset.id)
-
         return Response(
             status=201,
             data={
@@ -4,8 +4,12 @@ Africa Rangeland Watch (ARW).
 
 .. note:: Landscape APIs
 """
-from cloud_native_gis.utils.vector_tile import querying_vector_tile
-from django.http import Http404, HttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -13,12 +17,47 @@ from rest_framework.viewsets import mixins, GenericViewSet
 
 from analysis.models import Landscape, LandscapeCommunity
 from core.pagination import Pagination
+from core.vector_tile import TILE_BUFFER, TILE_EXTENT, get_tile_buffer
 from frontend.serializers.landscape import (
     LandscapeSerializer, LandscapeCommunitySerializer
 )
 from layers.models import InputLayer
 
 
+def querying_community_vector_tile(z: int, x: int, y: int):
+    """Return vector tile of landscape communities.
+
+    The geometry of the zoom band is already simplified and transformed
+    to web mercator, filtered by the tile envelope on its spatial index.
+    """
+    geometry = LandscapeCommunity.get_tile_geometry_field(z)
+    # Envelope is expanded by the tile buffer
+    buffer = get_tile_buffer(z)
+    sql = f"""
+        WITH mvtgeom AS
+        (
+            SELECT id, landscape_id, community_id, community_name,
+                ST_AsMVTGeom(
+                    {geometry},
+                    ST_TileEnvelope(%(z)s, %(x)s, %(y)s),
+                    extent => {TILE_EXTENT}, buffer => {TILE_BUFFER}
+                ) as geom
+            FROM {LandscapeCommunity._meta.db_table}
+            WHERE {geometry} && ST_Expand(
+                ST_TileEnvelope(%(z)s, %(x)s, %(y)s), %(buffer)s
+            )
+        )
+        SELECT ST_AsMVT(mvtgeom.*)
+        FROM mvtgeom;
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'z': z, 'x': x, 'y': y, 'buffer': buffer})
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return b''
+    return bytes(row[0])
+
+
 class LandscapeViewSet(
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -52,19 +91,36 @@ class LandscapeViewSet(
 
     @action(detail=False, methods=["get"])
     def vector_tile(self, request, z, x, y):
-        """Return vector tile of landscape."""
-        tiles = querying_vector_tile(
-            LandscapeCommunity._meta.db_table,
-            field_names=[
-                'id', 'landscape_id', 'community_id', 'community_name'
-            ],
-            z=z, x=x, y=y
-        )
+        """Return vector tile of landscape.
+
+        Tiles are cached until the communities are changed, identified
+        by the ETag of the tile version.
+        """
+        version = LandscapeCommunity.get_tile_version()
+        etag = quote_etag(f'{version}-{z}-{x}-{y}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            cache_key = f'landscape-community-tile:{version}:{z}:{x}:{y}'
+            tile = cache.get(cache_key)
+            if tile is None:
+                tile = querying_community_vector_tile(z, x, y)
+                cache.set(
+                    cache_key, tile,
+                    timeout=settings.LANDSCAPE_TILE_CACHE_TIMEOUT
+                )
 
-        # If no tile 404
-        if not len(tiles):
-            raise Http404()
-        return HttpResponse(tiles, content_type="application/x-protobuf")
+            # If no tile 404
+            if not tile:
+                raise Http404()
+            response = HttpResponse(
+                tile, content_type="application/x-protobuf"
+            )
+        response['ETag'] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.LANDSCAPE_TILE_MAX_AGE
+        )
+        return response
 
 
 class LandscapeCommunityViewSet(mixins.ListModelMixin, GenericViewSet):
@@ -47,7 +47,7 @@ import {
     saveDashboardByUuid
 } from '../../store/dashboardSlice';
 import SortableWidgetItem from './SortableWidgetItem';
-import { Item } from '../../store/userAnalysisSearchSlice';
+import { Item, fetchItemDetail } from '../../store/userAnalysisSearchSlice';
 import ItemSelector from './ItemSelector';
 import EditableWrapper from '../EditableWrapper';
 import { downloadDashboardPDF } from '../../utils/downloadPDF';
@@ -691,7 +691,21 @@ const DynamicDashboard: React.FC<{
               </Menu>
               <ItemSelector
                 onItemSelect={(item: Item) => {
-                  addWidget(item);
+                  fetchItemDetail(item.id)
+                    .then((detail: Item) => addWidget(detail))
+                    .catch(() => {
+                      toast({
+                        title: 'Failed to Add Widget',
+                        description: 'The selected analysis result could not be loaded.',
+                        status: 'error',
+                        duration: 3000,
+                        isClosable: true,
+                        position: "top-right",
+                        containerStyle: {
+                          color: "white",
+                        },
+                      });
+                    });
                 }}
                 title="Choose an Analysis Result"
                 placeholder="Select an analysis result to be added as a widget"
@@ -18,7 +18,8 @@ import { AppDispatch, RootState } from "../../../../store";
 import {
   doAnalysis, REFERENCE_LAYER_DIFF_ID, resetAnalysisResult,
   setAnalysis, setAnalysisCustomGeom,
-  fetchAnalysisStatus, setMaxWaitAnalysisReached, toggleAnalysisLandscapeCommunity
+  fetchAnalysisStatus, fetchAnalysisTaskStatus, setMaxWaitAnalysisReached,
+  toggleAnalysisLandscapeCommunity
 } from "../../../../store/analysisSlice";
 import { AnalysisCustomGeometrySelector } from "./AnalysisCustomGeometrySelector";
 import AnalysisUserDefinedLayerSelector from "./AnalysisUserDefinedLayerSelector";
@@ -138,14 +139,29 @@ export default function Analysis({ landscapes, layers, onLayerChecked, onLayerUn
   useEffect(() => {
     let interval: NodeJS.Timeout | null = null;
     if (analysisTaskId && (analysisTaskStatus === 'PENDING' || analysisTaskStatus === 'RUNNING')) {
+      let isFetching = false;
       interval = setInterval(() => {
         const currentTime = Math.floor(Date.now() / 1000);
         const elapsedTime = currentTime - analysisTaskStartTime;
         if (elapsedTime > mapConfig.max_wait_analysis_run_time) {
           clearInterval(interval);
           dispatch(setMaxWaitAnalysisReached());
-        } else {
-          dispatch(fetchAnalysisStatus({taskId: analysisTaskId}));
+        } else if (!isFetching) {
+          // poll the status only, results are fetched once when finished
+          isFetching = true;
+          dispatch(fetchAnalysisTaskStatus({taskId: analysisTaskId}))
+            .then((action: any) => {
+              const status = action.payload?.status;
+              if (
+                action.type.endsWith('/rejected') ||
+                status === 'COMPLETED' || status === 'FAILED'
+              ) {
+                clearInterval(interval);
+                dispatch(fetchAnalysisStatus({taskId: analysisTaskId}));
+              } else {
+                isFetching = false;
+              }
+            });
         }
       }, 1000);
     }
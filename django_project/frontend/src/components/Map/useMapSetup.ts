@@ -167,12 +167,16 @@ export const useMapSetup = (
     useEffect(() => {
         try {
           const map = mapRef.current;
-          if (!isMapLoaded || !map) {
+          if (!isMapLoaded || !map || !mapConfig || map.getSource(COMMUNITY_ID)) {
             return
           }
-          // render community layer
+          // render community layer, from the baked archive if exists
           map.addSource(
-            COMMUNITY_ID, {
+            COMMUNITY_ID,
+            mapConfig.community_pmtiles_url ? {
+              type: 'vector',
+              url: 'pmtiles://' + document.location.origin + mapConfig.community_pmtiles_url
+            } : {
               type: 'vector',
               tiles: [
                 document.location.origin + '/frontend-api/landscapes/vector_tile/{z}/{x}/{y}/'
@@ -224,6 +228,6 @@ export const useMapSetup = (
         } catch (err) {
           console.log(err)
         }
-    }, [isMapLoaded])
+    }, [isMapLoaded, mapConfig])
 
 };
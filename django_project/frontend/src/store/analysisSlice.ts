@@ -118,6 +118,21 @@ export const fetchAnalysisStatus = createAsyncThunk(
   }
 );
 
+// Async thunk to fetch analysis task status without the results
+export const fetchAnalysisTaskStatus = createAsyncThunk(
+  'analysis/analysisTaskStatus',
+  async ({taskId}: {taskId: number}, { rejectWithValue }) => {
+    try {
+      const response = await axios.get(`/frontend-api/analysis/task/${taskId}/status/`);
+      return response.data;
+    } catch (error: any) {
+      return rejectWithValue({
+        message: getErrorMessage(error, 'Failed to perform analysis'),
+      });
+    }
+  }
+);
+
 export const fetchAnalysisIndicator = createAsyncThunk(
   'analysis/indicator',
   async () => {
@@ -274,6 +289,15 @@ export const analysisSlice = createSlice({
           state.analysisTaskStartTime = null;
         }
       })
+      .addCase(fetchAnalysisTaskStatus.fulfilled, (state, action) => {
+        // finished status is set when the results are fetched
+        if (
+          action.meta.arg.taskId === state.analysisTaskId &&
+          ['PENDING', 'RUNNING'].includes(action.payload.status)
+        ) {
+          state.analysisTaskStatus = action.payload.status;
+        }
+      })
       .addCase(fetchAnalysisStatus.rejected, (state, action) => {
         state.error = parseError(action);
         state.analysisTaskStatus = 'FAILED';
@@ -9,6 +9,7 @@ interface MapConfig {
     spatial_reference_layer_max_area: number;
     max_wait_analysis_run_time: number;
     number_of_decimal_places: number;
+    community_pmtiles_url: string | null;
 }
 
 interface MapConfigState extends DataState {
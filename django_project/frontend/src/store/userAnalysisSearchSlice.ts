@@ -53,6 +53,15 @@ const fetchUserAnalysisResults = async ({ page, limit, search = '' }: FetchItems
   };
 };
 
+// fetch full analysis results of an item, the list only has the summary
+export const fetchItemDetail = async (id: string): Promise<Item> => {
+  const response = await axios.get(`/user_analysis_results/${id}/`);
+  if (response.status !== 200) {
+    throw new Error(`Failed to fetch item: ${response.statusText}`);
+  }
+  return response.data;
+};
+
 // Async thunk for fetching initial items
 export const fetchItems = createAsyncThunk(
   'items/fetchItems',
@@ -10,7 +10,11 @@ from django.utils import timezone
 from unittest.mock import patch, MagicMock
 
 from core.tests.common import BaseAPIViewTest
-from frontend.api_views.analysis import AnalysisAPI, FetchAnalysisTaskAPI
+from frontend.api_views.analysis import (
+    AnalysisAPI,
+    FetchAnalysisTaskAPI,
+    FetchAnalysisTaskStatusAPI
+)
 from analysis.analysis import InputLayer, AnalysisResultsCache
 from analysis.runner import AnalysisRunner
 from analysis.models import AnalysisTask
@@ -561,6 +565,80 @@ class AnalysisAPITest(BaseAPIViewTest):
         mock_run_task.assert_not_called()
 
 
+    @patch("analysis.tasks.run_analysis_task.delay")
+    def test_post_attach_to_in_flight_task(self, mock_run_task):
+        """Test identical submissions share the running analysis task."""
+        mock_run_task.return_value = MagicMock(id="mock-task-id")
+        payload = {
+            'locations': [{
+                'lat': 0,
+                'lon': 0,
+            }],
+            "analysisType": "Baseline",
+            "landscape": "1",
+            "variable": "NDVI",
+            "temporalResolution": "Annual",
+            "period": {"year": "2015", "quarter": "1"},
+        }
+
+        view = AnalysisAPI.as_view()
+        task_ids = []
+        for status_code in [200, 202]:
+            request = self.factory.post(
+                reverse("frontend-api:analysis"),
+                payload,
+                format="json"
+            )
+            request.user = self.superuser
+            response = view(request)
+            self.assertEqual(response.status_code, status_code)
+            task_ids.append(response.data["task_id"])
+
+        self.assertEqual(task_ids[0], task_ids[1])
+        self.assertEqual(AnalysisTask.objects.count(), 1)
+        mock_run_task.assert_called_once_with(task_ids[0])
+
+        # finished task is not reused
+        AnalysisTask.objects.update(status=TaskStatus.FAILED)
+        request = self.factory.post(
+            reverse("frontend-api:analysis"),
+            payload,
+            format="json"
+        )
+        request.user = self.superuser
+        response = view(request)
+        self.assertNotEqual(response.data["task_id"], task_ids[0])
+        self.assertEqual(AnalysisTask.objects.count(), 2)
+
+    @patch("analysis.tasks.run_analysis_task.delay")
+    def test_post_duplicate_while_submitting(self, mock_run_task):
+        """Test duplicate request gets the task id from the lock."""
+        from django.core.cache import cache
+        task = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Baseline'},
+            submitted_by=self.superuser
+        )
+        payload = {
+            'locations': [{
+                'lat': 0,
+                'lon': 0,
+            }],
+            "analysisType": "Baseline",
+            "landscape": "1",
+            "variable": "NDVI",
+            "temporalResolution": "Annual",
+            "period": {"year": "2015", "quarter": "1"},
+        }
+        view = AnalysisAPI()
+        with patch.object(cache, 'add', return_value=False), \
+                patch.object(cache, 'get', return_value=task.id):
+            analysis_task, created = view.submit_analysis_task(
+                payload, 'inputs-hash', self.superuser
+            )
+        self.assertEqual(analysis_task.id, task.id)
+        self.assertFalse(created)
+        mock_run_task.assert_not_called()
+
 class FetchAnalysisTaskAPITest(BaseAPIViewTest):
     """FetchAnalysisTaskAPI test case."""
 
@@ -597,6 +675,56 @@ class FetchAnalysisTaskAPITest(BaseAPIViewTest):
         self.assertEqual(response.data["status"], TaskStatus.COMPLETED)
         self.assertEqual(response.data["results"], {"key": "value"})
 
+    def test_fetch_analysis_task_columnar(self):
+        """Test fetching temporal results in columnar form."""
+        feature_collection = {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'geometry': None,
+                    'properties': {'Name': name, 'year': 2020, 'EVI': 0.5}
+                } for name in ['B', 'A']
+            ]
+        }
+        self.analysis_task.analysis_inputs = {
+            'analysisType': 'Temporal',
+            'variable': 'EVI'
+        }
+        self.analysis_task.status = TaskStatus.COMPLETED
+        self.analysis_task.result = [feature_collection, feature_collection]
+        self.analysis_task.save()
+
+        url = reverse(
+            "frontend-api:fetch-analysis-task",
+            kwargs={"task_id": self.analysis_task.id}
+        )
+        view = FetchAnalysisTaskAPI.as_view()
+
+        # GeoJSON by default
+        request = self.factory.get(url)
+        request.user = self.superuser
+        response = view(request, task_id=self.analysis_task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"], [feature_collection] * 2
+        )
+
+        request = self.factory.get(
+            url, HTTP_ACCEPT='application/vnd.arw.columnar+json'
+        )
+        request.user = self.superuser
+        response = view(request, task_id=self.analysis_task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Type'], 'application/vnd.arw.columnar+json'
+        )
+        results = response.data["results"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['names'], ['A', 'B'])
+        self.assertEqual(results[0]['columns']['Name'], [1, 0])
+        self.assertEqual(results[0]['columns']['EVI'], [0.5, 0.5])
+
     def test_fetch_analysis_task_pending(self):
         """Test fetching a pending analysis task."""
         url = reverse(
@@ -643,3 +771,42 @@ class FetchAnalysisTaskAPITest(BaseAPIViewTest):
         view = FetchAnalysisTaskAPI.as_view()
         with self.assertRaises(Exception):
             view(request, task_id=self.analysis_task.id)
+
+
+class FetchAnalysisTaskStatusAPITest(BaseAPIViewTest):
+    """FetchAnalysisTaskStatusAPI test case."""
+
+    def setUp(self):
+        super().setUp()
+        self.analysis_task = AnalysisTask.objects.create(
+            analysis_inputs={'analysisType': 'Baseline'},
+            status=TaskStatus.COMPLETED,
+            completed_at=timezone.now(),
+            result={'type': 'FeatureCollection', 'features': []}
+        )
+
+    def get_response(self, task_id):
+        url = reverse(
+            "frontend-api:fetch-analysis-task-status",
+            kwargs={"task_id": task_id}
+        )
+        request = self.factory.get(url)
+        request.user = self.superuser
+        view = FetchAnalysisTaskStatusAPI.as_view()
+        return view(request, task_id=task_id)
+
+    def test_fetch_status(self):
+        """Test fetching status does not return the results."""
+        response = self.get_response(self.analysis_task.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["task_id"], self.analysis_task.id)
+        self.assertEqual(response.data["status"], TaskStatus.COMPLETED)
+        self.assertIsNone(response.data["error"])
+        self.assertIsNotNone(response.data["completed_at"])
+        self.assertNotIn("results", response.data)
+
+    def test_fetch_status_not_found(self):
+        """Test fetching status of a non-existent task."""
+        response = self.get_response(9999)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("Task not found", response.data["error"])
@@ -65,3 +65,4 @@ class MapConfigAPITest(BaseAPIViewTest):
             response.data['initial_bound'],
             Preferences.load().map_initial_bound
         )
+        self.assertIsNone(response.data['community_pmtiles_url'])
@@ -0,0 +1,97 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Unit tests for EarthRanger events API.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.gis.geos import Point
+from django.test import override_settings
+from django.urls import reverse
+
+from core.tests.common import BaseAPIViewTest
+from earthranger.factories import (
+    EarthRangerEventsFactory,
+    PrivateEarthRangerSettingFactory,
+    PublicEarthRangerSettingFactory
+)
+from earthranger.utils import invalidate_events_tiles
+from frontend.api_views.earth_ranger_events import EarthRangerEventsViewSet
+
+
+class EarthRangerEventsVectorTileTest(BaseAPIViewTest):
+    """EarthRanger events vector tile test case."""
+
+    def request_tile(self, user=None, z=0, x=0, y=0):
+        """Request vector tile as user."""
+        view = EarthRangerEventsViewSet.as_view({'get': 'vector_tile'})
+        request = self.factory.get(
+            reverse(
+                'frontend-api:earth-ranger-events-vector-tile',
+                kwargs={'z': z, 'x': x, 'y': y}
+            )
+        )
+        if user:
+            self._force_authenticate(request, user)
+        else:
+            request.user = AnonymousUser()
+        return view(request, z=z, x=x, y=y)
+
+    @patch('earthranger.tasks.fetch_earth_ranger_events.delay')
+    def test_vector_tile_visibility(self, mock_fetch):
+        """Test events of private settings are only visible to owner."""
+        private_setting = PrivateEarthRangerSettingFactory(user=self.user)
+        EarthRangerEventsFactory(
+            geometry=Point(10, 10, srid=4326),
+            earth_ranger_settings=[private_setting]
+        )
+
+        response = self.request_tile()
+        self.assertEqual(response.status_code, 404)
+        response = self.request_tile(self.superuser)
+        self.assertEqual(response.status_code, 404)
+        response = self.request_tile(self.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-protobuf')
+        self.assertTrue(response.content)
+
+        public_setting = PublicEarthRangerSettingFactory()
+        EarthRangerEventsFactory(
+            geometry=Point(10, 10, srid=4326),
+            earth_ranger_settings=[public_setting]
+        )
+        response = self.request_tile()
+        self.assertEqual(response.status_code, 200)
+
+        # outside of the events
+        response = self.request_tile(z=4, x=0, y=0)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            }
+        }
+    )
+    @patch('earthranger.tasks.fetch_earth_ranger_events.delay')
+    @patch('frontend.api_views.earth_ranger_events.querying_events_vector_tile')  # noqa: E501
+    def test_vector_tile_cache(self, mock_query, mock_fetch):
+        """Test tiles are cached per scope until events are stored."""
+        mock_query.return_value = b'tile'
+        PrivateEarthRangerSettingFactory(user=self.user)
+
+        self.request_tile()
+        self.request_tile(self.superuser)
+        self.assertEqual(mock_query.call_count, 1)
+
+        response = self.request_tile(self.user)
+        self.assertEqual(response.content, b'tile')
+        self.assertEqual(mock_query.call_count, 2)
+        self.assertEqual(mock_query.call_args[1]['user_id'], self.user.id)
+
+        invalidate_events_tiles()
+        self.request_tile()
+        self.assertEqual(mock_query.call_count, 3)
@@ -5,9 +5,11 @@ Africa Rangeland Watch (ARW).
 .. note:: Unit tests for Landscape API.
 """
 
+from django.contrib.gis.geos import Polygon
+from django.test import override_settings
 from django.urls import reverse
 
-from analysis.models import Landscape
+from analysis.models import Landscape, LandscapeCommunity
 from core.tests.common import BaseAPIViewTest
 from frontend.api_views.landscape import LandscapeViewSet
 
@@ -40,3 +42,63 @@ class LandscapeAPITest(BaseAPIViewTest):
             ['name', 'bbox', 'zoom', 'urls']
         )
         self.assertEqual(len(item['bbox']), 4)
+
+    def request_tile(self, z, x, y, **headers):
+        """Request vector tile of landscape communities."""
+        view = LandscapeViewSet.as_view({'get': 'vector_tile'})
+        request = self.factory.get(
+            reverse(
+                'frontend-api:landscape-vector-tile',
+                kwargs={'z': z, 'x': x, 'y': y}
+            ),
+            **headers
+        )
+        request.user = self.superuser
+        return view(request, z=z, x=x, y=y)
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            }
+        }
+    )
+    def test_vector_tile(self):
+        """Test vector tile of simplified communities with ETag."""
+        community = LandscapeCommunity.objects.create(
+            landscape=Landscape.objects.first(),
+            community_id='community-1',
+            community_name='Community 1',
+            geometry=Polygon.from_bbox((20, -30, 21, -29))
+        )
+        LandscapeCommunity.update_tile_geometries()
+        community.refresh_from_db()
+        self.assertIsNotNone(community.geometry_3857)
+        self.assertIsNotNone(community.geometry_3857_z5)
+        self.assertIsNotNone(community.geometry_3857_z9)
+        self.assertEqual(
+            LandscapeCommunity.get_tile_geometry_field(3),
+            'geometry_3857_z5'
+        )
+        self.assertEqual(
+            LandscapeCommunity.get_tile_geometry_field(12), 'geometry_3857'
+        )
+
+        response = self.request_tile(0, 0, 0)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content)
+        self.assertIn('public', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.request_tile(0, 0, 0, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # tile outside of the communities
+        response = self.request_tile(4, 0, 0)
+        self.assertEqual(response.status_code, 404)
+
+        # changing the communities changes the ETag
+        LandscapeCommunity.update_tile_geometries()
+        response = self.request_tile(0, 0, 0, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -8,7 +8,11 @@ Africa Rangeland Watch (ARW).
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from frontend.api_views.analysis import AnalysisAPI, FetchAnalysisTaskAPI
+from frontend.api_views.analysis import (
+    AnalysisAPI,
+    FetchAnalysisTaskAPI,
+    FetchAnalysisTaskStatusAPI
+)
 from frontend.api_views.base_map import BaseMapAPI, MapConfigAPI
 from frontend.api_views.landscape import LandscapeViewSet
 from frontend.api_views.earth_ranger_events import (
@@ -129,6 +133,11 @@ urlpatterns = base_map_urls + layers_urls + indicator_urls + router.urls + [
         FetchAnalysisTaskAPI.as_view(),
         name='fetch-analysis-task'
     ),
+    path(
+        'analysis/task/<int:task_id>/status/',
+        FetchAnalysisTaskStatusAPI.as_view(),
+        name='fetch-analysis-task-status'
+    ),
     path(
         'analysis/',
         AnalysisAPI.as_view(),
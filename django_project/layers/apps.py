@@ -11,6 +11,7 @@ class LayersConfig(AppConfig):
         from layers.tasks.generate_layer import generate_baseline_nrt_layers  # noqa
         from layers.tasks.export_layer import cleanup_export_request  # noqa
         import layers.tasks.export_nrt_cog # noqa
+        import layers.tasks.bake_pmtiles # noqa
         from cloud_native_gis.models.layer_upload import (
             LayerUpload,
             run_layer_upload
@@ -0,0 +1,134 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Local disk cache of exported COG files in GDrive.
+"""
+import fcntl
+import logging
+import os
+import re
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+GDRIVE_FILE_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class ExportedCogCache:
+    """LRU cache of exported COG files keyed by GDrive file id.
+
+    Files are evicted by their last access time once the total size
+    exceeds the maximum size of the cache.
+    """
+
+    FILE_EXT = '.tif'
+
+    def __init__(self, cache_dir=None, max_size=None):
+        """Initialize class, default to the settings."""
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+
+    @property
+    def cache_dir(self):
+        """Directory of the cached files."""
+        return self._cache_dir or settings.EXPORTED_COG_CACHE_DIR
+
+    @property
+    def max_size(self):
+        """Maximum total size in bytes of the cached files."""
+        if self._max_size is None:
+            return settings.EXPORTED_COG_CACHE_MAX_SIZE
+        return self._max_size
+
+    def _get_path(self, gdrive_file_id):
+        if not GDRIVE_FILE_ID_RE.match(gdrive_file_id):
+            raise ValueError(f'Invalid GDrive file id {gdrive_file_id}')
+        return os.path.join(
+            self.cache_dir, f'{gdrive_file_id}{self.FILE_EXT}'
+        )
+
+    def get(self, gdrive_file_id, download):
+        """Get path of cached file, downloading it when it is missing.
+
+        :param gdrive_file_id: GDrive file id.
+        :param download: Function that downloads the file to given path.
+        :return: Path to the cached file.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_path = self._get_path(gdrive_file_id)
+        if self._touch(file_path):
+            return file_path
+
+        # lock so the file is downloaded once by concurrent requests
+        with open(f'{file_path}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self._touch(file_path):
+                    return file_path
+                tmp_path = f'{file_path}.{uuid.uuid4().hex}.part'
+                try:
+                    download(tmp_path)
+                    os.replace(tmp_path, file_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self.evict(keep=file_path)
+        return file_path
+
+    def _touch(self, file_path):
+        """Update access time of cached file, False if it does not exist."""
+        try:
+            os.utime(file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self, keep=None):
+        """Remove least recently used files above the maximum size."""
+        entries = []
+        with os.scandir(self.cache_dir) as scanner:
+            for entry in scanner:
+                if not entry.name.endswith(self.FILE_EXT):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                # open responses still read the removed file
+                total_size -= size
+            except FileNotFoundError:
+                pass
+            self._remove_lock(path)
+            logger.info(f'Evicted {path} from exported COG cache')
+
+    def _remove_lock(self, file_path):
+        try:
+            os.remove(f'{file_path}.lock')
+        except FileNotFoundError:
+            pass
+
+    def delete(self, gdrive_file_id):
+        """Remove cached file of the GDrive file id."""
+        file_path = self._get_path(gdrive_file_id)
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        self._remove_lock(file_path)
+
+
+exported_cog_cache = ExportedCogCache()
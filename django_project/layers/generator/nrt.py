@@ -6,7 +6,11 @@ Africa Rangeland Watch (ARW).
 """
 import logging
 import datetime
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import ee
+from django.conf import settings
+from django.db import connection
 
 from analysis.models import Landscape, GEEAsset
 from analysis.analysis import (
@@ -140,6 +144,7 @@ class NearRealTimeGenerator(BaseLayerGenerator):
             return None
 
     def _generate_fire_frequency_layer(self, aoi, landscape):
+        """Generate fire frequency layer for a landscape."""
         ff_global = ee.Image(
             GEEAsset.fetch_asset_source('fire_freq')
         ).divide(18).rename('fireFreq')
@@ -255,64 +260,183 @@ class NearRealTimeGenerator(BaseLayerGenerator):
             logger.exception(f'Generating woody cover failed on {landscape}')
             return None
 
-    def _generate(self):
-        """Generate layers for Near-Real Time."""
-        results = []
+    def _run_layer(self, state, func, *args):
+        """Run layer generation in worker thread.
 
-        current_dt = datetime.datetime.now(datetime.UTC)
-        nrt_end_dt = current_dt.date().isoformat()
-
-        for landscape in Landscape.objects.all().iterator(chunk_size=1):
-            aoi = self._to_ee_polygon(landscape)
-            nrt_img = get_nrt_sentinel(
-                aoi,
-                self.DEFAULT_MONTHS,
-                self.NRT_START_DATE,
-                nrt_end_dt
-            )
-            evi = self._generate_evi_layer(nrt_img, landscape)
-            if evi:
-                results.append(evi)
-            ndvi = self._generate_ndvi_layer(nrt_img, landscape)
-            if ndvi:
-                results.append(ndvi)
-            bg = self._generate_bare_ground_layer(nrt_img, aoi, landscape)
-            if bg:
-                results.append(bg)
-            grass = self._generate_grass_cover_layer(nrt_img, aoi, landscape)
-            if grass:
-                results.append(grass)
-            fire = self._generate_fire_frequency_layer(
+        Start time is recorded in state, so the timeout is counted from
+        when the worker picks up the layer.
+        """
+        state['started_at'] = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            # each worker thread has its own database connection
+            connection.close()
+
+    def _submit_landscape(self, executor, landscape, nrt_end_dt):
+        """Submit layers generation of a landscape to the executor.
+
+        :return: List of tuple of layer name, future and its state.
+        """
+        aoi = self._to_ee_polygon(landscape)
+        nrt_img = get_nrt_sentinel(
+            aoi,
+            self.DEFAULT_MONTHS,
+            self.NRT_START_DATE,
+            nrt_end_dt
+        )
+        jobs = [
+            ('EVI', self._generate_evi_layer, nrt_img, landscape),
+            ('NDVI', self._generate_ndvi_layer, nrt_img, landscape),
+            (
+                'Bare ground', self._generate_bare_ground_layer,
+                nrt_img, aoi, landscape
+            ),
+            (
+                'Grass cover', self._generate_grass_cover_layer,
+                nrt_img, aoi, landscape
+            ),
+            (
+                'Fire frequency', self._generate_fire_frequency_layer,
                 aoi, landscape
-            )
-            if fire:
-                results.append(fire)
+            ),
 
             # soil carbon asset is only available up to 2019
-            # soil = self._generate_soil_carbon_layer(aoi, landscape)
-            # if soil:
-            #     results.append(soil)
+            # (
+            #     'Soil carbon', self._generate_soil_carbon_layer,
+            #     aoi, landscape
+            # ),
 
             # TODO: Grazing Capacity got computation timed out error
-            # grazing = self._generate_grazing_capacity_layer(aoi, landscape)
-            # if grazing:
-            #     results.append(grazing)
+            # (
+            #     'Grazing capacity', self._generate_grazing_capacity_layer,
+            #     aoi, landscape
+            # ),
 
             # soil carbon asset is only available up to 2019
-            # soil_change = self._generate_soil_carbon_change_layer(
-            #     aoi, landscape
-            # )
-            # if soil_change:
-            #     results.append(soil_change)
+            # (
+            #     'Soil carbon change',
+            #     self._generate_soil_carbon_change_layer, aoi, landscape
+            # ),
 
             # woody cover asset is only available up to 2019
-            # woody = self._generate_woody_cover_layer(
+            # (
+            #     'Woody plant cover', self._generate_woody_cover_layer,
             #     aoi, nrt_end_dt, landscape
-            # )
-            # if woody:
-            #     results.append(woody)
+            # ),
 
             # Note: Above commented out layers are also removed from
             # fixture 3.input_layer.json
+        ]
+        submitted = []
+        for name, func, *args in jobs:
+            state = {'started_at': None}
+            submitted.append(
+                (
+                    name,
+                    executor.submit(self._run_layer, state, func, *args),
+                    state
+                )
+            )
+        return submitted
+
+    def _handle_result(self, landscape, name, future, results):
+        """Add result of the finished layer or report its failure."""
+        try:
+            result = future.result()
+        except Exception as ex:
+            logger.error(f'Generating {name} failed on {landscape}')
+            logger.error(ex, exc_info=True)
+            self.failures.append((landscape, name, str(ex)))
+            return
+        if result:
+            results.append(result)
+        else:
+            self.failures.append((landscape, name, 'no result'))
+
+    def _generate(self):
+        """Generate layers for Near-Real Time.
+
+        Layers of all landscapes are generated concurrently, a layer that
+        fails or runs longer than NRT_GENERATOR_ITEM_TIMEOUT since it was
+        started is reported in self.failures without stopping the other
+        layers. Timed out layers can not be cancelled, they keep running
+        in the background and their results are ignored.
+        """
+        results = []
+        self.failures = []
+        item_timeout = settings.NRT_GENERATOR_ITEM_TIMEOUT
+        max_workers = settings.NRT_GENERATOR_MAX_WORKERS
+
+        current_dt = datetime.datetime.now(datetime.UTC)
+        nrt_end_dt = current_dt.date().isoformat()
 
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='nrt-generator'
+        )
+        try:
+            pending = {}
+            for landscape in Landscape.objects.all().iterator(chunk_size=1):
+                try:
+                    for name, future, state in self._submit_landscape(
+                        executor, landscape, nrt_end_dt
+                    ):
+                        pending[future] = (landscape, name, state)
+                except Exception as ex:
+                    logger.error(f'Failed to submit NRT layers of {landscape}')
+                    logger.error(ex, exc_info=True)
+                    self.failures.append((landscape, None, str(ex)))
+
+            timed_out = []
+            while pending:
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    landscape, name, _ = pending.pop(future)
+                    self._handle_result(landscape, name, future, results)
+
+                now = time.monotonic()
+                for future, (landscape, name, state) in list(pending.items()):
+                    started_at = state['started_at']
+                    if (
+                        future.done() or started_at is None or
+                        now - started_at < item_timeout
+                    ):
+                        continue
+                    logger.error(
+                        f'Generating {name} layer on {landscape} is still '
+                        f'running after {now - started_at:.0f}s, '
+                        'its result is ignored'
+                    )
+                    self.failures.append(
+                        (landscape, name, 'timeout, still running')
+                    )
+                    pending.pop(future)
+                    timed_out.append(future)
+
+                # workers are all blocked by the timed out layers
+                timed_out = [
+                    future for future in timed_out if not future.done()
+                ]
+                if pending and len(timed_out) >= max_workers:
+                    for landscape, name, _ in pending.values():
+                        logger.error(
+                            f'Generating {name} layer on {landscape} is not '
+                            'started, workers are blocked by timed out layers'
+                        )
+                        self.failures.append((landscape, name, 'not started'))
+                    pending = {}
+        finally:
+            # do not wait for the timed out layers
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.failures:
+            logger.warning(
+                f'NRT generator: {len(results)} layers generated, '
+                f'{len(self.failures)} failed: ' +
+                ', '.join(
+                    f'{landscape} - {name or "all"} ({reason})'
+                    for landscape, name, reason in self.failures
+                )
+            )
         return results
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from layers.pmtiles import (
+    bake_landscape_communities,
+    bake_vector_tile_archives
+)
+
+
+class Command(BaseCommand):
+    """Command to bake vector data into PMTiles archives."""
+    help = (
+        'Bake landscape communities and vector input layers of fixed '
+        'groups into PMTiles archives.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--communities-only',
+            action='store_true',
+            help='Only bake the landscape communities.'
+        )
+
+    def handle(self, *args, **options):
+        if options['communities_only']:
+            archive = bake_landscape_communities()
+            if archive:
+                self.stdout.write(f'{archive.name}: {archive.url}')
+            return
+
+        failures = bake_vector_tile_archives()
+        if failures:
+            self.stderr.write(f'Failed to bake: {", ".join(failures)}')
+        else:
+            self.stdout.write('All archives are baked.')
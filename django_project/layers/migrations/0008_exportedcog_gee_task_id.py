@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2025-10-27 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('layers', '0007_exportedcog_completed_at_exportedcog_errors_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportedcog',
+            name='gee_task_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Earth Engine task ID of the export to Google Drive.', max_length=255, null=True),
+        ),
+    ]
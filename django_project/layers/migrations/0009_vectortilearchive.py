@@ -0,0 +1,26 @@
+# Generated by Django 4.2.23 on 2025-11-05 02:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('layers', '0008_exportedcog_gee_task_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VectorTileArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the archive, landscape-community or the uuid of the input layer.', max_length=255, unique=True)),
+                ('file', models.FileField(help_text='PMTiles archive file.', upload_to='vector_tile_archives/')),
+                ('content_hash', models.CharField(help_text='SHA256 digest of the archive file.', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('input_layer', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='vector_tile_archive', to='layers.inputlayer')),
+            ],
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
+from django.urls import reverse
 from cloud_native_gis.models.layer import Layer
 from cloud_native_gis.utils.fiona import FileType
 
@@ -333,6 +334,13 @@ class ExportedCog(models.Model):
         null=True,
         help_text="Celery task ID for tracking the export task."
     )
+    gee_task_id = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text="Earth Engine task ID of the export to Google Drive."
+    )
     started_at = models.DateTimeField(
         blank=True,
         null=True,
@@ -348,6 +356,15 @@ class ExportedCog(models.Model):
         null=True,
         help_text="Error messages if the export failed."
     )
+    store_claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Time when the finished export is claimed to be stored."
+    )
+    store_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of times the store task of the export is queued."
+    )
 
     def __str__(self):
         return f"{self.file_name} ({self.input_layer.name})"
@@ -474,3 +491,53 @@ class FetchHistory(models.Model):
     def __str__(self):
         created = self.created_at.strftime('%Y-%m-%d %H:%M:%S')
         return f"{self.source.name} - {self.status} - {created}"
+
+
+class VectorTileArchive(models.Model):
+    """Model to represent baked PMTiles archive of vector data.
+
+    The file name contains the content hash, so the archive url is
+    changed whenever the content is changed.
+    """
+
+    LANDSCAPE_COMMUNITY = 'landscape-community'
+
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text=(
+            "Name of the archive, landscape-community or the uuid "
+            "of the input layer."
+        )
+    )
+    input_layer = models.OneToOneField(
+        "layers.InputLayer",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="vector_tile_archive"
+    )
+    file = models.FileField(
+        upload_to='vector_tile_archives/',
+        help_text="PMTiles archive file."
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        help_text="SHA256 digest of the archive file."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.content_hash[:12]})"
+
+    @property
+    def url(self):
+        """Get versioned url of the archive."""
+        return reverse(
+            'vector-tile-archive',
+            kwargs={
+                'name': self.name,
+                'content_hash': self.content_hash
+            }
+        )
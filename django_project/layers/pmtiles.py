@@ -0,0 +1,181 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Bake vector data into PMTiles archives.
+"""
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+
+from cloud_native_gis.models.layer import Layer
+from django.conf import settings
+from django.core.files import File
+from django.db import connection
+
+from analysis.models import LandscapeCommunity
+from layers.models import InputLayer, InputLayerType, VectorTileArchive
+
+logger = logging.getLogger(__name__)
+
+# Layer name in the archive, the map styles use 'default' source-layer
+SOURCE_LAYER = 'default'
+
+
+def get_file_hash(file_path):
+    """Get SHA256 digest of the file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_features(sql, file_path, params=None):
+    """Write features of the query as line-delimited GeoJSON.
+
+    The query must return GeoJSON feature per row, e.g. from
+    ST_AsGeoJSON(record, geometry_column).
+
+    :return: Number of the features.
+    """
+    count = 0
+    with connection.cursor() as cursor, open(file_path, 'w') as f:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                f.write(row[0])
+                f.write('\n')
+            count += len(rows)
+    return count
+
+
+def run_tippecanoe(features_path, output_path):
+    """Generate PMTiles archive from line-delimited GeoJSON."""
+    cmd = [
+        'tippecanoe',
+        '-o', output_path,
+        '-l', SOURCE_LAYER,
+        '-zg',
+        '--no-feature-limit',
+        '--no-tile-size-limit',
+        '--force',
+        '--quiet',
+        features_path
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def bake_vector_tile_archive(name, sql, params=None, input_layer=None):
+    """Bake features of the query into versioned PMTiles archive.
+
+    Archive is replaced only when its content hash is changed.
+
+    :return: VectorTileArchive or None if the query has no feature.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        features_path = os.path.join(tmp_dir, 'features.geojsonl')
+        if not export_features(sql, features_path, params):
+            logger.warning(f'No feature to bake for {name}')
+            return None
+
+        output_path = os.path.join(tmp_dir, f'{name}.pmtiles')
+        run_tippecanoe(features_path, output_path)
+        content_hash = get_file_hash(output_path)
+
+        archive = VectorTileArchive.objects.filter(name=name).first()
+        if archive and archive.content_hash == content_hash:
+            return archive
+        if archive is None:
+            archive = VectorTileArchive(name=name)
+        archive.input_layer = input_layer
+        archive.content_hash = content_hash
+        with open(output_path, 'rb') as f:
+            # previous file is removed by django_cleanup
+            archive.file.save(
+                f'{name}-{content_hash[:16]}.pmtiles', File(f), save=True
+            )
+        logger.info(f'Baked {name} vector tile archive {content_hash}')
+        return archive
+
+
+def bake_landscape_communities():
+    """Bake landscape communities into PMTiles archive."""
+    sql = f"""
+        SELECT ST_AsGeoJSON(community.*, 'geometry', 6)
+        FROM (
+            SELECT id, landscape_id, community_id, community_name, geometry
+            FROM {LandscapeCommunity._meta.db_table}
+        ) community
+    """
+    return bake_vector_tile_archive(
+        VectorTileArchive.LANDSCAPE_COMMUNITY, sql
+    )
+
+
+def get_base_url():
+    """Get backend url without trailing slash."""
+    return settings.DJANGO_BACKEND_URL.rstrip('/')
+
+
+def bake_input_layer(input_layer: InputLayer):
+    """Bake vector input layer into PMTiles archive.
+
+    Features are read from the table of the cloud_native_gis layer and
+    the input layer url is pointed to the archive.
+    """
+    layer = Layer.objects.filter(unique_id=input_layer.uuid).first()
+    if layer is None or not layer.is_ready:
+        return None
+    sql = f"""
+        SELECT ST_AsGeoJSON(feature.*, 'geometry', 6)
+        FROM {layer.query_table_name} feature
+    """
+    archive = bake_vector_tile_archive(
+        str(input_layer.uuid), sql, input_layer=input_layer
+    )
+    if archive:
+        url = f'pmtiles://{get_base_url()}{archive.url}'
+        if input_layer.url != url:
+            input_layer.url = url
+            input_layer.save()
+    return archive
+
+
+def bake_vector_tile_archives():
+    """Bake landscape communities and vector layers of fixed groups.
+
+    Layers that already have PMTiles from the upload are skipped.
+
+    :return: List of names of the failed archives.
+    """
+    failures = []
+    try:
+        bake_landscape_communities()
+    except Exception:
+        logger.exception('Failed to bake landscape communities')
+        failures.append(VectorTileArchive.LANDSCAPE_COMMUNITY)
+
+    input_layers = InputLayer.objects.filter(
+        layer_type=InputLayerType.VECTOR,
+        group__name__in=settings.VECTOR_TILE_ARCHIVE_LAYER_GROUPS
+    )
+    for input_layer in input_layers:
+        if (
+            input_layer.url and input_layer.url.startswith('pmtiles://') and
+            not VectorTileArchive.objects.filter(
+                input_layer=input_layer
+            ).exists()
+        ):
+            continue
+        try:
+            bake_input_layer(input_layer)
+        except Exception:
+            logger.exception(f'Failed to bake input layer {input_layer}')
+            failures.append(str(input_layer.uuid))
+    return failures
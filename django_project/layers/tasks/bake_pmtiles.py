@@ -0,0 +1,14 @@
+# coding=utf-8
+"""
+Africa Rangeland Watch (ARW).
+
+.. note:: Background task for baking PMTiles archives
+"""
+from core.celery import app
+from layers.pmtiles import bake_vector_tile_archives
+
+
+@app.task(name='bake_vector_tile_archives')
+def bake_vector_tile_archives_task():
+    """Bake landscape communities and fixed vector layers to PMTiles."""
+    return bake_vector_tile_archives()
@@ -4,6 +4,7 @@ from datetime import timedelta
 from django.utils import timezone
 from core.celery import app
 from layers.models import ExportedCog
+from layers.cog_cache import exported_cog_cache
 from analysis.utils import delete_gdrive_file
 import logging
 
@@ -25,6 +26,7 @@ def cleanup_exported_cogs_from_drive():
         try:
             if cog.gdrive_file_id:
                 delete_gdrive_file(cog.file_name)
+                exported_cog_cache.delete(cog.gdrive_file_id)
                 logger.info(f"Deleted COG from Drive: {cog.file_name}")
                 cog.downloaded = False
                 cog.gdrive_file_id = None
@@ -21,8 +21,8 @@ def export_ee_image_to_cog(
     export_folder="ARW-NRT-Exports"
 ):
     """
-    Export EE image associated with InputLayer
-    to GDrive as COG and download it."""
+    Submit export of EE image associated with InputLayer
+    to GDrive as COG."""
     exported_cog = None
     initialize_engine_analysis()
     try:
@@ -48,12 +48,32 @@ def export_ee_image_to_cog(
                 input_layer, 'get_vis_params') else None
         }
 
-        # Start EE export task
-        status = export_image_to_drive(**task_config)
+        # Submit EE export task, the exported file is stored by
+        # store_exported_cog once poll_gee_export_tasks finds it finished
+        status = export_image_to_drive(**task_config, wait=False)
         logger.info(
-            f"Export task submitted for {file_name}: {status['state']}"
+            f"Export task submitted for {file_name}: {status['id']}"
         )
+        exported_cog.file_name = file_name
+        exported_cog.gee_task_id = status['id']
+        exported_cog.save()
+
+    except Exception as ex:
+        logger.error(f"Failed to export COG: {ex}", exc_info=True)
+        if exported_cog:
+            exported_cog.downloaded = False
+            exported_cog.status = 'FAILED'
+            exported_cog.errors = str(ex)
+            exported_cog.completed_at = timezone.now()
+            exported_cog.save()
 
+
+def store_exported_cog(exported_cog_id, status: dict):
+    """Find the exported COG on GDrive once the EE export is finished."""
+    exported_cog = None
+    try:
+        exported_cog = ExportedCog.objects.get(id=exported_cog_id)
+        file_name = exported_cog.file_name
         if status["state"] != "COMPLETED":
             raise RuntimeError(f"Export failed or incomplete: {status}")
 
@@ -61,13 +81,14 @@ def export_ee_image_to_cog(
 
         # Poll GDrive for exported file
         gfile = get_gdrive_file(file_name)
+        if gfile is None:
+            raise FileNotFoundError(f"File {file_name} not found on GDrive")
         logger.info(
             f"File {file_name} found on GDrive: {gfile.get('id')}"
         )
 
         # Save to ExportedCog model
         exported_cog.downloaded = True
-        exported_cog.file_name = file_name
         exported_cog.gdrive_file_id = gfile.get('id')
         exported_cog.status = 'COMPLETED'
         exported_cog.completed_at = timezone.now()
@@ -78,11 +99,12 @@ def export_ee_image_to_cog(
             f"ID: {exported_cog.gdrive_file_id}"
         )
         logger.info(
-            f"Exported COG for {input_layer.name} successfully stored."
+            f"Exported COG for {exported_cog.input_layer.name} "
+            "successfully stored."
         )
 
     except Exception as ex:
-        logger.error(f"Failed to export COG: {ex}", exc_info=True)
+        logger.error(f"Failed to store COG: {ex}", exc_info=True)
         if exported_cog:
             exported_cog.downloaded = False
             exported_cog.status = 'FAILED'
@@ -103,3 +125,11 @@ def export_ee_image_to_cog_task(
         exported_cog_id,
         export_folder
     )
+
+
+@shared_task(name="store_exported_cog_task")
+def store_exported_cog_task(exported_cog_id, status):
+    """
+    Celery task to store the COG exported by Earth Engine.
+    """
+    store_exported_cog(exported_cog_id, status)
@@ -0,0 +1,60 @@
+import os
+import tempfile
+from unittest.mock import MagicMock
+from django.test import TestCase
+
+from layers.cog_cache import ExportedCogCache
+
+
+class ExportedCogCacheTestCase(TestCase):
+    """Test case for ExportedCogCache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ExportedCogCache(
+            cache_dir=self.temp_dir.name, max_size=25
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _download(self, size):
+        def download(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(b'x' * size)
+        return MagicMock(side_effect=download)
+
+    def test_download_once(self):
+        download = self._download(10)
+        file_path = self.cache.get('file-1', download)
+        self.assertEqual(os.path.getsize(file_path), 10)
+        self.assertEqual(self.cache.get('file-1', download), file_path)
+        download.assert_called_once()
+
+    def test_evict_least_recently_used(self):
+        path_1 = self.cache.get('file-1', self._download(10))
+        path_2 = self.cache.get('file-2', self._download(10))
+        os.utime(path_1, (1, 1))
+        os.utime(path_2, (2, 2))
+        # access file-1 so file-2 is the least recently used
+        self.cache.get('file-1', self._download(10))
+        path_3 = self.cache.get('file-3', self._download(10))
+        self.assertTrue(os.path.exists(path_1))
+        self.assertFalse(os.path.exists(path_2))
+        self.assertTrue(os.path.exists(path_3))
+
+    def test_failed_download(self):
+        download = MagicMock(side_effect=RuntimeError('Drive error'))
+        with self.assertRaises(RuntimeError):
+            self.cache.get('file-1', download)
+        self.assertEqual(
+            [
+                name for name in os.listdir(self.temp_dir.name)
+                if not name.endswith('.lock')
+            ],
+            []
+        )
+
+    def test_invalid_file_id(self):
+        with self.assertRaises(ValueError):
+            self.cache.get('../file-1', self._download(10))
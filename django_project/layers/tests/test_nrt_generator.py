@@ -0,0 +1,100 @@
+import threading
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+
+from analysis.models import Landscape
+from layers.generator.base import LayerCacheResult
+from layers.generator.nrt import NearRealTimeGenerator
+
+
+@override_settings(NRT_GENERATOR_MAX_WORKERS=2, NRT_GENERATOR_ITEM_TIMEOUT=1)
+@patch('layers.generator.nrt.get_nrt_sentinel', MagicMock())
+@patch.object(NearRealTimeGenerator, '_to_ee_polygon', MagicMock())
+class NearRealTimeGeneratorTestCase(TestCase):
+    """Test case for NearRealTimeGenerator."""
+
+    fixtures = [
+        '2.landscape.json',
+    ]
+
+    def setUp(self):
+        self.generator = NearRealTimeGenerator()
+        # single landscape so a hanging layer only blocks one worker
+        landscape = Landscape.objects.first()
+        Landscape.objects.exclude(id=landscape.id).delete()
+        self.landscape_count = 1
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def _result(self, *args):
+        return LayerCacheResult(MagicMock(), 'https://mock.url/{z}/{x}/{y}')
+
+    def _fail(self, *args):
+        raise ValueError('Failed layer')
+
+    def _hang(self, *args):
+        self.release.wait(10)
+        return self._result()
+
+    def test_generate_success(self):
+        with patch.multiple(
+            self.generator,
+            _generate_evi_layer=MagicMock(side_effect=self._result),
+            _generate_ndvi_layer=MagicMock(side_effect=self._result),
+            _generate_bare_ground_layer=MagicMock(side_effect=self._result),
+            _generate_grass_cover_layer=MagicMock(side_effect=self._result),
+            _generate_fire_frequency_layer=MagicMock(
+                side_effect=self._result
+            )
+        ):
+            results = self.generator._generate()
+        self.assertEqual(len(results), 5 * self.landscape_count)
+        self.assertEqual(self.generator.failures, [])
+
+    def test_generate_partial_failure(self):
+        with patch.multiple(
+            self.generator,
+            _generate_evi_layer=MagicMock(side_effect=self._result),
+            _generate_ndvi_layer=MagicMock(side_effect=self._fail),
+            _generate_bare_ground_layer=MagicMock(return_value=None),
+            _generate_grass_cover_layer=MagicMock(side_effect=self._result),
+            _generate_fire_frequency_layer=MagicMock(side_effect=self._hang)
+        ):
+            results = self.generator._generate()
+        self.assertEqual(len(results), 2 * self.landscape_count)
+        failures = {
+            (name, reason) for _, name, reason in self.generator.failures
+        }
+        self.assertEqual(
+            failures,
+            {
+                ('NDVI', 'Failed layer'),
+                ('Bare ground', 'no result'),
+                ('Fire frequency', 'timeout, still running')
+            }
+        )
+
+    @override_settings(NRT_GENERATOR_MAX_WORKERS=1)
+    def test_generate_workers_blocked(self):
+        with patch.multiple(
+            self.generator,
+            _generate_evi_layer=MagicMock(side_effect=self._hang),
+            _generate_ndvi_layer=MagicMock(side_effect=self._result),
+            _generate_bare_ground_layer=MagicMock(side_effect=self._result),
+            _generate_grass_cover_layer=MagicMock(side_effect=self._result),
+            _generate_fire_frequency_layer=MagicMock(
+                side_effect=self._result
+            )
+        ):
+            results = self.generator._generate()
+        self.assertEqual(results, [])
+        failures = [
+            (name, reason) for _, name, reason in self.generator.failures
+        ]
+        self.assertEqual(failures[0], ('EVI', 'timeout, still running'))
+        self.assertEqual(
+            {reason for _, reason in failures[1:]}, {'not started'}
+        )
+        self.assertEqual(len(failures), 5)
@@ -0,0 +1,83 @@
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.gis.geos import Polygon
+from django.test import TestCase, override_settings
+
+from analysis.models import Landscape, LandscapeCommunity
+from layers.models import VectorTileArchive
+from layers.pmtiles import bake_landscape_communities
+
+
+class BakeVectorTileArchiveTestCase(TestCase):
+    """Test case for baking PMTiles archives."""
+
+    fixtures = [
+        '1.project.json',
+        '2.landscape.json'
+    ]
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root.name
+        )
+        self.settings_override.enable()
+        self.community = LandscapeCommunity.objects.create(
+            landscape=Landscape.objects.first(),
+            community_id='community-1',
+            community_name='Community 1',
+            geometry=Polygon.from_bbox((20, -30, 21, -29))
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def _tippecanoe(self, features_path, output_path):
+        """Write the features as the archive content."""
+        with open(features_path) as src, open(output_path, 'w') as dst:
+            dst.write(src.read())
+
+    @patch('layers.pmtiles.run_tippecanoe')
+    def test_bake_versioned_by_content(self, mock_tippecanoe):
+        """Test archive is only replaced when the content is changed."""
+        mock_tippecanoe.side_effect = self._tippecanoe
+
+        archive = bake_landscape_communities()
+        self.assertEqual(archive.name, VectorTileArchive.LANDSCAPE_COMMUNITY)
+        with archive.file.open('r') as f:
+            feature = json.loads(f.readline())
+        self.assertEqual(
+            feature['properties']['community_name'], 'Community 1'
+        )
+        self.assertIn(archive.content_hash[:16], archive.file.name)
+        url = archive.url
+        self.assertIn(archive.content_hash, url)
+
+        # same content keeps the url
+        archive = bake_landscape_communities()
+        self.assertEqual(archive.url, url)
+        self.assertEqual(VectorTileArchive.objects.count(), 1)
+
+        self.community.community_name = 'Community 2'
+        self.community.save()
+        archive = bake_landscape_communities()
+        self.assertNotEqual(archive.url, url)
+
+    @patch('layers.pmtiles.run_tippecanoe')
+    def test_serve_archive_range(self, mock_tippecanoe):
+        """Test archive is served with range request."""
+        mock_tippecanoe.side_effect = self._tippecanoe
+        archive = bake_landscape_communities()
+
+        response = self.client.get(archive.url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'{"ty')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        response = self.client.get(
+            archive.url.replace(archive.content_hash, 'outdated')
+        )
+        self.assertEqual(response.status_code, 404)
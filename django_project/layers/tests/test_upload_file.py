@@ -0,0 +1,75 @@
+import os
+import tempfile
+from email.parser import BytesParser
+from unittest.mock import patch, MagicMock
+from django.test import TestCase
+
+from layers.utils import MultipartFileStream, upload_file
+
+
+class UploadFileTestCase(TestCase):
+    """Test case for streamed upload_file."""
+
+    def setUp(self):
+        self.content = os.urandom(100000)
+        with tempfile.NamedTemporaryFile(
+            suffix='.tif', delete=False
+        ) as temp_file:
+            temp_file.write(self.content)
+            self.file_path = temp_file.name
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def _parse_body(self, body, content_type):
+        message = BytesParser().parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8') + body
+        )
+        return message.get_payload()[0]
+
+    def test_multipart_file_stream(self):
+        with open(self.file_path, 'rb') as f:
+            stream = MultipartFileStream(f, 'file', 'test.tif')
+            chunks = []
+            while True:
+                chunk = stream.read(8192)
+                if not chunk:
+                    break
+                self.assertLessEqual(len(chunk), 8192)
+                chunks.append(chunk)
+        body = b''.join(chunks)
+        self.assertEqual(len(body), len(stream))
+        part = self._parse_body(body, stream.content_type)
+        self.assertEqual(part.get_param('name', header='content-disposition'), 'file')
+        self.assertEqual(part.get_filename(), 'test.tif')
+        self.assertEqual(part.get_payload(decode=True), self.content)
+
+    @patch('layers.utils.requests.post')
+    def test_upload_file(self, mock_post):
+        def read_body(url, data, headers):
+            body = data.read()
+            self.assertEqual(len(body), int(headers['Content-Length']))
+            part = self._parse_body(body, headers['Content-Type'])
+            self.assertEqual(part.get_payload(decode=True), self.content)
+            return MagicMock(status_code=200)
+
+        mock_post.side_effect = read_body
+        self.assertTrue(
+            upload_file(
+                'http://localhost/api/layer/1/layer-upload/',
+                self.file_path,
+                auth_header='Token abc'
+            )
+        )
+        headers = mock_post.call_args[1]['headers']
+        self.assertEqual(headers['Authorization'], 'Token abc')
+
+    @patch('layers.utils.requests.post')
+    def test_upload_file_failed(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=400, text='Error')
+        self.assertFalse(
+            upload_file(
+                'http://localhost/api/layer/1/layer-upload/',
+                self.file_path
+            )
+        )
@@ -7,6 +7,7 @@ from .views import (
     trigger_cog_export,
     cog_export_status,
     download_from_gdrive,
+    serve_vector_tile_archive,
 )
 from .views_api import (
     ExternalLayerViewSet,
@@ -59,4 +60,9 @@ urlpatterns = [
         download_from_gdrive,
         name='nrt-layer-download'
     ),
+    path(
+        'vector-tile-archive/<str:name>/<str:content_hash>.pmtiles',
+        serve_vector_tile_archive,
+        name='vector-tile-archive'
+    ),
 ]
@@ -5,9 +5,11 @@ Africa Rangeland Watch (ARW).
 .. note:: Utilities for layers
 """
 
+import io
 import requests
 import os
 import time
+import uuid
 import logging
 from urllib.parse import urljoin
 import tempfile
@@ -36,27 +38,72 @@ from layers.models import ExternalLayer, ExternalLayerSource
 logger = logging.getLogger(__name__)
 
 
+class MultipartFileStream:
+    """Read-only stream of multipart/form-data body with a single file.
+
+    The file is read in chunks while the body is sent, so the upload
+    does not keep the whole file in memory.
+    """
+
+    def __init__(self, file, field_name, file_name):
+        """Initialize class."""
+        self.file = file
+        self.boundary = uuid.uuid4().hex
+        self.content_type = (
+            f'multipart/form-data; boundary={self.boundary}'
+        )
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{file_name}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self._file_size = os.fstat(file.fileno()).st_size
+        self._parts = [io.BytesIO(self._head), file, io.BytesIO(self._tail)]
+
+    def __len__(self):
+        """Get total length of the body."""
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def read(self, size=-1):
+        """Read next chunk of the body."""
+        if size is None or size < 0:
+            size = len(self)
+        chunks = []
+        while self._parts and size > 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+
 def upload_file(url, file_path, field_name="file", auth_header=None):
     """
     Upload a file to the given URL.
 
+    The multipart body is streamed from the file.
+
     :param url: The URL to send the POST request to.
     :param file_path: The path to the file to be uploaded.
     :param field_name: The form field name for the file (default: 'file').
     :return: The response from the server.
     """
-    headers = None
-    if auth_header:
-        headers = {
-            'Authorization': auth_header
-        }
     # Open the file in binary mode
     with open(file_path, 'rb') as f:
-        # Pass the file as a file-like object to the `files` parameter
-        files = {field_name: (file_path, f)}
+        body = MultipartFileStream(f, field_name, file_path)
+        headers = {
+            'Content-Type': body.content_type,
+            'Content-Length': str(len(body))
+        }
+        if auth_header:
+            headers['Authorization'] = auth_header
 
-        # Send the POST request with the file
-        response = requests.post(url, files=files, headers=headers)
+        # Send the POST request with the streamed body
+        response = requests.post(url, data=body, headers=headers)
 
     if response.status_code != 200:
         # log error response
@@ -1,5 +1,4 @@
 import os
-import tempfile
 import logging
 import mimetypes
 from collections import defaultdict
@@ -11,6 +10,7 @@ from django.shortcuts import render  # noqa: F401
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone as django_timezone
+from django.conf import settings
 
 from django.shortcuts import get_object_or_404
 from django.http import FileResponse, Http404
@@ -18,7 +18,9 @@ from django.urls import reverse
 
 from cloud_native_gis.models import Layer
 from analysis.utils import _initialize_gdrive_instance
-from .models import InputLayer, ExportedCog
+from core.file_response import ranged_file_response
+from .cog_cache import exported_cog_cache
+from .models import InputLayer, ExportedCog, VectorTileArchive
 from .tasks.export_nrt_cog import export_ee_image_to_cog_task
 
 
@@ -147,7 +149,9 @@ def trigger_cog_export(request, uuid):
                     "download_url": download_url,
                     "cog_id": cog.id
                 })
-        elif cog.task_id and cog.status in ['PENDING', 'PROCESSING']:
+        elif cog.task_id and cog.status in [
+            'PENDING', 'PROCESSING', 'DOWNLOADING'
+        ]:
             return Response({
                 "task_id": cog.task_id,
                 "already_exported": False,
@@ -181,8 +185,10 @@ def trigger_cog_export(request, uuid):
 @login_required
 def download_from_gdrive(request, cog_id):
     """
-    Streams a downloaded COG file directly from Google Drive
-    using the stored gdrive_file_id from ExportedCog.
+    Streams an exported COG file from the local cache of Google Drive
+    files using the stored gdrive_file_id from ExportedCog.
+
+    HTTP Range request is supported.
     """
     try:
         exported = ExportedCog.objects.filter(
@@ -193,20 +199,20 @@ def download_from_gdrive(request, cog_id):
         if not exported or not exported.gdrive_file_id:
             raise Http404("No exported file found.")
 
-        gdrive = _initialize_gdrive_instance()
-        gfile = gdrive.CreateFile({'id': exported.gdrive_file_id})
-
-        # Create a temporary file and download the GDrive content into it
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            gfile.GetContentFile(temp_file.name)
-            temp_file_path = temp_file.name
+        def download(file_path):
+            gdrive = _initialize_gdrive_instance()
+            gfile = gdrive.CreateFile({'id': exported.gdrive_file_id})
+            gfile.GetContentFile(
+                file_path, chunksize=settings.GDRIVE_DOWNLOAD_CHUNK_SIZE
+            )
 
-        # Return the temp file as a streamed response
-        return FileResponse(
-            open(temp_file_path, 'rb'),
-            as_attachment=True,
-            filename=exported.file_name,
-            content_type='application/octet-stream'
+        # Download once to the local cache, then serve (ranges of) it
+        file_path = exported_cog_cache.get(exported.gdrive_file_id, download)
+        return ranged_file_response(
+            request,
+            file_path,
+            content_type='application/octet-stream',
+            filename=exported.file_name
         )
     except InputLayer.DoesNotExist:
         raise Http404("Layer not found.")
@@ -254,3 +260,22 @@ def cog_export_status(request, cog_id):
                 "info": "Export task not found."
             }
         )
+
+
+def serve_vector_tile_archive(request, name, content_hash):
+    """Serve (ranges of) baked PMTiles archive.
+
+    The url is versioned by the content hash, so it can be cached forever.
+    """
+    archive = get_object_or_404(
+        VectorTileArchive, name=name, content_hash=content_hash
+    )
+    if not archive.file or not os.path.exists(archive.file.path):
+        raise Http404("Archive file not found.")
+    response = ranged_file_response(
+        request,
+        archive.file.path,
+        content_type='application/vnd.pmtiles'
+    )
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response